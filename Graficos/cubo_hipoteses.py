@@ -0,0 +1,290 @@
+"""
+Cubo pré-calculado das métricas H1-H6 por linguagem × tipo de proprietário ×
+faixa de estrelas × arquivado × fork.
+
+Em vez de rodar a análise de novo sobre um CSV filtrado a cada recorte, o cubo
+é construído uma vez: cada repositório cai numa célula (uma combinação das
+dimensões) e, por célula, guardam-se a contagem, a soma e o número de valores
+válidos de cada métrica, quantos passam do limiar da hipótese e um histograma
+de bordas fixas (o esboço de quantis). Como tudo isso se soma, qualquer fatia
+ou agregação (roll-up) é a soma das células selecionadas, e medianas e
+quartis saem do histograma somado, sem voltar ao CSV.
+
+Os histogramas têm bordas inteiras até 100 e depois crescem 1% por bin, então
+medianas de contagens pequenas são exatas e as demais têm erro relativo
+abaixo de 0,5%. Idade (0,05 ano) e fração de issues (0,001) usam bins lineares.
+O arquivo .npz guarda só os bins não vazios de cada célula.
+
+    python cubo_hipoteses.py construir repositorios_populares_github.csv cubo.npz
+    python cubo_hipoteses.py consultar cubo.npz --filtro tipo_proprietario=Organization --por faixa_estrelas
+    python cubo_hipoteses.py dimensoes cubo.npz
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from graficos_agregados import bordas_contagem, bins_de, quantis_do_histograma, representantes
+
+# Mesmas faixas de Medicao/estatisticas_agrupadas.py
+LIMITES_FAIXAS_ESTRELAS = [0, 1000, 5000, 10000, 50000, 100000, np.inf]
+LINGUAGENS_H5 = ('JavaScript', 'Python', 'TypeScript')
+SEM_VALOR = 'N/A'
+
+
+# coluna (após processar_dados) -> hipótese, nome curto, coluna do percentual além do limiar e bordas do esboço
+METRICAS = {
+    'age_years': {'hipotese': 'H1', 'nome': 'idade_anos', 'percentual': 'pct_mais_de_5_anos',
+                  'alem': lambda v: v > 5, 'bordas': np.linspace(0, 50, 1001)},
+    'merged_pr_count': {'hipotese': 'H2', 'nome': 'prs_mesclados', 'percentual': 'pct_mais_de_100_prs',
+                        'alem': lambda v: v > 100, 'bordas': bordas_contagem()},
+    'releases_count': {'hipotese': 'H3', 'nome': 'releases', 'percentual': 'pct_mais_de_10_releases',
+                       'alem': lambda v: v > 10, 'bordas': bordas_contagem()},
+    'days_since_update': {'hipotese': 'H4', 'nome': 'dias_desde_atualizacao', 'percentual': 'pct_atualizados_90d',
+                          'alem': lambda v: v <= 90, 'bordas': bordas_contagem()},
+    'issues_ratio': {'hipotese': 'H6', 'nome': 'razao_issues', 'percentual': 'pct_issues_fechadas_acima_70',
+                     'alem': lambda v: v > 0.7, 'bordas': np.linspace(0, 1, 1001)},
+}
+
+
+def _faixas_estrelas(estrelas, limites=LIMITES_FAIXAS_ESTRELAS):
+    rotulos = [f"{int(a)}-{int(b)}" if np.isfinite(b) else f"{int(a)}+" for a, b in zip(limites[:-1], limites[1:])]
+    return pd.cut(pd.to_numeric(estrelas, errors='coerce'), bins=limites, labels=rotulos, right=False)
+
+
+def dimensoes_do_dataframe(df, max_linguagens=30):
+    """{dimensão: rótulos por repositório}; as linguagens fora das mais comuns viram 'Outras' (exceto as de H5)"""
+    dimensoes = {}
+    if 'primary_language' in df.columns:
+        linguagens = df['primary_language'].fillna(SEM_VALOR).astype(str)
+        mantidas = set(linguagens.value_counts().index[:max_linguagens]) | set(LINGUAGENS_H5)
+        dimensoes['linguagem_principal'] = linguagens.where(linguagens.isin(mantidas), 'Outras')
+    if 'tipo_proprietario' in df.columns:
+        dimensoes['tipo_proprietario'] = df['tipo_proprietario']
+    if 'estrelas' in df.columns:
+        dimensoes['faixa_estrelas'] = _faixas_estrelas(df['estrelas'])
+    for coluna in ('arquivado', 'eh_fork'):
+        if coluna in df.columns:
+            dimensoes[coluna] = df[coluna]
+    ausentes = [d for d in ('linguagem_principal', 'tipo_proprietario', 'faixa_estrelas', 'arquivado', 'eh_fork')
+                if d not in dimensoes]
+    if ausentes:
+        print(f"Aviso: dimensões ausentes no CSV (ficam fora do cubo): {ausentes}")
+    return {nome: _com_sem_valor(serie) for nome, serie in dimensoes.items()}
+
+
+def _com_sem_valor(serie):
+    """Ausentes viram SEM_VALOR; as faixas de estrelas continuam categóricas para manter a ordem das faixas"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.add_categories(SEM_VALOR).fillna(SEM_VALOR)
+    return serie.astype(object).where(serie.notna(), SEM_VALOR).astype(str)
+
+
+class Cubo:
+    def __init__(self, rotulos, coordenadas, contagem, metricas):
+        self.rotulos = rotulos          # dimensão -> array de rótulos (o código é a posição)
+        self.coordenadas = coordenadas  # células × dimensões, códigos int32
+        self.contagem = contagem        # repositórios por célula
+        self.metricas = metricas        # coluna -> validos, soma, alem por célula; celula, bin, contagem dos histogramas
+
+    @property
+    def dimensoes(self):
+        return list(self.rotulos)
+
+    def selecionar(self, filtros=None):
+        """Máscara das células que satisfazem {dimensão: valor ou lista de valores}"""
+        mascara = np.ones(len(self.contagem), dtype=bool)
+        for dimensao, valores in (filtros or {}).items():
+            if dimensao not in self.rotulos:
+                raise ValueError(f"Dimensão desconhecida: {dimensao}. Opções: {', '.join(self.rotulos)}")
+            valores = [valores] if isinstance(valores, str) else list(valores)
+            rotulos = self.rotulos[dimensao].tolist()
+            desconhecidos = [v for v in valores if v not in rotulos]
+            if desconhecidos:
+                raise ValueError(f"Valores desconhecidos para {dimensao}: {desconhecidos}. Opções: {rotulos}")
+            codigos = [rotulos.index(v) for v in valores]
+            mascara &= np.isin(self.coordenadas[:, self.dimensoes.index(dimensao)], codigos)
+        return mascara
+
+    def consultar(self, filtros=None, por=()):
+        """Números de H1-H6 para a fatia `filtros`, uma linha por combinação das dimensões `por`"""
+        por = list(por)
+        for dimensao in por:
+            if dimensao not in self.rotulos:
+                raise ValueError(f"Dimensão desconhecida: {dimensao}. Opções: {', '.join(self.rotulos)}")
+        selecionadas = np.flatnonzero(self.selecionar(filtros))
+        if por:
+            indices = [self.dimensoes.index(d) for d in por]
+            grupos, grupo = np.unique(self.coordenadas[selecionadas][:, indices], axis=0, return_inverse=True)
+            grupo = grupo.ravel()
+        else:
+            grupos, grupo = np.zeros((1, 0), dtype=np.int32), np.zeros(len(selecionadas), dtype=np.int64)
+        n_grupos = len(grupos)
+        grupo_da_celula = np.full(len(self.contagem), -1, dtype=np.int64)
+        grupo_da_celula[selecionadas] = grupo
+
+        def somar(por_celula):
+            return np.bincount(grupo, weights=por_celula[selecionadas], minlength=n_grupos)
+
+        tabela = pd.DataFrame({d: self.rotulos[d][grupos[:, i]] for i, d in enumerate(por)})
+        repositorios = somar(self.contagem)
+        tabela['repositorios'] = repositorios.astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for coluna, definicao in METRICAS.items():
+                if coluna not in self.metricas:
+                    continue
+                metrica, nome = self.metricas[coluna], definicao['nome']
+                validos = somar(metrica['validos'])
+                histograma = self._histogramas(metrica, grupo_da_celula, n_grupos, len(definicao['bordas']) - 1)
+                quantis = quantis_do_histograma(histograma, representantes(definicao['bordas']), (0.25, 0.5, 0.75))
+                tabela[f'{nome}_media'] = somar(metrica['soma']) / validos
+                tabela[f'{nome}_p25'], tabela[f'{nome}_mediana'], tabela[f'{nome}_p75'] = quantis
+                tabela[definicao['percentual']] = somar(metrica['alem']) / validos * 100
+            if 'linguagem_principal' in self.rotulos:
+                # H5 depende só da contagem por linguagem
+                tabela['pct_js_py_ts'] = somar(self._contagem_h5()) / repositorios * 100
+        return tabela
+
+    def _contagem_h5(self):
+        rotulos = self.rotulos['linguagem_principal']
+        codigos = np.flatnonzero(np.isin(rotulos, LINGUAGENS_H5))
+        coluna = self.coordenadas[:, self.dimensoes.index('linguagem_principal')]
+        return np.where(np.isin(coluna, codigos), self.contagem, 0)
+
+    @staticmethod
+    def _histogramas(metrica, grupo_da_celula, n_grupos, n_bins):
+        grupo = grupo_da_celula[metrica['celula']]
+        usados = grupo >= 0
+        return np.bincount(grupo[usados] * n_bins + metrica['bin'][usados], weights=metrica['contagem'][usados],
+                           minlength=n_grupos * n_bins).reshape(n_grupos, n_bins)
+
+    def salvar(self, caminho):
+        arrays = {'dimensoes': np.array(self.dimensoes), 'coordenadas': self.coordenadas, 'contagem': self.contagem}
+        for dimensao, rotulos in self.rotulos.items():
+            arrays[f'rotulos/{dimensao}'] = rotulos
+        for coluna, metrica in self.metricas.items():
+            for campo, valores in metrica.items():
+                arrays[f'{coluna}/{campo}'] = valores
+        np.savez_compressed(caminho, **arrays)
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as dados:
+            rotulos = {str(d): dados[f'rotulos/{d}'] for d in dados['dimensoes']}
+            metricas = {}
+            for chave in dados.files:
+                coluna, _, campo = chave.partition('/')
+                if coluna in METRICAS:
+                    metricas.setdefault(coluna, {})[campo] = dados[chave]
+            return cls(rotulos, dados['coordenadas'], dados['contagem'], metricas)
+
+
+def construir_cubo(df, max_linguagens=30):
+    """Cubo de um DataFrame já processado (graficos.processar_dados)"""
+    dimensoes = dimensoes_do_dataframe(df, max_linguagens)
+    if not dimensoes:
+        raise ValueError("Nenhuma dimensão do cubo encontrada no CSV")
+    codigos, rotulos = [], {}
+    for nome, serie in dimensoes.items():
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Fatoriza os códigos da categoria: a ordem das faixas, não a ordem alfabética dos rótulos
+            codigo, presentes = pd.factorize(serie.cat.codes, sort=True)
+            unicos = serie.cat.categories[presentes]
+        else:
+            codigo, unicos = pd.factorize(serie, sort=True)
+        codigos.append(codigo)
+        rotulos[nome] = np.asarray(unicos, dtype=str)
+    forma = tuple(len(r) for r in rotulos.values())
+    celulas, celula = np.unique(np.ravel_multi_index(codigos, forma), return_inverse=True)
+    celula = celula.ravel()
+    n_celulas = len(celulas)
+    coordenadas = np.stack(np.unravel_index(celulas, forma), axis=1).astype(np.int32)
+
+    metricas = {}
+    for coluna, definicao in METRICAS.items():
+        if coluna not in df.columns:
+            continue
+        valores = pd.to_numeric(df[coluna], errors='coerce').to_numpy(dtype=float)
+        validos = np.isfinite(valores)
+        valores, da_celula = valores[validos], celula[validos]
+        n_bins = len(definicao['bordas']) - 1
+        bins = bins_de(valores, definicao['bordas'])
+        chaves, contagens = np.unique(da_celula.astype(np.int64) * n_bins + bins, return_counts=True)
+        metricas[coluna] = {
+            'validos': np.bincount(da_celula, minlength=n_celulas),
+            'soma': np.bincount(da_celula, weights=valores, minlength=n_celulas),
+            'alem': np.bincount(da_celula, weights=definicao['alem'](valores), minlength=n_celulas).astype(np.int64),
+            'celula': (chaves // n_bins).astype(np.uint32),
+            'bin': (chaves % n_bins).astype(np.uint16),
+            'contagem': contagens.astype(np.uint32),
+        }
+    return Cubo(rotulos, coordenadas, np.bincount(celula, minlength=n_celulas), metricas)
+
+
+def _filtros(especificacoes):
+    """['tipo_proprietario=Organization', 'arquivado=Não'] -> {dimensão: [valores]}"""
+    filtros = {}
+    for especificacao in especificacoes:
+        dimensao, separador, valores = especificacao.partition('=')
+        if not separador:
+            raise argparse.ArgumentTypeError(f"Filtro inválido: {especificacao} (use dimensão=valor[,valor...])")
+        filtros.setdefault(dimensao.strip(), []).extend(v.strip() for v in valores.split(','))
+    return filtros
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Cubo pré-calculado das métricas H1-H6')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    construir = subparsers.add_parser('construir', help='Constrói o cubo a partir do CSV da coleta')
+    construir.add_argument('csv', help='CSV da coleta (esquema da sprint 2)')
+    construir.add_argument('saida', help='Arquivo .npz do cubo')
+    construir.add_argument('--max-linguagens', type=int, default=30,
+                           help="Linguagens mantidas como categoria própria; as demais viram 'Outras'")
+
+    consultar = subparsers.add_parser('consultar', help='Fatia ou agrega o cubo')
+    consultar.add_argument('cubo', help='Arquivo .npz do cubo')
+    consultar.add_argument('--filtro', action='append', default=[],
+                           help='dimensão=valor[,valor...] (repetível), ex.: arquivado=Não')
+    consultar.add_argument('--por', default='', help='Dimensões das linhas, ex.: linguagem_principal,eh_fork')
+    consultar.add_argument('--saida', default=None, help='Grava a tabela em CSV')
+
+    dimensoes = subparsers.add_parser('dimensoes', help='Lista as dimensões e seus valores')
+    dimensoes.add_argument('cubo', help='Arquivo .npz do cubo')
+    args = parser.parse_args(argv)
+
+    if args.comando == 'construir':
+        from graficos import carregar_csv, processar_dados
+        df = processar_dados(carregar_csv(args.csv))
+        inicio = time.perf_counter()
+        cubo = construir_cubo(df, args.max_linguagens)
+        cubo.salvar(args.saida)
+        print(f"Cubo com {len(cubo.contagem)} células ({len(df)} repositórios, dimensões: "
+              f"{', '.join(cubo.dimensoes)}) salvo em {args.saida} em {time.perf_counter() - inicio:.2f} s")
+        return 0
+
+    cubo = Cubo.carregar(args.cubo)
+    if args.comando == 'dimensoes':
+        for dimensao, rotulos in cubo.rotulos.items():
+            print(f"{dimensao}: {', '.join(rotulos)}")
+        return 0
+
+    try:
+        filtros = _filtros(args.filtro)
+        inicio = time.perf_counter()
+        tabela = cubo.consultar(filtros, [d.strip() for d in args.por.split(',') if d.strip()])
+    except (ValueError, argparse.ArgumentTypeError) as erro:
+        parser.error(str(erro))
+    duracao = (time.perf_counter() - inicio) * 1000
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(tabela.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"Consulta respondida em {duracao:.1f} ms")
+    if args.saida:
+        tabela.to_csv(args.saida, index=False)
+        print(f"Tabela salva em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,25 @@
-import sys
+import argparse
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from statsmodels.stats.proportion import proportion_confint
-import scipy.stats as stats
+from graficos_agregados import (boxplot_agrupado, boxplot_de_contagens, contagens_por_valor, estatisticas_agrupadas,
+                                estatisticas_box_de_contagens, histograma_de_contagens, quantis_do_histograma)
+from grafo_analise import BASE
 
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# matplotlib, seaborn, scipy e statsmodels só são importados quando um gráfico
+# ou teste estatístico é de fato gerado (ver bibliotecas_graficos)
+_estilo_configurado = False
+
+def bibliotecas_graficos():
+    """(plt, sns) com o estilo dos gráficos das hipóteses já configurado"""
+    global _estilo_configurado
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    if not _estilo_configurado:
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _estilo_configurado = True
+    return plt, sns
 
 def bootstrap_stat(series, statfunc=np.median, n_boot=5000, random_state=42):
     rng = np.random.RandomState(random_state)
@@ -18,10 +29,59 @@ def bootstrap_stat(series, statfunc=np.median, n_boot=5000, random_state=42):
     boots = [statfunc(rng.choice(arr, size=len(arr), replace=True)) for _ in range(n_boot)]
     return np.percentile(boots, [2.5, 50, 97.5])
 
+def ic_mediana(valores, z=1.96):
+    """Mediana e IC95% por estatísticas de ordem (binomial), em O(n): [inferior, mediana, superior]"""
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    n = len(valores)
+    if n == 0:
+        return np.array([np.nan, np.nan, np.nan])
+    inferior = max(int(np.floor((n - z * np.sqrt(n)) / 2)), 0)
+    superior = min(int(np.ceil((n + z * np.sqrt(n)) / 2)), n - 1)
+    particionados = np.partition(valores, [inferior, superior])
+    return np.array([particionados[inferior], np.median(valores), particionados[superior]])
+
 def to_datetime_naive(series):
     dt = pd.to_datetime(series, errors='coerce', utc=True)
     return dt.dt.tz_convert(None)
 
+# CSVs comprimidos são aceitos em todo lugar; o pandas descomprime pela extensão
+EXTENSOES_CSV = {".csv": None, ".csv.gz": "gzip", ".csv.zst": "zstd"}
+
+def compressao_do_csv(caminho):
+    for extensao, compressao in EXTENSOES_CSV.items():
+        if caminho.lower().endswith(extensao):
+            return compressao
+    return None
+
+class PrefixoLido:
+    """
+    Cabeçalho e últimos bytes (até 64 KiB) já lidos de um CSV. O arquivo só
+    recebeu linhas novas se cresceu e ainda tem exatamente esses bytes antes do
+    offset; uma reescrita com o mesmo cabeçalho quase sempre altera algum deles.
+    """
+    JANELA = 64 * 1024
+
+    def __init__(self, conteudo):
+        self.cabecalho = conteudo.split(b'\n', 1)[0]
+        self.offset = len(conteudo)
+        self._cauda = conteudo[-self.JANELA:]
+
+    def avancar(self, novos):
+        """Registra os bytes anexados que acabaram de ser lidos"""
+        self.offset += len(novos)
+        self._cauda = (self._cauda + novos)[-self.JANELA:]
+
+    def apenas_anexado(self, caminho):
+        # O que já foi lido precisa terminar numa linha completa
+        if not self._cauda.endswith(b'\n') or os.stat(caminho).st_size <= self.offset:
+            return False
+        with open(caminho, 'rb') as arquivo:
+            if arquivo.readline().rstrip(b'\n') != self.cabecalho:
+                return False
+            arquivo.seek(self.offset - len(self._cauda))
+            return arquivo.read(len(self._cauda)) == self._cauda
+
 def find_default_csv():
 
     candidates = [
@@ -29,49 +89,47 @@ def find_default_csv():
         "repos.csv",
     ]
     for c in candidates:
-        if os.path.isfile(c):
-            return c
+        for extensao in EXTENSOES_CSV:
+            if os.path.isfile(c.removesuffix(".csv") + extensao):
+                return c.removesuffix(".csv") + extensao
     for f in os.listdir("."):
-        if f.lower().endswith(".csv"):
+        if f.lower().endswith(tuple(EXTENSOES_CSV)):
             return f
     return None
 
-def load_and_process_data(csv_path=None):
-    import os
-
+def carregar_csv(csv_path=None):
+    """Lê o CSV bruto (o da pasta atual, se nenhum caminho for dado)"""
     if csv_path is None:
-        for c in ["repositorios_populares_github.csv", "repos.csv"]:
-            if os.path.isfile(c):
-                csv_path = c
-                break
-        if csv_path is None:
-            for f in os.listdir("."):
-                if f.lower().endswith(".csv"):
-                    csv_path = f
-                    break
+        csv_path = find_default_csv()
     if csv_path is None or not os.path.isfile(csv_path):
         raise FileNotFoundError("CSV não encontrado. Coloque o arquivo na pasta ou passe o caminho como argumento.")
 
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(csv_path, compression=compressao_do_csv(csv_path) or "infer")
     print(df.columns)
+    return df
+
+def load_and_process_data(csv_path=None):
+    return processar_dados(carregar_csv(csv_path))
 
-    if 'data_criacao' in df.columns:
-        df['created_at'] = pd.to_datetime(df['data_criacao'], errors='coerce', utc=True).dt.tz_convert(None)
-    if 'ultimo_push' in df.columns:
-        df['pushed_at'] = pd.to_datetime(df['ultimo_push'], errors='coerce', utc=True).dt.tz_convert(None)
-    if 'ultima_atualizacao' in df.columns:
-        df['updated_at'] = pd.to_datetime(df['ultima_atualizacao'], errors='coerce', utc=True).dt.tz_convert(None)
+def processar_dados(df, agora=None):
+    """Deriva as colunas usadas nas hipóteses (idade, dias sem atualização, razão de issues...)"""
+    avaliacao = BASE.avaliacao(df=df) if agora is None else BASE.avaliacao(df=df, agora=agora)
+    return _processar(df, avaliacao['datas'], avaliacao['idade_dias'], avaliacao['dias_desde_push'])
 
-    now = pd.Timestamp.now(tz='UTC').tz_convert(None)
+# Grafo das hipóteses: colunas derivadas (BASE) -> dados -> estatísticas -> figuras e resumo
+GRAFO = BASE.estender()
 
-    if 'created_at' in df.columns:
-        df['age_years'] = (now - df['created_at']).dt.days / 365.25
-    if 'pushed_at' in df.columns:
-        df['last_update'] = df['pushed_at']
-    elif 'updated_at' in df.columns:
-        df['last_update'] = df['updated_at']
-    if 'last_update' in df.columns:
-        df['days_since_update'] = (now - df['last_update']).dt.days
+@GRAFO.no('dados', 'df', 'datas', 'idade_dias', 'dias_desde_push')
+def _processar(df, datas, idade_dias, dias_desde_push):
+    # As colunas de tempo vêm do grafo compartilhado com analise_hipoteses e GitHubAnalyzer
+    for nome, coluna in (('criacao', 'created_at'), ('push', 'pushed_at'), ('atualizacao', 'updated_at')):
+        if nome in datas:
+            df[coluna] = datas[nome]
+    if idade_dias is not None:
+        df['age_years'] = idade_dias / 365.25
+    if dias_desde_push is not None:
+        df['last_update'] = datas.get('push', datas.get('atualizacao'))
+        df['days_since_update'] = dias_desde_push
 
     rename_map = {
         'prs_mesclados': 'merged_pr_count',
@@ -98,186 +156,320 @@ def load_and_process_data(csv_path=None):
 
     return df
 
+# Figuras de histograma + boxplot. As funções plot_*_de_contagens desenham a partir de
+# contagens por valor (contagens_por_valor, exatas) ou em bins fixos (esboços somados
+# do observador_analise.py); as plot_h* só as calculam a partir das linhas.
+FIGURAS_DISTRIBUICAO = {
+    'H1': {'coluna': 'age_years', 'arquivo': 'h1_idade_repositorios.png', 'titulo': 'H1: Idade dos Repositórios',
+           'titulo_box': 'Boxplot - Idade', 'limiar': 5, 'rotulo_limiar': '5 anos', 'vertical': True, 'log': False,
+           'formato': '.1f'},
+    'H2': {'coluna': 'merged_pr_count', 'arquivo': 'h2_prs_mescladas.png', 'titulo': 'H2: PRs Mescladas (log)',
+           'titulo_box': 'Boxplot de PRs', 'limiar': 100, 'rotulo_limiar': '100 PRs', 'vertical': False, 'log': True,
+           'formato': '.0f'},
+    'H3': {'coluna': 'releases_count', 'arquivo': 'h3_releases.png', 'titulo': 'H3: Distribuição de Releases',
+           'titulo_box': 'Boxplot - Releases', 'limiar': 10, 'rotulo_limiar': '10 releases', 'vertical': False,
+           'log': False, 'formato': '.0f'},
+    'H6': {'coluna': 'issues_ratio', 'arquivo': 'h6_issues.png', 'titulo': 'H6: % Issues Fechadas',
+           'titulo_box': 'Boxplot - Issues', 'limiar': 0.7, 'rotulo_limiar': '70%', 'vertical': True, 'log': False,
+           'formato': '.2f'},
+}
+LINGUAGENS_H5 = ['JavaScript', 'Python', 'TypeScript']
+
+def plot_distribuicao_de_contagens(figura, contagens, valores_bins, ic=None):
+    """Histograma + boxplot de uma figura de FIGURAS_DISTRIBUICAO; com `ic`, imprime a mediana e o IC95%"""
+    definicao = FIGURAS_DISTRIBUICAO[figura]
+    formato = definicao['formato']
+    plt, sns = bibliotecas_graficos()
+    escala = np.log1p if definicao['log'] else (lambda v: v)
+    mediana = quantis_do_histograma(contagens[None, :], valores_bins, (0.5,))[0][0] if contagens.sum() else np.nan
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
+    # Na escala log, o histograma mostra só os valores positivos
+    histograma_de_contagens(contagens * (valores_bins > 0) if definicao['log'] else contagens, escala(valores_bins),
+                            ax=ax1)
+    ax1.axvline(escala(definicao['limiar']), color='red', linestyle='--', label=definicao['rotulo_limiar'])
+    ax1.axvline(escala(mediana), color='green', label=f"Mediana {mediana:{formato}}")
+    ax1.set_title(definicao['titulo']); ax1.legend()
+    boxplot_de_contagens(contagens, escala(valores_bins), ax=ax2, vert=definicao['vertical'])
+    linha_limiar = ax2.axhline if definicao['vertical'] else ax2.axvline
+    linha_limiar(escala(definicao['limiar']), color='red', linestyle='--'); ax2.set_title(definicao['titulo_box'])
+    plt.tight_layout(); plt.savefig(definicao['arquivo'], dpi=300, bbox_inches='tight')
+    if ic is not None:
+        print(f"{figura} - Mediana: {mediana:{formato}}, IC95% [{ic[0]:{formato}}, {ic[2]:{formato}}]")
+
+def plot_h4_de_contagens(contagens, valores_bins, atualizados_90d):
+    """H4: histograma e CDF dos dias desde a atualização, com o IC de Wilson da proporção ≤90 dias"""
+    plt, sns = bibliotecas_graficos()
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
+    histograma_de_contagens(contagens, valores_bins, ax=ax1)
+    ax1.axvline(90, color='red', linestyle='--', label='90 dias')
+    ax1.legend(); ax1.set_title('H4: Dias desde última atualização')
+    # CDF reagrupada em 1000 pontos, independente do número de repositórios
+    usados = contagens > 0
+    finas, bordas = np.histogram(valores_bins[usados], bins=1000, weights=contagens[usados])
+    ax2.plot(bordas[1:], np.cumsum(finas) / max(finas.sum(), 1)); ax2.axvline(90, color='red', linestyle='--'); ax2.set_title("CDF Atualizações")
+    plt.tight_layout(); plt.savefig("h4_atualizacoes.png", dpi=300, bbox_inches='tight')
+    k, n = int(atualizados_90d), int(contagens.sum())
+    if n > 0:
+        from statsmodels.stats.proportion import proportion_confint
+        ci_low, ci_upp = proportion_confint(k, n, method='wilson')
+        print(f"H4 - Atualizados ≤90d: {k}/{n} ({k/n*100:.1f}%) | IC95% [{ci_low*100:.1f}%, {ci_upp*100:.1f}%]")
+
+def plot_h5_de_contagens(linguagens, caixas, js_py_ts, total):
+    """
+    H5 a partir de agregados: `linguagens` é a contagem de repositórios por linguagem e
+    `caixas` é {coluna: estatísticas do boxplot (formato de ax.bxp) das 5 linguagens mais comuns}.
+    """
+    plt, sns = bibliotecas_graficos()
+    fig, axes = plt.subplots(2, 2, figsize=(16,12))
+    top_langs = linguagens.rename_axis('primary_language').sort_values(ascending=False, kind='stable').head(10)
+    sns.barplot(x=top_langs.values, y=top_langs.index, ax=axes[0,0])
+    axes[0,0].set_title("H5: Top 10 Linguagens")
+    axes[0,1].pie(list(top_langs.head(5).values) + [top_langs.iloc[5:].sum()],
+                  labels=list(top_langs.head(5).index) + ['Outras'],
+                  autopct="%1.1f%%", startangle=90)
+    axes[0,1].set_title("Top 5 Linguagens")
+    for ax, coluna, titulo in ((axes[1,0], 'merged_pr_count', "PRs por Linguagem"),
+                               (axes[1,1], 'releases_count', "Releases por Linguagem")):
+        if coluna not in caixas:
+            ax.set_visible(False)
+            continue
+        ax.bxp(caixas[coluna], showfliers=True, patch_artist=True)
+        ax.set_xlabel('primary_language'); ax.set_ylabel(coluna)
+        ax.set_yscale("log"); ax.set_title(titulo)
+    plt.tight_layout(); plt.savefig("h5_linguagens.png", dpi=300, bbox_inches='tight')
+    print(f"H5 - JS+Py+TS: {js_py_ts}/{total} ({js_py_ts/total*100:.1f}%)")
+
+def _plot_distribuicao(df, figura, ic=None):
+    coluna = FIGURAS_DISTRIBUICAO[figura]['coluna']
+    contagens, valores = contagens_por_valor(df[coluna])
+    plot_distribuicao_de_contagens(figura, contagens, valores, ic)
+    bibliotecas_graficos()[0].show()
+
 def plot_h1_age_analysis(df):
     if 'age_years' not in df.columns:
         print("H1: pulado (coluna 'age_years' ausente).")
         return
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-    sns.histplot(df['age_years'], bins=30, ax=ax1, alpha=0.7)
-    ax1.axvline(5, color='red', linestyle='--', label='5 anos')
-    ax1.axvline(df['age_years'].median(), color='green', linestyle='-', label=f"Mediana: {df['age_years'].median():.1f}")
-    ax1.set_title('H1: Idade dos Repositórios'); ax1.legend()
-    sns.boxplot(y=df['age_years'], ax=ax2)
-    ax2.axhline(5, color='red', linestyle='--'); ax2.set_title('Boxplot - Idade')
-    plt.tight_layout(); plt.savefig('h1_idade_repositorios.png', dpi=300, bbox_inches='tight'); plt.show()
-
-def plot_h2_prs_analysis(df):
+    _plot_distribuicao(df, 'H1')
+
+def plot_h2_prs_analysis(df, ic=None):
     if 'merged_pr_count' not in df.columns:
         print("H2: pulado (coluna 'merged_pr_count' ausente).")
         return
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-    prs = df['merged_pr_count']
-    sns.histplot(np.log1p(prs[prs > 0]), bins=30, ax=ax1, alpha=0.7)
-    ax1.axvline(np.log1p(100), color='red', linestyle='--', label='100 PRs')
-    ax1.axvline(np.log1p(prs.median()), color='green', label=f"Mediana {prs.median():.0f}")
-    ax1.set_title("H2: PRs Mescladas (log)"); ax1.legend()
-    sns.boxplot(x=np.log1p(prs), ax=ax2)
-    ax2.axvline(np.log1p(100), color='red', linestyle='--'); ax2.set_title("Boxplot de PRs")
-    plt.tight_layout(); plt.savefig("h2_prs_mescladas.png", dpi=300, bbox_inches='tight'); plt.show()
-    ic = bootstrap_stat(prs, np.median)
-    print(f"H2 - Mediana: {prs.median():.0f}, IC95% [{ic[0]:.0f}, {ic[2]:.0f}]")
-
-def plot_h3_releases_analysis(df):
+    _plot_distribuicao(df, 'H2', bootstrap_stat(df['merged_pr_count'], np.median) if ic is None else ic)
+
+def plot_h3_releases_analysis(df, ic=None):
     if 'releases_count' not in df.columns:
         print("H3: pulado (coluna 'releases_count' ausente).")
         return
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-    releases = df['releases_count']
-    sns.histplot(releases, bins=30, ax=ax1, alpha=0.7)
-    ax1.axvline(10, color='red', linestyle='--', label='10 releases')
-    ax1.axvline(releases.median(), color='green', label=f"Mediana {releases.median():.0f}")
-    ax1.legend(); ax1.set_title("H3: Distribuição de Releases")
-    sns.boxplot(x=releases, ax=ax2); ax2.axvline(10, color='red', linestyle='--'); ax2.set_title("Boxplot - Releases")
-    plt.tight_layout(); plt.savefig("h3_releases.png", dpi=300, bbox_inches='tight'); plt.show()
-    ic = bootstrap_stat(releases, np.median)
-    print(f"H3 - Mediana: {releases.median():.0f}, IC95% [{ic[0]:.0f}, {ic[2]:.0f}]")
+    _plot_distribuicao(df, 'H3', bootstrap_stat(df['releases_count'], np.median) if ic is None else ic)
+    if 'releases_por_ano' in df.columns:
+        print(f"H3 - Releases por ano (mediana): {df['releases_por_ano'].median():.1f} | "
+              f"Intervalo mediano entre releases: {df['intervalo_mediano_dias'].median():.0f} dias | "
+              f"Com release nos últimos 365 dias: {(df['releases_ultimo_ano'] > 0).mean() * 100:.1f}%")
 
 def plot_h4_updates_analysis(df):
     if 'days_since_update' not in df.columns:
         print("H4: pulado (coluna 'days_since_update' ausente).")
         return
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
     days = df['days_since_update']
-    sns.histplot(days, bins=30, ax=ax1, alpha=0.7)
-    ax1.axvline(90, color='red', linestyle='--', label='90 dias')
-    ax1.legend(); ax1.set_title('H4: Dias desde última atualização')
-    sorted_days = np.sort(days.dropna()); y = np.arange(1,len(sorted_days)+1)/len(sorted_days)
-    ax2.plot(sorted_days, y); ax2.axvline(90, color='red', linestyle='--'); ax2.set_title("CDF Atualizações")
-    plt.tight_layout(); plt.savefig("h4_atualizacoes.png", dpi=300, bbox_inches='tight'); plt.show()
-    k = (days <= 90).sum(); n = days.notna().sum()
-    if n > 0:
-        ci_low, ci_upp = proportion_confint(k, n, method='wilson')
-        print(f"H4 - Atualizados ≤90d: {k}/{n} ({k/n*100:.1f}%) | IC95% [{ci_low*100:.1f}%, {ci_upp*100:.1f}%]")
+    contagens, valores = contagens_por_valor(days)
+    plot_h4_de_contagens(contagens, valores, (days <= 90).sum())
+    bibliotecas_graficos()[0].show()
 
 def plot_h5_languages_analysis(df):
     if 'primary_language' not in df.columns:
         print("H5: pulado (coluna 'primary_language' ausente).")
         return
-    fig, axes = plt.subplots(2, 2, figsize=(16,12))
-    top_langs = df['primary_language'].value_counts().head(10)
-    sns.barplot(x=top_langs.values, y=top_langs.index, ax=axes[0,0])
-    axes[0,0].set_title("H5: Top 10 Linguagens")
-    axes[0,1].pie(list(top_langs.head(5).values) + [top_langs.iloc[5:].sum()],
-                  labels=list(top_langs.head(5).index) + ['Outras'],
-                  autopct="%1.1f%%", startangle=90)
-    axes[0,1].set_title("Top 5 Linguagens")
-    top5 = df[df['primary_language'].isin(top_langs.head(5).index)]
-    if 'merged_pr_count' in df.columns:
-        sns.boxplot(data=top5, x="primary_language", y="merged_pr_count", ax=axes[1,0])
-        axes[1,0].set_yscale("log"); axes[1,0].set_title("PRs por Linguagem")
-    else:
-        axes[1,0].set_visible(False)
-    if 'releases_count' in df.columns:
-        sns.boxplot(data=top5, x="primary_language", y="releases_count", ax=axes[1,1])
-        axes[1,1].set_yscale("log"); axes[1,1].set_title("Releases por Linguagem")
-    else:
-        axes[1,1].set_visible(False)
-    plt.tight_layout(); plt.savefig("h5_linguagens.png", dpi=300, bbox_inches='tight'); plt.show()
-    js_py_ts = df['primary_language'].isin(['JavaScript','Python','TypeScript']).sum()
-    total = len(df)
-    print(f"H5 - JS+Py+TS: {js_py_ts}/{total} ({js_py_ts/total*100:.1f}%)")
+    linguagens = df['primary_language'].value_counts()
+    top5 = linguagens.index[:5]
+    caixas = {coluna: estatisticas_agrupadas(df[df['primary_language'].isin(top5)], 'primary_language', coluna,
+                                             ordem=top5)
+              for coluna in ('merged_pr_count', 'releases_count') if coluna in df.columns}
+    plot_h5_de_contagens(linguagens, caixas, int(df['primary_language'].isin(LINGUAGENS_H5).sum()), len(df))
+    bibliotecas_graficos()[0].show()
 
-def plot_h6_issues_analysis(df):
+def plot_h6_issues_analysis(df, ic=None):
     if 'issues_ratio' not in df.columns:
         print("H6: pulado (colunas de issues ausentes).")
         return
-    fig,(ax1,ax2)=plt.subplots(1,2,figsize=(15,5))
-    sns.histplot(df['issues_ratio'], bins=30, ax=ax1, alpha=0.7)
-    ax1.axvline(0.7, color='red', linestyle='--', label='70%')
-    ax1.axvline(df['issues_ratio'].median(), color='green', label=f"Mediana {df['issues_ratio'].median():.2f}")
-    ax1.legend(); ax1.set_title("H6: % Issues Fechadas")
-    sns.boxplot(y=df['issues_ratio'], ax=ax2); ax2.axhline(0.7, color='red', linestyle='--'); ax2.set_title("Boxplot - Issues")
-    plt.tight_layout(); plt.savefig("h6_issues.png",dpi=300,bbox_inches='tight'); plt.show()
-    ic = bootstrap_stat(df['issues_ratio'].dropna(), np.median)
-    print(f"H6 - Mediana: {df['issues_ratio'].median():.2f}, IC95% [{ic[0]:.2f},{ic[2]:.2f}]")
-
-def plot_rq07_bonus(df):
+    _plot_distribuicao(df, 'H6', bootstrap_stat(df['issues_ratio'].dropna(), np.median) if ic is None else ic)
+
+def plot_rq07_bonus(df, rq07=None, posthoc=None, n_permutacoes=None):
     if 'primary_language' not in df.columns:
         print("RQ07: pulado (coluna 'primary_language' ausente).")
         return
+    plt, sns = bibliotecas_graficos()
     top_langs=df['primary_language'].value_counts().head(5).index
     subset=df[df['primary_language'].isin(top_langs)]
     fig,axes=plt.subplots(1,3,figsize=(18,6))
     if 'merged_pr_count' in df.columns:
-        sns.boxplot(data=subset,x="primary_language",y="merged_pr_count",ax=axes[0]); axes[0].set_yscale("log")
+        boxplot_agrupado(subset,"primary_language","merged_pr_count",ax=axes[0],ordem=top_langs); axes[0].set_yscale("log")
         axes[0].set_title("PRs por linguagem")
     else:
         axes[0].set_visible(False)
     if 'releases_count' in df.columns:
-        sns.boxplot(data=subset,x="primary_language",y="releases_count",ax=axes[1]); axes[1].set_yscale("log")
+        boxplot_agrupado(subset,"primary_language","releases_count",ax=axes[1],ordem=top_langs); axes[1].set_yscale("log")
         axes[1].set_title("Releases por linguagem")
     else:
         axes[1].set_visible(False)
     if 'days_since_update' in df.columns:
-        sns.boxplot(data=subset,x="primary_language",y="days_since_update",ax=axes[2]); axes[2].set_yscale("log")
+        boxplot_agrupado(subset,"primary_language","days_since_update",ax=axes[2],ordem=top_langs); axes[2].set_yscale("log")
         axes[2].set_title("Atualizações por linguagem")
     else:
         axes[2].set_visible(False)
     plt.tight_layout(); plt.savefig("rq07_por_linguagem.png",dpi=300,bbox_inches='tight'); plt.show()
     print("RQ07 - Kruskal-Wallis:")
-    for var in ["merged_pr_count","releases_count","days_since_update"]:
-        if var in df.columns:
-            groups=[g[var].values for _,g in subset.groupby("primary_language")]
-            if all(len(g)>0 for g in groups):
-                p=stats.kruskal(*groups).pvalue
-                print(f"{var}: p-value={p:.4f}")
-
-def generate_summary_report(df):
-    print("="*60, "\nRESUMO HIPÓTESES\n", "="*60)
+    for var, p in (rq07 or calcular_rq07(df))['kruskal_p'].items():
+        print(f"{var}: p-value={p:.4f}")
+    from testes_permutacao import salvar_pares
+    posthoc = calcular_posthoc_rq07(df, n_permutacoes) if posthoc is None else posthoc
+    print("RQ07 - Permutação e post-hoc de Dunn (linguagens com 5+ repositórios):")
+    for var, r in posthoc.items():
+        significativos=int((r['pares']['p_dunn_holm']<0.05).sum())
+        print(f"{var}: p-perm={r['p_permutacao']:.4f} | epsilon²={r['epsilon2']:.3f} | "
+              f"{significativos}/{len(r['pares'])} pares com p-Holm<0.05")
+    salvar_pares(posthoc,"rq07_posthoc.csv")
+
+def calcular_rq07(df, top_n=5):
+    """Medianas por linguagem (top N) e p-valores de Kruskal-Wallis da RQ07"""
+    import scipy.stats as stats
+    top_langs=df['primary_language'].value_counts().head(top_n).index
+    subset=df[df['primary_language'].isin(top_langs)]
+    variaveis=[v for v in ["merged_pr_count","releases_count","days_since_update"] if v in df.columns]
+    medianas=subset.groupby("primary_language")[variaveis].median()
+    kruskal_p={}
+    for var in variaveis:
+        groups=[g[var].values for _,g in subset.groupby("primary_language")]
+        if len(groups)>1 and all(len(g)>0 for g in groups):
+            kruskal_p[var]=stats.kruskal(*groups).pvalue
+    return {'medianas': medianas.to_dict(orient='index'), 'kruskal_p': kruskal_p}
+
+# Permutações da RQ07: o relatório usa PERMUTACOES_RQ07; o modo de observação, menos (resolução de p de 0,001)
+PERMUTACOES_RQ07 = 10000
+PERMUTACOES_INTERATIVAS = 1000
+
+def calcular_posthoc_rq07(df, n_permutacoes=None):
+    """Permutação e post-hoc de Dunn por linguagem (RQ07)"""
+    from testes_permutacao import testar_por_grupo
+    variaveis=[v for v in ["merged_pr_count","releases_count","days_since_update"] if v in df.columns]
+    return testar_por_grupo(df,'primary_language',variaveis,n_permutacoes=n_permutacoes or PERMUTACOES_RQ07)
+
+# Colunas cujas medianas têm IC, compartilhados entre gráficos e resumo
+COLUNAS_IC = {'H2': 'merged_pr_count', 'H3': 'releases_count', 'H6': 'issues_ratio'}
+
+def calcular_ic(df, hipotese, metodo='bootstrap'):
+    """IC95% da mediana: 'bootstrap' (5000 reamostragens) ou 'ordem' (estatísticas de ordem, para consultas interativas)"""
+    coluna = COLUNAS_IC[hipotese]
+    if coluna not in df.columns:
+        return None
+    return ic_mediana(df[coluna]) if metodo == 'ordem' else bootstrap_stat(df[coluna].dropna(), np.median)
+
+def calcular_resumo(df, ics=None, metodo_ic='bootstrap'):
+    """Calcula os números do resumo das hipóteses H1-H6 (apenas as disponíveis no df)"""
+    ics = ics or {}
+    resumo = {}
     if 'age_years' in df.columns:
-        print(f"H1 Média idade={df['age_years'].mean():.2f} anos | >5 anos={(df['age_years']>5).mean()*100:.1f}%")
+        resumo['H1'] = {'idade_media_anos': df['age_years'].mean(),
+                        'pct_mais_de_5_anos': (df['age_years'] > 5).mean() * 100}
     if 'merged_pr_count' in df.columns:
-        ic = bootstrap_stat(df['merged_pr_count'], np.median)
-        print(f"H2 Mediana PRs={df['merged_pr_count'].median():.0f} | IC95% [{ic[0]:.0f},{ic[2]:.0f}]")
+        ic = ics['H2'] if ics.get('H2') is not None else calcular_ic(df, 'H2', metodo_ic)
+        resumo['H2'] = {'mediana_prs': df['merged_pr_count'].median(), 'ic95': [ic[0], ic[2]]}
     if 'releases_count' in df.columns:
-        ic = bootstrap_stat(df['releases_count'], np.median)
-        print(f"H3 Mediana Releases={df['releases_count'].median():.0f} | IC95% [{ic[0]:.0f},{ic[2]:.0f}]")
+        ic = ics['H3'] if ics.get('H3') is not None else calcular_ic(df, 'H3', metodo_ic)
+        resumo['H3'] = {'mediana_releases': df['releases_count'].median(), 'ic95': [ic[0], ic[2]]}
     if 'days_since_update' in df.columns:
-        pct = (df['days_since_update']<=90).mean()*100
-        print(f"H4 Atualizados ≤90d={pct:.1f}%")
+        resumo['H4'] = {'pct_atualizados_90d': (df['days_since_update'] <= 90).mean() * 100}
     if 'primary_language' in df.columns:
-        js_py_ts=(df['primary_language'].isin(['JavaScript','Python','TypeScript']).mean()*100)
-        print(f"H5 Linguagens JS+Py+TS={js_py_ts:.1f}%")
+        resumo['H5'] = {'pct_js_py_ts': df['primary_language'].isin(LINGUAGENS_H5).mean() * 100}
     if 'issues_ratio' in df.columns:
-        ic = bootstrap_stat(df['issues_ratio'].dropna(), np.median)
-        print(f"H6 Issues fechadas (mediana)={df['issues_ratio'].median():.2f} | IC95% [{ic[0]:.2f},{ic[2]:.2f}]")
+        ic = ics['H6'] if ics.get('H6') is not None else calcular_ic(df, 'H6', metodo_ic)
+        resumo['H6'] = {'mediana_issues_fechadas': df['issues_ratio'].median(), 'ic95': [ic[0], ic[2]]}
+    return resumo
+
+def generate_summary_report(df, resumo=None):
+    resumo = calcular_resumo(df) if resumo is None else resumo
+    print("="*60, "\nRESUMO HIPÓTESES\n", "="*60)
+    if 'H1' in resumo:
+        print(f"H1 Média idade={resumo['H1']['idade_media_anos']:.2f} anos | >5 anos={resumo['H1']['pct_mais_de_5_anos']:.1f}%")
+    if 'H2' in resumo:
+        ic = resumo['H2']['ic95']
+        print(f"H2 Mediana PRs={resumo['H2']['mediana_prs']:.0f} | IC95% [{ic[0]:.0f},{ic[1]:.0f}]")
+    if 'H3' in resumo:
+        ic = resumo['H3']['ic95']
+        print(f"H3 Mediana Releases={resumo['H3']['mediana_releases']:.0f} | IC95% [{ic[0]:.0f},{ic[1]:.0f}]")
+    if 'H4' in resumo:
+        print(f"H4 Atualizados ≤90d={resumo['H4']['pct_atualizados_90d']:.1f}%")
+    if 'H5' in resumo:
+        print(f"H5 Linguagens JS+Py+TS={resumo['H5']['pct_js_py_ts']:.1f}%")
+    if 'H6' in resumo:
+        ic = resumo['H6']['ic95']
+        print(f"H6 Issues fechadas (mediana)={resumo['H6']['mediana_issues_fechadas']:.2f} | IC95% [{ic[0]:.2f},{ic[1]:.2f}]")
     print("="*60)
 
-def main():
-    csv_arg = sys.argv[1] if len(sys.argv) > 1 else None
-    print("Carregando dados...")
-    df = load_and_process_data(csv_arg)
+for _hipotese in COLUNAS_IC:
+    GRAFO.no(f'ic_{_hipotese.lower()}', 'dados')(lambda df, h=_hipotese: calcular_ic(df, h))
+
+@GRAFO.no('rq07', 'dados')
+def _rq07(df):
+    return calcular_rq07(df) if 'primary_language' in df.columns else None
+
+@GRAFO.no('n_permutacoes')
+def _n_permutacoes():
+    return PERMUTACOES_RQ07
+
+@GRAFO.no('posthoc_rq07', 'dados', 'n_permutacoes')
+def _posthoc_rq07(df, n_permutacoes):
+    return calcular_posthoc_rq07(df, n_permutacoes) if 'primary_language' in df.columns else None
 
-    print(f"Dataset carregado: {len(df)} repositórios\n\nGerando gráficos das hipóteses...")
+@GRAFO.no('resumo', 'dados', 'ic_h2', 'ic_h3', 'ic_h6')
+def _resumo(df, ic_h2, ic_h3, ic_h6):
+    return calcular_resumo(df, {'H2': ic_h2, 'H3': ic_h3, 'H6': ic_h6})
 
-    plot_h1_age_analysis(df)
-    plot_h2_prs_analysis(df)
-    plot_h3_releases_analysis(df)
-    plot_h4_updates_analysis(df)
-    plot_h5_languages_analysis(df)
-    plot_h6_issues_analysis(df)
-    plot_rq07_bonus(df)
+GRAFO.no('H1', 'dados', exclusivo=True)(plot_h1_age_analysis)
+GRAFO.no('H2', 'dados', 'ic_h2', exclusivo=True)(plot_h2_prs_analysis)
+GRAFO.no('H3', 'dados', 'ic_h3', exclusivo=True)(plot_h3_releases_analysis)
+GRAFO.no('H4', 'dados', exclusivo=True)(plot_h4_updates_analysis)
+GRAFO.no('H5', 'dados', exclusivo=True)(plot_h5_languages_analysis)
+GRAFO.no('H6', 'dados', 'ic_h6', exclusivo=True)(plot_h6_issues_analysis)
+GRAFO.no('RQ07', 'dados', 'rq07', 'posthoc_rq07', exclusivo=True)(plot_rq07_bonus)
+GRAFO.no('relatorio', 'dados', 'resumo', exclusivo=True)(generate_summary_report)
+
+# Alvos de --only e os arquivos gerados por cada um
+ALVOS = {
+    'H1': ['h1_idade_repositorios.png'],
+    'H2': ['h2_prs_mescladas.png'],
+    'H3': ['h3_releases.png'],
+    'H4': ['h4_atualizacoes.png'],
+    'H5': ['h5_linguagens.png'],
+    'H6': ['h6_issues.png'],
+    'RQ07': ['rq07_por_linguagem.png', 'rq07_posthoc.csv'],
+    'relatorio': [],
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gráficos das hipóteses H1-H6 e RQ07')
+    parser.add_argument('csv', nargs='?', default=None, help='CSV da coleta (padrão: busca na pasta atual)')
+    parser.add_argument('--only', default=None,
+                        help=f"Alvos separados por vírgula ({', '.join(ALVOS)}); padrão: todos")
+    parser.add_argument('--workers', type=int, default=None, help='Threads para os nós independentes')
+    parser.add_argument('--permutacoes', type=int, default=PERMUTACOES_RQ07, help='Permutações do teste da RQ07')
+    args = parser.parse_args(argv)
+    try:
+        alvos = GRAFO.resolver(args.only) if args.only else list(ALVOS)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("Carregando dados...")
+    avaliacao = GRAFO.avaliacao(df=carregar_csv(args.csv), n_permutacoes=args.permutacoes)
 
-    generate_summary_report(df)
+    print(f"Dataset carregado: {len(avaliacao['dados'])} repositórios\n\nGerando gráficos das hipóteses...")
+    avaliacao.executar(alvos, args.workers)
 
-    print("\nGráficos salvos como PNG:")
-    print("- h1_idade_repositorios.png")
-    print("- h2_prs_mescladas.png")
-    print("- h3_releases.png")
-    print("- h4_atualizacoes.png")
-    print("- h5_linguagens.png")
-    print("- h6_issues.png")
-    print("- rq07_por_linguagem.png")
+    arquivos = [arquivo for alvo in alvos for arquivo in ALVOS.get(alvo, [])]
+    if arquivos:
+        print("\nArquivos gerados:")
+        for arquivo in arquivos:
+            print(f"- {arquivo}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
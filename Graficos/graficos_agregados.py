@@ -0,0 +1,239 @@
+"""
+Gráficos desenhados a partir de agregados calculados com NumPy.
+
+Em vez de passar as linhas brutas ao seaborn (um marcador por repositório no
+scatterplot, KDE sobre todos os pontos, boxplot ordenando cada grupo), cada
+função reduz os dados primeiro a algo pequeno e de tamanho fixo: contagens por
+bin, uma grade 2D de densidade ou as cinco estatísticas do boxplot. O desenho
+(`ax.stairs`, `ax.pcolormesh`, `ax.bxp`) depende só desse agregado, então o
+tempo de renderização não cresce com o número de repositórios.
+
+Contagens em bins de bordas fixas (contar_em_bins) também podem ser somadas
+entre trechos do dataset; histograma_de_contagens e
+estatisticas_box_de_contagens desenham a partir delas, sem as linhas.
+"""
+import inspect
+
+import numpy as np
+import pandas as pd
+
+# Máximo de outliers desenhados por caixa; acima disso são amostrados por quantis
+MAX_OUTLIERS = 200
+
+
+def _valores_finitos(valores):
+    valores = pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+    return valores[np.isfinite(valores)]
+
+
+def _eixo(ax):
+    if ax is None:
+        import matplotlib.pyplot as plt
+        ax = plt.gca()
+    return ax
+
+
+def kde_por_bins(valores, pontos=512, faixa=None):
+    """
+    Estimativa de densidade sobre um histograma fino (suavizado por convolução
+    com um núcleo gaussiano, largura pela regra de Scott). Custo O(n + pontos).
+    Retorna (x, densidade).
+    """
+    valores = _valores_finitos(valores)
+    if len(valores) < 2 or np.ptp(valores) == 0:
+        return np.array([]), np.array([])
+    inicio, fim = faixa if faixa is not None else (valores.min(), valores.max())
+    contagens, bordas = np.histogram(valores, bins=pontos, range=(inicio, fim))
+    passo = bordas[1] - bordas[0]
+    largura = 1.06 * valores.std() * len(valores) ** (-1 / 5)
+    raio = max(1, int(np.ceil(4 * largura / passo)))
+    deslocamentos = np.arange(-raio, raio + 1) * passo
+    nucleo = np.exp(-0.5 * (deslocamentos / largura) ** 2)
+    densidade = np.convolve(contagens, nucleo / nucleo.sum(), mode='same') / (len(valores) * passo)
+    return (bordas[:-1] + bordas[1:]) / 2, densidade
+
+
+def histograma(valores, bins=30, ax=None, kde=False, label=None, alpha=0.7, **kwargs):
+    """Histograma a partir de np.histogram; com kde=True sobrepõe kde_por_bins na mesma escala"""
+    ax = _eixo(ax)
+    valores = _valores_finitos(valores)
+    contagens, bordas = np.histogram(valores, bins=bins)
+    ax.stairs(contagens, bordas, fill=True, alpha=alpha, label=label, **kwargs)
+    if kde and len(valores) > 1:
+        x, densidade = kde_por_bins(valores, faixa=(bordas[0], bordas[-1]))
+        ax.plot(x, densidade * len(valores) * (bordas[1] - bordas[0]))
+    ax.set_ylabel('Contagem')
+    return contagens, bordas
+
+
+def estatisticas_box(valores, rotulo='', whis=1.5, max_outliers=MAX_OUTLIERS):
+    """Cinco estatísticas do boxplot (no formato de ax.bxp), com outliers limitados a max_outliers"""
+    valores = _valores_finitos(valores)
+    if len(valores) == 0:
+        return {'label': rotulo, 'med': np.nan, 'q1': np.nan, 'q3': np.nan,
+                'whislo': np.nan, 'whishi': np.nan, 'fliers': np.array([])}
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = valores[(valores >= q1 - whis * iqr) & (valores <= q3 + whis * iqr)]
+    fora = valores[(valores < q1 - whis * iqr) | (valores > q3 + whis * iqr)]
+    if len(fora) > max_outliers:
+        fora = np.quantile(fora, np.linspace(0, 1, max_outliers))
+    return {'label': rotulo, 'med': mediana, 'q1': q1, 'q3': q3,
+            'whislo': dentro.min(), 'whishi': dentro.max(), 'fliers': fora}
+
+
+def bordas_contagem(maximo=1e7, gama=1.01):
+    """Bordas fixas para contagens: bins [k, k+1) até 100 e depois geométricos com razão `gama` até `maximo`"""
+    passos = int(np.ceil(np.log(maximo / 100) / np.log(gama)))
+    return np.concatenate((np.arange(0, 100, dtype=float), 100 * gama ** np.arange(passos + 1)))
+
+
+def representantes(bordas):
+    """Valor de cada bin: centro nos bins lineares; nos de contagem, a borda (inteiros) ou a média geométrica"""
+    inferior, superior = bordas[:-1], bordas[1:]
+    if np.allclose(np.diff(bordas), bordas[1] - bordas[0]):
+        return (inferior + superior) / 2
+    return np.where(superior - inferior == 1, inferior, np.sqrt(inferior * superior))
+
+
+def bins_de(valores, bordas):
+    """Bin de cada valor nas bordas fixas (valores fora da faixa vão para o primeiro/último bin)"""
+    return np.clip(np.searchsorted(bordas, valores, side='right') - 1, 0, len(bordas) - 2)
+
+
+def contar_em_bins(valores, bordas):
+    """Contagens por bin de bordas fixas: somáveis entre trechos diferentes do dataset"""
+    return np.bincount(bins_de(_valores_finitos(valores), bordas), minlength=len(bordas) - 1)
+
+
+def contagens_por_valor(valores):
+    """Valores distintos e suas contagens: o esboço exato de uma coluna, no formato (contagens, valores_bins)"""
+    valores, contagens = np.unique(_valores_finitos(valores), return_counts=True)
+    return contagens, valores
+
+
+def quantis_do_histograma(histograma, valores_bins, quantis):
+    """Quantis (interpolação linear entre postos, como no pandas) de cada linha de um histograma grupos × bins"""
+    acumulado = histograma.cumsum(axis=1)
+    total = acumulado[:, -1]
+
+    def valor_no_posto(posto):
+        # bin do posto (base 0): o primeiro em que o acumulado passa do posto
+        return valores_bins[(acumulado > posto[:, None]).argmax(axis=1)]
+
+    resultados = []
+    for q in quantis:
+        posto = np.maximum(total - 1, 0) * q
+        baixo, alto = np.floor(posto), np.ceil(posto)
+        valor = valor_no_posto(baixo) + (valor_no_posto(alto) - valor_no_posto(baixo)) * (posto - baixo)
+        resultados.append(np.where(total > 0, valor, np.nan))
+    return resultados
+
+
+def histograma_de_contagens(contagens, valores_bins, bins=30, ax=None, label=None, alpha=0.7, **kwargs):
+    """Como histograma(), a partir de contagens em bins finos: reagrupa em `bins` bins entre o menor e o maior valor"""
+    ax = _eixo(ax)
+    usados = contagens > 0
+    if not usados.any():
+        return np.zeros(bins), np.linspace(0, 1, bins + 1)
+    faixa = (valores_bins[usados].min(), valores_bins[usados].max())
+    grossas, bordas = np.histogram(valores_bins[usados], bins=bins, range=faixa, weights=contagens[usados])
+    ax.stairs(grossas, bordas, fill=True, alpha=alpha, label=label, **kwargs)
+    ax.set_ylabel('Contagem')
+    return grossas, bordas
+
+
+def estatisticas_box_de_contagens(contagens, valores_bins, rotulo='', whis=1.5, max_outliers=MAX_OUTLIERS):
+    """Como estatisticas_box(), com quartis e extremos tirados de contagens em bins finos"""
+    if contagens.sum() == 0:
+        return estatisticas_box([], rotulo)
+    q1, mediana, q3 = (q[0] for q in quantis_do_histograma(contagens[None, :], valores_bins, (0.25, 0.5, 0.75)))
+    iqr = q3 - q1
+    usados = valores_bins[contagens > 0]
+    dentro = usados[(usados >= q1 - whis * iqr) & (usados <= q3 + whis * iqr)]
+    fora = usados[(usados < q1 - whis * iqr) | (usados > q3 + whis * iqr)]
+    if len(fora) > max_outliers:
+        fora = np.quantile(fora, np.linspace(0, 1, max_outliers))
+    return {'label': rotulo, 'med': mediana, 'q1': q1, 'q3': q3,
+            'whislo': dentro.min() if len(dentro) else q1, 'whishi': dentro.max() if len(dentro) else q3,
+            'fliers': fora}
+
+
+def _orientacao(ax, vert):
+    # matplotlib >= 3.10 usa orientation; versões anteriores, vert
+    if 'orientation' in inspect.signature(ax.bxp).parameters:
+        return {'orientation': 'vertical' if vert else 'horizontal'}
+    return {'vert': vert}
+
+
+def boxplot(valores, ax=None, vert=True, rotulo=''):
+    ax = _eixo(ax)
+    ax.bxp([estatisticas_box(valores, rotulo)], showfliers=True, patch_artist=True, **_orientacao(ax, vert))
+    return ax
+
+
+def boxplot_de_contagens(contagens, valores_bins, ax=None, vert=True, rotulo=''):
+    ax = _eixo(ax)
+    ax.bxp([estatisticas_box_de_contagens(contagens, valores_bins, rotulo)], showfliers=True, patch_artist=True,
+           **_orientacao(ax, vert))
+    return ax
+
+
+def estatisticas_agrupadas(df, grupo, valor, ordem=None):
+    """Estatísticas do boxplot de cada grupo, tiradas de uma ordenação única por (grupo, valor)"""
+    codigos, nomes = pd.factorize(df[grupo])
+    valores = pd.to_numeric(df[valor], errors='coerce').to_numpy(dtype=float)
+    validos = (codigos >= 0) & np.isfinite(valores)
+    codigos, valores = codigos[validos], valores[validos]
+    ordenacao = np.lexsort((valores, codigos))
+    codigos, valores = codigos[ordenacao], valores[ordenacao]
+    inicios = np.searchsorted(codigos, np.arange(len(nomes)))
+    fins = np.searchsorted(codigos, np.arange(len(nomes)), side='right')
+    fatias = {nome: valores[i:f] for nome, i, f in zip(nomes, inicios, fins)}
+
+    ordem = list(ordem) if ordem is not None else list(nomes)
+    return [estatisticas_box(fatias.get(nome, []), str(nome)) for nome in ordem]
+
+
+def boxplot_agrupado(df, grupo, valor, ax=None, ordem=None):
+    """Um box por grupo (estatisticas_agrupadas)"""
+    ax = _eixo(ax)
+    estatisticas = estatisticas_agrupadas(df, grupo, valor, ordem)
+    ax.bxp(estatisticas, showfliers=True, patch_artist=True)
+    ax.set_xlabel(grupo)
+    ax.set_ylabel(valor)
+    return estatisticas
+
+
+def densidade_2d(x, y, ax=None, bins=100, log_x=False, log_y=False, cmap='viridis'):
+    """
+    Substitui o scatterplot: conta os pontos numa grade bins × bins (np.histogram2d,
+    com bordas logarítmicas nos eixos log) e desenha a grade com pcolormesh.
+    """
+    from matplotlib.colors import LogNorm
+    ax = _eixo(ax)
+    x = pd.to_numeric(pd.Series(x), errors='coerce').to_numpy(dtype=float)
+    y = pd.to_numeric(pd.Series(y), errors='coerce').to_numpy(dtype=float)
+    validos = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        validos &= x > 0
+    if log_y:
+        validos &= y > 0
+    x, y = x[validos], y[validos]
+    if len(x) == 0:
+        return None
+
+    def _bordas(v, log):
+        if log:
+            return np.logspace(np.log10(v.min()), np.log10(v.max()) + 1e-9, bins + 1)
+        return np.linspace(v.min(), v.max() + 1e-9, bins + 1)
+
+    contagens, bordas_x, bordas_y = np.histogram2d(x, y, bins=[_bordas(x, log_x), _bordas(y, log_y)])
+    malha = ax.pcolormesh(bordas_x, bordas_y, np.ma.masked_equal(contagens.T, 0), cmap=cmap,
+                          norm=LogNorm(vmin=1, vmax=max(contagens.max(), 1)))
+    ax.figure.colorbar(malha, ax=ax, label='Repositórios')
+    if log_x:
+        ax.set_xscale('log')
+    if log_y:
+        ax.set_yscale('log')
+    return contagens
@@ -0,0 +1,179 @@
+"""
+Execução das análises como um grafo de dependências avaliado sob demanda.
+
+Cada nó é uma função registrada com os nomes dos nós de que depende (colunas
+derivadas -> estatísticas -> figuras/textos). Pedir um alvo calcula só ele e
+suas dependências, cada uma uma única vez; nós independentes rodam em paralelo
+num pool de threads. Nós exclusivos (figuras e relatórios impressos) rodam um
+de cada vez na thread principal, porque o pyplot guarda estado global e os
+backends interativos exigem a thread principal.
+
+O grafo BASE deriva do DataFrame bruto as colunas de tempo (idade, dias desde
+a atualização/push), aceitando o esquema da sprint 2, o de
+analise_hipoteses.py e o do GitHubAnalyzer. graficos.py e analise_hipoteses.py
+estendem esse grafo com seus nós; o GitHubAnalyzer usa derivar_colunas.
+
+    avaliacao = GRAFO.avaliacao(df=df)
+    avaliacao.executar(['H2', 'RQ07'])
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+
+class Grafo:
+    def __init__(self, nos=None):
+        self.nos = dict(nos or {})  # nome -> (função, dependências, exclusivo)
+
+    def no(self, nome, *dependencias, exclusivo=False):
+        """Decorador que registra `nome`, calculado pela função a partir das dependências"""
+        def registrar(funcao):
+            self.nos[nome] = (funcao, dependencias, exclusivo)
+            return funcao
+        return registrar
+
+    def estender(self):
+        """Cópia do grafo, para acrescentar nós sem alterar o original"""
+        return Grafo(self.nos)
+
+    def resolver(self, nomes):
+        """Nomes dos nós sem diferenciar maiúsculas (ex.: 'h2,rq07' -> ['H2', 'RQ07'])"""
+        por_nome = {nome.lower(): nome for nome in self.nos}
+        if isinstance(nomes, str):
+            nomes = [n for n in nomes.split(',') if n.strip()]
+        resolvidos = []
+        for nome in nomes:
+            if nome.strip().lower() not in por_nome:
+                raise ValueError(f"Nó desconhecido: {nome}. Opções: {', '.join(self.nos)}")
+            resolvidos.append(por_nome[nome.strip().lower()])
+        return resolvidos
+
+    def fechamento(self, alvos, disponiveis=()):
+        """Alvos e todas as suas dependências em ordem topológica, sem os já disponíveis"""
+        ordem, visitando = [], set()
+
+        def visitar(nome):
+            if nome in disponiveis or nome in ordem:
+                return
+            if nome not in self.nos:
+                raise ValueError(f"Nó desconhecido: {nome}")
+            if nome in visitando:
+                raise ValueError(f"Ciclo no grafo de análise passando por {nome}")
+            visitando.add(nome)
+            for dependencia in self.nos[nome][1]:
+                visitar(dependencia)
+            visitando.discard(nome)
+            ordem.append(nome)
+
+        for alvo in alvos:
+            visitar(alvo)
+        return ordem
+
+    def avaliacao(self, **entradas):
+        return Avaliacao(self, entradas)
+
+
+class Avaliacao:
+    """Valores calculados de um grafo para um conjunto de entradas (cache por nó)"""
+
+    def __init__(self, grafo, entradas):
+        self.grafo = grafo
+        self.valores = dict(entradas)
+
+    def _calcular(self, nome):
+        funcao, dependencias, _ = self.grafo.nos[nome]
+        return funcao(*[self.valores[d] for d in dependencias])
+
+    def __getitem__(self, nome):
+        """Valor de um nó, calculando em sequência o que faltar"""
+        for pendente in self.grafo.fechamento([nome], self.valores):
+            self.valores[pendente] = self._calcular(pendente)
+        return self.valores[nome]
+
+    def executar(self, alvos, workers=None):
+        """Calcula os alvos; cada nó é enviado ao pool assim que suas dependências ficam prontas"""
+        ordem = self.grafo.fechamento(alvos, self.valores)
+        faltando = {nome: {d for d in self.grafo.nos[nome][1] if d not in self.valores} for nome in ordem}
+        dependentes = {nome: [] for nome in ordem}
+        for nome in ordem:
+            for dependencia in faltando[nome]:
+                dependentes[dependencia].append(nome)
+
+        prontos = [nome for nome in ordem if not faltando[nome]]
+        exclusivos = deque()
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                                thread_name_prefix="analise") as executor:
+            futuros = {}
+            while prontos or futuros or exclusivos:
+                for nome in prontos:
+                    if self.grafo.nos[nome][2]:
+                        exclusivos.append(nome)
+                    else:
+                        futuros[executor.submit(self._calcular, nome)] = nome
+                prontos = []
+                if exclusivos:
+                    # Enquanto a thread principal desenha, o pool continua com os demais nós
+                    nome = exclusivos.popleft()
+                    concluidos = [(nome, self._calcular(nome))]
+                else:
+                    feitos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                    concluidos = [(futuros.pop(futuro), futuro.result()) for futuro in feitos]
+                for nome, valor in concluidos:
+                    self.valores[nome] = valor
+                    for dependente in dependentes[nome]:
+                        faltando[dependente].discard(nome)
+                        if not faltando[dependente]:
+                            prontos.append(dependente)
+        return {alvo: self.valores[alvo] for alvo in alvos}
+
+
+# Colunas de data aceitas, na ordem de preferência (sprint 2, analise_hipoteses, GitHubAnalyzer)
+COLUNAS_DATA = {
+    'criacao': ('data_criacao', 'criado_em', 'created_at'),
+    'atualizacao': ('ultima_atualizacao', 'atualizado_em', 'updated_at'),
+    'push': ('ultimo_push', 'pushed_at'),
+}
+
+BASE = Grafo()
+
+
+@BASE.no('agora')
+def _agora():
+    return pd.Timestamp.now(tz='UTC').tz_convert(None)
+
+
+@BASE.no('datas', 'df')
+def _datas(df):
+    """Datas em UTC sem fuso; só as que existem no DataFrame"""
+    datas = {}
+    for nome, candidatas in COLUNAS_DATA.items():
+        coluna = next((c for c in candidatas if c in df.columns), None)
+        if coluna is not None:
+            datas[nome] = pd.to_datetime(df[coluna], errors='coerce', utc=True).dt.tz_convert(None)
+    return datas
+
+
+@BASE.no('idade_dias', 'datas', 'agora')
+def _idade_dias(datas, agora):
+    return (agora - datas['criacao']).dt.days if 'criacao' in datas else None
+
+
+@BASE.no('dias_desde_atualizacao', 'datas', 'agora')
+def _dias_desde_atualizacao(datas, agora):
+    return (agora - datas['atualizacao']).dt.days if 'atualizacao' in datas else None
+
+
+@BASE.no('dias_desde_push', 'datas', 'agora')
+def _dias_desde_push(datas, agora):
+    """Dias desde o último push; sem a coluna de push, desde a última atualização"""
+    ultima = datas.get('push', datas.get('atualizacao'))
+    return (agora - ultima).dt.days if ultima is not None else None
+
+
+def derivar_colunas(df, nomes=('idade_dias', 'dias_desde_atualizacao', 'dias_desde_push'), agora=None):
+    """Calcula as colunas derivadas do grafo BASE (None para as que faltam dados)"""
+    entradas = {'df': df} if agora is None else {'df': df, 'agora': agora}
+    avaliacao = BASE.avaliacao(**entradas)
+    return {nome: avaliacao[nome] for nome in nomes}
@@ -0,0 +1,369 @@
+"""
+Modo de observação: mantém os gráficos e o resumo das hipóteses atualizados
+enquanto a coleta ainda está gravando o dataset.
+
+Observa um CSV (ou o diretório de partições da coleta distribuída,
+parte-*.csv) e, a cada mudança, espera o arquivo ficar estável por alguns
+segundos (debounce) antes de processar. Só o que mudou é lido e processado:
+
+- linhas anexadas ao final do CSV viram um novo bloco; as antigas não são relidas
+  (o cabeçalho e os últimos 64 KiB já lidos precisam continuar iguais);
+- no diretório de partições, só as partições novas ou alteradas são relidas;
+- um CSV reescrito (ou comprimido) é relido por inteiro.
+
+Cada bloco guarda, por coluna, a soma dos hashes das linhas e agregados
+somáveis: contagens e somas do resumo, contagens por linguagem e esboços
+(contagens em bins de bordas fixas, as mesmas do cubo_hipoteses.py). Os totais
+são atualizados somando o bloco novo (e subtraindo o bloco que ele substitui),
+e os gráficos e o resumo são montados a partir dos totais, sem as linhas.
+Assim, o custo de uma atualização acompanha o tamanho da mudança; o desenho
+de cada figura tem custo fixo. Medianas, quartis e ICs (estatísticas de
+ordem) saem dos esboços, com erro relativo abaixo de 0,5% nas contagens, 0,05
+ano na idade e 0,001 na fração de issues; o relatório exato continua sendo o
+de graficos.py. O RQ07 (testes de permutação) precisa das linhas e, se pedido,
+é recalculado sobre o dataset inteiro, com 1000 permutações por padrão
+(--permutacoes; o relatório de graficos.py usa 10000).
+
+Um gráfico só é redesenhado quando o hash de alguma das suas colunas de
+entrada muda. A data de referência (idade, dias desde a atualização) é fixada
+no início da observação, para que blocos lidos em momentos diferentes sejam
+comparáveis. Repositórios repetidos entre partições não são deduplicados
+(use coleta_distribuida.py mesclar para o dataset final).
+
+    python observador_analise.py repositorios_populares_github.csv
+    python observador_analise.py partes/ --figuras H2,H4 --debounce 5
+"""
+import argparse
+import glob
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import graficos
+from cubo_hipoteses import METRICAS
+from graficos_agregados import bins_de, estatisticas_box_de_contagens, quantis_do_histograma, representantes
+
+# Colunas (após processar_dados) de que cada gráfico depende
+ENTRADAS_FIGURAS = {
+    'H1': ['age_years'],
+    'H2': ['merged_pr_count'],
+    'H3': ['releases_count'],
+    'H4': ['days_since_update'],
+    'H5': ['primary_language', 'merged_pr_count', 'releases_count'],
+    'H6': ['issues_ratio'],
+    'RQ07': ['primary_language', 'merged_pr_count', 'releases_count', 'days_since_update'],
+}
+# RQ07 roda testes de permutação sobre todo o dataset; só é redesenhado se pedido
+FIGURAS_PADRAO = ['H1', 'H2', 'H3', 'H4', 'H5', 'H6']
+
+# Bordas fixas dos esboços (as do cubo): esboços de blocos diferentes se somam bin a bin
+BORDAS = {coluna: definicao['bordas'] for coluna, definicao in METRICAS.items()}
+VALORES_BINS = {coluna: representantes(bordas) for coluna, bordas in BORDAS.items()}
+COLUNAS_POR_LINGUAGEM = ['merged_pr_count', 'releases_count']
+
+def _esboco(valores, bordas):
+    """Bins não vazios e suas contagens (forma esparsa do esboço de um bloco)"""
+    valores = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=float)
+    return np.unique(bins_de(valores[np.isfinite(valores)], bordas), return_counts=True)
+
+
+def ic_mediana_esboco(contagens, valores_bins, z=1.96):
+    """Como graficos.ic_mediana, com as estatísticas de ordem lidas do esboço: [inferior, mediana, superior]"""
+    n = int(contagens.sum())
+    if n == 0:
+        return np.array([np.nan, np.nan, np.nan])
+    inferior = max(int(np.floor((n - z * np.sqrt(n)) / 2)), 0)
+    superior = min(int(np.ceil((n + z * np.sqrt(n)) / 2)), n - 1)
+    acumulado = np.cumsum(contagens)
+    mediana = quantis_do_histograma(contagens[None, :], valores_bins, (0.5,))[0][0]
+    return np.array([valores_bins[np.searchsorted(acumulado, inferior, side='right')], mediana,
+                     valores_bins[np.searchsorted(acumulado, superior, side='right')]])
+
+
+class Bloco:
+    """Agregados somáveis e hash por coluna de um trecho do dataset"""
+
+    def __init__(self, bruto, agora, manter_linhas=False):
+        df = graficos.processar_dados(bruto, agora)
+        # As linhas só ficam guardadas para o RQ07
+        self.df = df if manter_linhas else None
+        self.hashes = {coluna: int(pd.util.hash_pandas_object(df[coluna], index=False).sum())
+                       for coluna in df.columns}
+        self.agregados = {'linhas': len(df)}
+        if 'age_years' in df.columns:
+            self.agregados.update(soma_idade=df['age_years'].sum(), n_idade=int(df['age_years'].notna().sum()),
+                                  mais_de_5_anos=int((df['age_years'] > 5).sum()))
+        if 'days_since_update' in df.columns:
+            self.agregados['ate_90_dias'] = int((df['days_since_update'] <= 90).sum())
+        self.esbocos = {coluna: _esboco(df[coluna], bordas) for coluna, bordas in BORDAS.items() if coluna in df.columns}
+        self.linguagens, self.por_linguagem = {}, {}
+        if 'primary_language' in df.columns:
+            self.agregados['js_py_ts'] = int(df['primary_language'].isin(graficos.LINGUAGENS_H5).sum())
+            self.linguagens = df['primary_language'].value_counts().to_dict()
+            grupos = df.groupby('primary_language')
+            self.por_linguagem = {coluna: {linguagem: _esboco(valores, BORDAS[coluna])
+                                           for linguagem, valores in grupos[coluna]}
+                                  for coluna in COLUNAS_POR_LINGUAGEM if coluna in df.columns}
+
+
+class Totais:
+    """Soma dos agregados dos blocos, atualizada bloco a bloco (sinal -1 retira um bloco)"""
+
+    def __init__(self):
+        self.agregados = {}
+        self.esbocos = {}
+        self.linguagens = {}
+        self.por_linguagem = {}
+
+    @staticmethod
+    def _somar_esboco(destino, chave, esboco, bordas, sinal):
+        total = destino.setdefault(chave, np.zeros(len(bordas) - 1, dtype=np.int64))
+        np.add.at(total, esboco[0], sinal * esboco[1])
+
+    def somar(self, bloco, sinal=1):
+        for nome, valor in bloco.agregados.items():
+            self.agregados[nome] = self.agregados.get(nome, 0) + sinal * valor
+        for coluna, esboco in bloco.esbocos.items():
+            self._somar_esboco(self.esbocos, coluna, esboco, BORDAS[coluna], sinal)
+        for linguagem, contagem in bloco.linguagens.items():
+            self.linguagens[linguagem] = self.linguagens.get(linguagem, 0) + sinal * contagem
+        for coluna, esbocos in bloco.por_linguagem.items():
+            destino = self.por_linguagem.setdefault(coluna, {})
+            for linguagem, esboco in esbocos.items():
+                self._somar_esboco(destino, linguagem, esboco, BORDAS[coluna], sinal)
+
+
+class FonteCSV:
+    """Um CSV que cresce por anexação; reescritas e arquivos comprimidos são relidos por inteiro"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._compressao = graficos.compressao_do_csv(caminho)
+        self._prefixo = None
+        self._colunas = None
+        self._proximo = 0
+
+    def assinatura(self):
+        info = os.stat(self.caminho)
+        return info.st_size, info.st_mtime_ns
+
+    def mudancas(self):
+        """(substituir_tudo, {chave: DataFrame bruto}) desde a última leitura"""
+        if self._prefixo is not None and self._prefixo.apenas_anexado(self.caminho):
+            with open(self.caminho, 'rb') as arquivo:
+                arquivo.seek(self._prefixo.offset)
+                novos = arquivo.read()
+            # Uma linha ainda incompleta fica para a próxima leitura
+            novos = novos[:novos.rfind(b'\n') + 1]
+            if not novos:
+                return False, {}
+            self._prefixo.avancar(novos)
+            self._proximo += 1
+            return False, {self._proximo: pd.read_csv(io.BytesIO(novos), header=None, names=self._colunas)}
+
+        with open(self.caminho, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        bruto = pd.read_csv(io.BytesIO(conteudo), compression=self._compressao)
+        self._colunas = list(bruto.columns)
+        self._prefixo = graficos.PrefixoLido(conteudo) if self._compressao is None else None
+        self._proximo = 0
+        return True, {0: bruto}
+
+
+class FonteParticoes:
+    """Diretório de partições (parte-*.csv): relê só as partições novas ou alteradas"""
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self._vistos = {}
+
+    def _arquivos(self):
+        arquivos = {}
+        for extensao in graficos.EXTENSOES_CSV:
+            for caminho in glob.glob(os.path.join(self.diretorio, f"*{extensao}")):
+                info = os.stat(caminho)
+                arquivos[os.path.basename(caminho)] = (info.st_size, info.st_mtime_ns)
+        return arquivos
+
+    def assinatura(self):
+        return tuple(sorted(self._arquivos().items()))
+
+    def mudancas(self):
+        atuais = self._arquivos()
+        alterados = {}
+        for nome, estado in atuais.items():
+            if self._vistos.get(nome) != estado:
+                caminho = os.path.join(self.diretorio, nome)
+                alterados[nome] = pd.read_csv(caminho, compression=graficos.compressao_do_csv(caminho) or "infer")
+        removidos = {nome: None for nome in self._vistos if nome not in atuais}
+        self._vistos = atuais
+        return False, {**alterados, **removidos}
+
+
+class Observador:
+    def __init__(self, caminho, figuras=FIGURAS_PADRAO, n_permutacoes=graficos.PERMUTACOES_INTERATIVAS):
+        self.fonte = FonteParticoes(caminho) if os.path.isdir(caminho) else FonteCSV(caminho)
+        self.figuras = figuras
+        self.n_permutacoes = n_permutacoes
+        self.agora = pd.Timestamp.now(tz='UTC').tz_convert(None)
+        self.blocos = {}
+        self.totais = Totais()
+        self._desenhadas = {}  # figura -> hashes das entradas no último desenho
+
+    def atualizar(self):
+        """Processa as mudanças da fonte; retorna o número de linhas lidas"""
+        inicio = time.perf_counter()
+        substituir, mudancas = self.fonte.mudancas()
+        if substituir:
+            self.blocos, self.totais = {}, Totais()
+        linhas = 0
+        for chave, bruto in mudancas.items():
+            anterior = self.blocos.pop(chave, None)
+            if anterior is not None:
+                self.totais.somar(anterior, -1)
+            if bruto is not None and len(bruto):
+                self.blocos[chave] = Bloco(bruto, self.agora, manter_linhas='RQ07' in self.figuras)
+                self.totais.somar(self.blocos[chave])
+                linhas += len(bruto)
+        print(f"{linhas} linhas processadas em {time.perf_counter() - inicio:.2f} s "
+              f"({self.totais.agregados.get('linhas', 0)} repositórios)")
+        return linhas
+
+    def _hashes_entradas(self, figura):
+        # Soma dos hashes das linhas (mod 2^64): não depende de como as linhas estão divididas em blocos
+        return tuple(sum(b.hashes[coluna] for b in self.blocos.values() if coluna in b.hashes) % 2 ** 64
+                     for coluna in ENTRADAS_FIGURAS[figura])
+
+    def _ic(self, coluna):
+        return ic_mediana_esboco(self.totais.esbocos[coluna], VALORES_BINS[coluna])
+
+    def resumo(self):
+        """Mesmo formato de graficos.calcular_resumo, montado a partir dos totais"""
+        soma = self.totais.agregados
+        linhas = max(soma.get('linhas', 0), 1)
+        resumo = {}
+        if soma.get('n_idade'):
+            resumo['H1'] = {'idade_media_anos': soma['soma_idade'] / soma['n_idade'],
+                            'pct_mais_de_5_anos': soma['mais_de_5_anos'] / linhas * 100}
+        for hipotese, coluna, chave in (('H2', 'merged_pr_count', 'mediana_prs'),
+                                        ('H3', 'releases_count', 'mediana_releases'),
+                                        ('H6', 'issues_ratio', 'mediana_issues_fechadas')):
+            if coluna in self.totais.esbocos:
+                ic = self._ic(coluna)
+                resumo[hipotese] = {chave: ic[1], 'ic95': [ic[0], ic[2]]}
+        if 'ate_90_dias' in soma:
+            resumo['H4'] = {'pct_atualizados_90d': soma['ate_90_dias'] / linhas * 100}
+        if 'js_py_ts' in soma:
+            resumo['H5'] = {'pct_js_py_ts': soma['js_py_ts'] / linhas * 100}
+        # Mesma ordem das chaves que calcular_resumo
+        return {h: resumo[h] for h in ('H1', 'H2', 'H3', 'H4', 'H5', 'H6') if h in resumo}
+
+    # O desenho é o mesmo de graficos.py (plot_*_de_contagens), aqui a partir dos esboços somados
+    def _desenhar_distribuicao(self, figura):
+        coluna = graficos.FIGURAS_DISTRIBUICAO[figura]['coluna']
+        if coluna not in self.totais.esbocos:
+            print(f"{figura}: pulado (coluna '{coluna}' ausente).")
+            return
+        graficos.plot_distribuicao_de_contagens(figura, self.totais.esbocos[coluna], VALORES_BINS[coluna],
+                                                ic=None if figura == 'H1' else self._ic(coluna))
+
+    def _desenhar_h4(self):
+        if 'days_since_update' not in self.totais.esbocos:
+            print("H4: pulado (coluna 'days_since_update' ausente).")
+            return
+        graficos.plot_h4_de_contagens(self.totais.esbocos['days_since_update'], VALORES_BINS['days_since_update'],
+                                      self.totais.agregados['ate_90_dias'])
+
+    def _desenhar_h5(self):
+        if not self.totais.linguagens:
+            print("H5: pulado (coluna 'primary_language' ausente).")
+            return
+        linguagens = pd.Series(self.totais.linguagens)
+        top5 = linguagens.sort_values(ascending=False, kind='stable').index[:5]
+        caixas = {}
+        for coluna, esbocos in self.totais.por_linguagem.items():
+            vazio = np.zeros(len(BORDAS[coluna]) - 1, dtype=np.int64)
+            caixas[coluna] = [estatisticas_box_de_contagens(esbocos.get(linguagem, vazio), VALORES_BINS[coluna],
+                                                            str(linguagem)) for linguagem in top5]
+        graficos.plot_h5_de_contagens(linguagens, caixas, self.totais.agregados['js_py_ts'],
+                                      self.totais.agregados['linhas'])
+
+    def _desenhar_rq07(self):
+        partes = [b.df for b in self.blocos.values() if b.df is not None]
+        graficos.plot_rq07_bonus(pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(),
+                                 n_permutacoes=self.n_permutacoes)
+
+    def desenhar(self):
+        """Redesenha só as figuras cujas colunas de entrada mudaram; retorna as redesenhadas"""
+        import matplotlib.pyplot as plt
+        redesenhadas = []
+        for figura in self.figuras:
+            hashes = self._hashes_entradas(figura)
+            if self._desenhadas.get(figura) == hashes:
+                continue
+            if figura in graficos.FIGURAS_DISTRIBUICAO:
+                self._desenhar_distribuicao(figura)
+            else:
+                {'H4': self._desenhar_h4, 'H5': self._desenhar_h5, 'RQ07': self._desenhar_rq07}[figura]()
+            plt.close('all')
+            self._desenhadas[figura] = hashes
+            redesenhadas.append(figura)
+        return redesenhadas
+
+    def ciclo(self):
+        self.atualizar()
+        redesenhadas = self.desenhar()
+        print(f"Gráficos redesenhados: {', '.join(redesenhadas) or 'nenhum (entradas inalteradas)'}")
+        graficos.generate_summary_report(None, self.resumo())
+
+
+def observar(caminho, figuras=FIGURAS_PADRAO, intervalo=1.0, debounce=2.0,
+             n_permutacoes=graficos.PERMUTACOES_INTERATIVAS):
+    import matplotlib
+    matplotlib.use('Agg')  # sem janelas: plt.show() não bloqueia o laço
+    observador = Observador(caminho, figuras, n_permutacoes)
+    observador.ciclo()
+    ultima = observador.fonte.assinatura()
+    print(f"Observando {caminho} (Ctrl+C para sair)...")
+    try:
+        while True:
+            time.sleep(intervalo)
+            assinatura = observador.fonte.assinatura()
+            if assinatura == ultima:
+                continue
+            # Debounce: só processa quando a fonte para de mudar por `debounce` segundos
+            while True:
+                time.sleep(debounce)
+                estavel = observador.fonte.assinatura()
+                if estavel == assinatura:
+                    break
+                assinatura = estavel
+            ultima = assinatura
+            observador.ciclo()
+    except KeyboardInterrupt:
+        print("\nObservação encerrada.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Atualiza gráficos e resumo das hipóteses quando o dataset muda')
+    parser.add_argument('caminho', help='CSV da coleta ou diretório de partições (parte-*.csv)')
+    parser.add_argument('--figuras', default=','.join(FIGURAS_PADRAO),
+                        help=f"Figuras mantidas atualizadas ({', '.join(ENTRADAS_FIGURAS)})")
+    parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre verificações')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                        help='Segundos sem mudanças antes de processar')
+    parser.add_argument('--permutacoes', type=int, default=graficos.PERMUTACOES_INTERATIVAS,
+                        help='Permutações do teste da RQ07 a cada redesenho')
+    args = parser.parse_args(argv)
+    figuras = [f.strip().upper() for f in args.figuras.split(',') if f.strip()]
+    desconhecidas = [f for f in figuras if f not in ENTRADAS_FIGURAS]
+    if desconhecidas:
+        parser.error(f"Figuras desconhecidas: {', '.join(desconhecidas)}")
+    observar(args.caminho, figuras, args.intervalo, args.debounce, args.permutacoes)
+
+
+if __name__ == "__main__":
+    main()
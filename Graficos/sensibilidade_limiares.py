@@ -0,0 +1,169 @@
+"""
+Sensibilidade dos vereditos H1-H6 ao limiar de cada hipótese.
+
+Cada veredito depende de um limiar fixo (5 anos, 100 PRs, 10 releases, 90
+dias, 70% de issues fechadas). Aqui cada coluna é ordenada uma única vez e,
+com np.searchsorted, milhares de limiares são avaliados de uma vez. Para cada
+limiar, a tabela traz:
+
+- proporcao: fração dos repositórios além do limiar (acima; em H4, abaixo), com IC95% de Wilson;
+- veredito: se a mediana está além do limiar (o critério de analise_hipoteses.py);
+- prob_bootstrap: fração das reamostragens bootstrap em que a mediana fica além do
+  limiar. Na reamostragem, o número de repositórios além do limiar segue uma
+  Binomial(n, proporcao), então essa fração é calculada exatamente pela binomial,
+  sem reamostrar.
+
+H5 (linguagens) não tem limiar numérico e fica de fora.
+
+    python sensibilidade_limiares.py repositorios_populares_github.csv --pontos 5000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# coluna (após processar_dados), limiar usado no veredito, sentido e escala da grade
+HIPOTESES = {
+    'H1': {'coluna': 'age_years', 'limiar': 5, 'sentido': 'acima', 'escala': 'linear', 'rotulo': 'Idade (anos)'},
+    'H2': {'coluna': 'merged_pr_count', 'limiar': 100, 'sentido': 'acima', 'escala': 'log', 'rotulo': 'PRs mescladas'},
+    'H3': {'coluna': 'releases_count', 'limiar': 10, 'sentido': 'acima', 'escala': 'log', 'rotulo': 'Releases'},
+    'H4': {'coluna': 'days_since_update', 'limiar': 90, 'sentido': 'abaixo', 'escala': 'log',
+           'rotulo': 'Dias desde a última atualização'},
+    'H6': {'coluna': 'issues_ratio', 'limiar': 0.7, 'sentido': 'acima', 'escala': 'linear',
+           'rotulo': 'Fração de issues fechadas'},
+}
+
+
+def intervalo_wilson(sucessos, n, z=1.96):
+    """IC de Wilson para proporções (vetorizado em `sucessos`)"""
+    p = sucessos / n
+    denominador = 1 + z ** 2 / n
+    centro = (p + z ** 2 / (2 * n)) / denominador
+    meia_largura = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominador
+    return centro - meia_largura, centro + meia_largura
+
+
+def grade_limiares(ordenados, limiar, pontos=2000, escala='linear'):
+    """Limiares entre o menor e o maior valor (espaçados em log nas contagens), incluindo `limiar`"""
+    if escala == 'log':
+        positivos = ordenados[ordenados > 0]
+        inicio = positivos[0] if len(positivos) else 1
+        grade = np.geomspace(inicio, max(ordenados[-1], inicio * 10), pontos)
+    else:
+        grade = np.linspace(ordenados[0], ordenados[-1], pontos)
+    return np.union1d(grade, [limiar])
+
+
+def ordenar_validos(valores):
+    valores = pd.to_numeric(pd.Series(valores), errors='coerce').to_numpy(dtype=float)
+    return np.sort(valores[np.isfinite(valores)])
+
+
+def varrer(ordenados, limiares, sentido='acima', z=1.96):
+    """
+    Tabela de sensibilidade para todos os `limiares`. `ordenados` são os valores
+    válidos em ordem crescente (ordenar_validos); cada limiar custa um searchsorted.
+    """
+    from scipy.stats import binom
+    n = len(ordenados)
+    if n == 0:
+        raise ValueError("Nenhum valor válido para a varredura")
+    limiares = np.asarray(limiares, dtype=float)
+    if sentido == 'acima':
+        alem = n - np.searchsorted(ordenados, limiares, side='right')
+    else:
+        alem = np.searchsorted(ordenados, limiares, side='left')
+    mediana = (ordenados[(n - 1) // 2] + ordenados[n // 2]) / 2
+    inferior, superior = intervalo_wilson(alem, n, z)
+    return pd.DataFrame({
+        'limiar': limiares,
+        'repositorios': alem,
+        'proporcao': alem / n,
+        'ic_inferior': inferior,
+        'ic_superior': superior,
+        'veredito': mediana > limiares if sentido == 'acima' else mediana < limiares,
+        # Mediana da reamostragem além do limiar <=> mais da metade da reamostragem além dele
+        'prob_bootstrap': binom.sf(n // 2, n, alem / n),
+    })
+
+
+def desenhar_curva(tabela, hipotese, definicao, caminho):
+    from graficos import bibliotecas_graficos
+    plt, _ = bibliotecas_graficos()
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(tabela['limiar'], tabela['proporcao'], label=f"Proporção {definicao['sentido']} do limiar")
+    ax.fill_between(tabela['limiar'], tabela['ic_inferior'], tabela['ic_superior'], alpha=0.3, label='IC95% Wilson')
+    ax.plot(tabela['limiar'], tabela['prob_bootstrap'], linestyle='--', label='P(veredito) bootstrap')
+    ax.axhline(0.5, color='gray', linewidth=0.8)
+    ax.axvline(definicao['limiar'], color='red', linestyle='--', label=f"Limiar usado: {definicao['limiar']}")
+    if definicao['escala'] == 'log':
+        ax.set_xscale('log')
+    ax.set_ylim(0, 1)
+    ax.set_xlabel(definicao['rotulo'])
+    ax.set_ylabel('Proporção / probabilidade')
+    ax.set_title(f"{hipotese}: sensibilidade ao limiar")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(caminho, dpi=150)
+    plt.close(fig)
+
+
+def analisar_sensibilidade(df, pontos=2000, hipoteses=None):
+    """{hipótese: tabela} para as hipóteses com a coluna disponível no DataFrame processado"""
+    tabelas = {}
+    for hipotese, definicao in HIPOTESES.items():
+        if (hipoteses and hipotese not in hipoteses) or definicao['coluna'] not in df.columns:
+            continue
+        ordenados = ordenar_validos(df[definicao['coluna']])
+        if len(ordenados) == 0:
+            continue
+        limiares = grade_limiares(ordenados, definicao['limiar'], pontos, definicao['escala'])
+        tabelas[hipotese] = varrer(ordenados, limiares, definicao['sentido'])
+    return tabelas
+
+
+def resumir(hipotese, tabela, definicao):
+    """Veredito no limiar usado e faixa de limiares em que ele se mantém"""
+    no_limiar = tabela.loc[tabela['limiar'] == definicao['limiar']].iloc[0]
+    mesmo = tabela.loc[tabela['veredito'] == no_limiar['veredito'], 'limiar']
+    firme = tabela.loc[(tabela['prob_bootstrap'] >= 0.95) if no_limiar['veredito']
+                       else (tabela['prob_bootstrap'] <= 0.05), 'limiar']
+    return (f"{hipotese}: {'confirmada' if no_limiar['veredito'] else 'refutada'} com limiar {definicao['limiar']} "
+            f"(proporção {no_limiar['proporcao'] * 100:.1f}% [{no_limiar['ic_inferior'] * 100:.1f}%, "
+            f"{no_limiar['ic_superior'] * 100:.1f}%], P bootstrap {no_limiar['prob_bootstrap']:.3f}) | "
+            f"mesmo veredito para limiares em [{mesmo.min():.4g}, {mesmo.max():.4g}]"
+            + (f", com P≥95% em [{firme.min():.4g}, {firme.max():.4g}]" if len(firme) else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sensibilidade dos vereditos H1-H6 aos limiares')
+    parser.add_argument('csv', help='CSV da coleta (esquema da sprint 2)')
+    parser.add_argument('--pontos', type=int, default=2000, help='Limiares avaliados por hipótese')
+    parser.add_argument('--hipoteses', default=None, help=f"Subconjunto, ex.: H2,H4 ({', '.join(HIPOTESES)})")
+    parser.add_argument('--saida', default='sensibilidade', help='Diretório das tabelas e curvas')
+    args = parser.parse_args(argv)
+
+    from graficos import compressao_do_csv, processar_dados
+    df = processar_dados(pd.read_csv(args.csv, compression=compressao_do_csv(args.csv) or "infer"))
+    hipoteses = [h.strip().upper() for h in args.hipoteses.split(',')] if args.hipoteses else None
+
+    from scipy.stats import binom  # noqa: F401 (importada antes para não entrar na medição)
+    inicio = time.perf_counter()
+    tabelas = analisar_sensibilidade(df, args.pontos, hipoteses)
+    print(f"{sum(len(t) for t in tabelas.values())} limiares avaliados em "
+          f"{(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    os.makedirs(args.saida, exist_ok=True)
+    for hipotese, tabela in tabelas.items():
+        definicao = HIPOTESES[hipotese]
+        base = os.path.join(args.saida, f"sensibilidade_{hipotese.lower()}")
+        tabela.to_csv(base + ".csv", index=False)
+        desenhar_curva(tabela, hipotese, definicao, base + ".png")
+        print(resumir(hipotese, tabela, definicao))
+    print(f"Tabelas e curvas salvas em {args.saida}/")
+
+
+if __name__ == "__main__":
+    main()
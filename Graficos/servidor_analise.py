@@ -0,0 +1,196 @@
+"""
+Servidor local que mantém o dataset carregado em memória e responde às
+consultas das hipóteses (H1-H6 e RQ07) via HTTP.
+
+O CSV é lido e processado uma única vez; as colunas derivadas ficam prontas e
+os resultados de cada consulta (hipótese + filtros) são guardados em cache até
+que o arquivo mude. Quando o arquivo apenas recebe novas linhas no final (o
+cabeçalho e os últimos 64 KiB já lidos continuam iguais), só essas linhas são
+lidas e processadas. Arquivos comprimidos (.csv.gz, .csv.zst) são sempre
+relidos por inteiro. Os ICs das medianas usam estatísticas de ordem, em O(n),
+em vez das 5000 reamostragens bootstrap dos relatórios.
+
+    python servidor_analise.py repositorios_populares_github.csv --porta 8765
+
+    GET /status
+    GET /hipoteses                      -> H1-H6
+    GET /hipoteses/H2?primary_language=Python&min_estrelas=50000
+    GET /rq07?tipo_proprietario=Organization
+"""
+import argparse
+import io
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import numpy as np
+import pandas as pd
+
+from graficos import PrefixoLido, calcular_resumo, calcular_rq07, compressao_do_csv, processar_dados
+
+
+def resumo_interativo(df):
+    return calcular_resumo(df, metodo_ic='ordem')
+
+
+class EstadoAnalise:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._compressao = compressao_do_csv(caminho)
+        self._lock = threading.Lock()
+        self._cache = {}
+        self.df = None
+        self.versao = 0
+        self._carregar_completo()
+
+    def _carregar_completo(self):
+        with open(self.caminho, 'rb') as arquivo:
+            conteudo = arquivo.read()
+        bruto = pd.read_csv(io.BytesIO(conteudo), compression=self._compressao)
+        self._colunas_brutas = list(bruto.columns)
+        self._prefixo = PrefixoLido(conteudo) if self._compressao is None else None
+        self._offset = len(conteudo)
+        self._mtime = os.stat(self.caminho).st_mtime_ns
+        self.df = processar_dados(bruto)
+        self._nova_versao()
+        print(f"Dataset carregado: {len(self.df)} repositórios")
+
+    def _nova_versao(self):
+        self.versao += 1
+        self._cache.clear()
+
+    def atualizar_se_necessario(self):
+        """Recarrega o arquivo se ele mudou; se só cresceu, processa apenas as linhas novas"""
+        with self._lock:
+            info = os.stat(self.caminho)
+            if info.st_mtime_ns == self._mtime and info.st_size == self._offset:
+                return
+            if self._prefixo is not None and self._prefixo.apenas_anexado(self.caminho):
+                with open(self.caminho, 'rb') as arquivo:
+                    arquivo.seek(self._offset)
+                    novos_bytes = arquivo.read()
+                # Uma linha ainda incompleta fica para a próxima leitura
+                novos_bytes = novos_bytes[:novos_bytes.rfind(b'\n') + 1]
+                if not novos_bytes:
+                    return
+                novas = pd.read_csv(io.BytesIO(novos_bytes), header=None, names=self._colunas_brutas)
+                self.df = pd.concat([self.df, processar_dados(novas)], ignore_index=True)
+                self._prefixo.avancar(novos_bytes)
+                self._offset = self._prefixo.offset
+                self._mtime = info.st_mtime_ns
+                self._nova_versao()
+                print(f"{len(novas)} novas linhas incorporadas ({len(self.df)} repositórios)")
+            else:
+                self._carregar_completo()
+
+    def consultar(self, chave, filtros, funcao):
+        """Executa `funcao` sobre o subconjunto filtrado, usando o cache da versão atual"""
+        self.atualizar_se_necessario()
+        chave_cache = (chave, tuple(sorted(filtros.items())))
+        with self._lock:
+            if chave_cache in self._cache:
+                return self._cache[chave_cache]
+            df = self.df
+        resultado = funcao(aplicar_filtros(df, filtros))
+        with self._lock:
+            self._cache[chave_cache] = resultado
+        return resultado
+
+
+def aplicar_filtros(df, filtros):
+    """Filtros: coluna=valor (igualdade), min_coluna=x e max_coluna=x (intervalos numéricos)"""
+    mascara = np.ones(len(df), dtype=bool)
+    for nome, valor in filtros.items():
+        if nome.startswith('min_') and nome[4:] in df.columns:
+            mascara &= (df[nome[4:]] >= float(valor)).to_numpy()
+        elif nome.startswith('max_') and nome[4:] in df.columns:
+            mascara &= (df[nome[4:]] <= float(valor)).to_numpy()
+        elif nome in df.columns:
+            mascara &= (df[nome].astype(str) == valor).to_numpy()
+        else:
+            raise KeyError(f"Filtro desconhecido: {nome}")
+    return df[mascara]
+
+
+def _para_json(valor):
+    if isinstance(valor, dict):
+        return {str(k): _para_json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple, np.ndarray)):
+        return [_para_json(v) for v in valor]
+    if isinstance(valor, (np.integer, np.floating, float)):
+        valor = float(valor)
+        return None if math.isnan(valor) else valor
+    return valor
+
+
+def criar_handler(estado):
+    class HandlerAnalise(BaseHTTPRequestHandler):
+        def do_GET(self):
+            inicio = time.perf_counter()
+            url = urlparse(self.path)
+            filtros = dict(parse_qsl(url.query))
+            partes = [p for p in url.path.split('/') if p]
+            try:
+                if partes == ['status']:
+                    estado.atualizar_se_necessario()
+                    corpo = {'arquivo': estado.caminho, 'repositorios': len(estado.df), 'versao': estado.versao}
+                elif partes and partes[0] == 'hipoteses':
+                    corpo = estado.consultar('resumo', filtros, resumo_interativo)
+                    if len(partes) > 1:
+                        hipotese = partes[1].upper()
+                        corpo = {hipotese: corpo[hipotese]}
+                elif partes == ['rq07']:
+                    corpo = estado.consultar('rq07', filtros, calcular_rq07)
+                else:
+                    self._responder(404, {'erro': f"Rota desconhecida: {url.path}"})
+                    return
+            except (KeyError, ValueError) as e:
+                self._responder(400, {'erro': str(e)})
+                return
+            corpo = _para_json(corpo)
+            corpo['tempo_ms'] = (time.perf_counter() - inicio) * 1000
+            self._responder(200, corpo)
+
+        def _responder(self, status, corpo):
+            dados = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HandlerAnalise
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Servidor de consultas das hipóteses com o dataset em memória')
+    parser.add_argument('csv', help='Arquivo CSV do dataset')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    estado = EstadoAnalise(args.csv)
+    # Aquece o cache com o resumo sem filtros, a consulta mais frequente dos dashboards
+    estado.consultar('resumo', {}, resumo_interativo)
+    if 'primary_language' in estado.df.columns:
+        # A primeira RQ07 importa o scipy (~1 s): melhor aqui do que na primeira requisição
+        estado.consultar('rq07', {}, calcular_rq07)
+    servidor = ThreadingHTTPServer((args.host, args.porta), criar_handler(estado))
+    print(f"Servidor de análise em http://{args.host}:{args.porta}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando servidor.")
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
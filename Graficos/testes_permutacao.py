@@ -0,0 +1,214 @@
+"""
+Testes de Kruskal-Wallis, post-hoc de Dunn e p-valores por permutação para a RQ07.
+
+Cada variável é ranqueada uma única vez e as linhas são ordenadas por grupo
+(e por valor dentro do grupo). Sob a hipótese nula os postos são trocáveis
+entre as linguagens, então cada permutação embaralha o vetor de postos e as
+somas por grupo saem de um np.add.reduceat sobre os blocos contíguos. As
+permutações são feitas em lotes vetorizados (uma matriz lote x n), distribuídos
+entre processos; cada lote tem seu próprio fluxo de números aleatórios derivado
+de um SeedSequence, então o resultado depende só da semente e não do número de
+processos.
+
+Tamanhos de efeito: epsilon² para o Kruskal-Wallis e delta de Cliff para cada
+par de linguagens.
+
+    python testes_permutacao.py repositorios_populares_github.csv --permutacoes 10000
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+# Máximo de elementos (lote x repositórios) de cada matriz de permutações (~40 MB em float64)
+ELEMENTOS_POR_LOTE = 5_000_000
+
+# Dados das variáveis compartilhados com os processos (preenchido pelo inicializador)
+_dados_worker = {}
+
+
+def _preparar_variavel(valores, grupos, nomes_grupos):
+    """Ordena por (grupo, valor), ranqueia uma vez e guarda o que os lotes de permutação precisam"""
+    from scipy.stats import rankdata
+
+    ordem = np.lexsort((valores, grupos))
+    valores, grupos = valores[ordem], grupos[ordem]
+    contagens = np.bincount(grupos, minlength=len(nomes_grupos))
+    inicios = np.concatenate(([0], np.cumsum(contagens)[:-1]))
+    postos = rankdata(valores)
+    n = len(valores)
+    _, empates = np.unique(valores, return_counts=True)
+    soma_empates = float(np.sum(empates.astype(float) ** 3 - empates))
+    return {
+        'valores': valores, 'postos': postos, 'inicios': inicios, 'contagens': contagens,
+        'n': n, 'soma_empates': soma_empates,
+        'pares': np.array(list(combinations(range(len(nomes_grupos)), 2)), dtype=int).reshape(-1, 2),
+    }
+
+
+def _estatisticas(somas, dados):
+    """H de Kruskal-Wallis e z de Dunn de cada par a partir das somas de postos (uma linha por permutação)"""
+    n, contagens, pares = dados['n'], dados['contagens'], dados['pares']
+    correcao = 1 - dados['soma_empates'] / (n ** 3 - n)
+    h = (12 / (n * (n + 1)) * np.sum(somas ** 2 / contagens, axis=-1) - 3 * (n + 1)) / correcao
+
+    medias = somas / contagens
+    variancia = n * (n + 1) / 12 - dados['soma_empates'] / (12 * (n - 1))
+    a, b = pares[:, 0], pares[:, 1]
+    erro = np.sqrt(variancia * (1 / contagens[a] + 1 / contagens[b]))
+    z = (medias[..., a] - medias[..., b]) / erro
+    return h, z
+
+
+def _inicializar_worker(dados):
+    _dados_worker.clear()
+    _dados_worker.update(dados)
+
+
+def _lote_permutacoes(variavel, semente, tamanho):
+    """Conta quantas permutações do lote são ao menos tão extremas quanto o observado"""
+    dados = _dados_worker[variavel]
+    rng = np.random.default_rng(semente)
+    postos = rng.permuted(np.broadcast_to(dados['postos'], (tamanho, dados['n'])), axis=1)
+    somas = np.add.reduceat(postos, dados['inicios'], axis=1)
+    h, z = _estatisticas(somas, dados)
+    # Tolerância relativa para que empates numéricos com o observado contem como extremos
+    extremos_h = int(np.sum(h >= dados['h_observado'] * (1 - 1e-12)))
+    extremos_pares = np.sum(np.abs(z) >= np.abs(dados['z_observado']) * (1 - 1e-12), axis=0)
+    return extremos_h, extremos_pares
+
+
+def _holm(p_valores):
+    p_valores = np.asarray(p_valores, dtype=float)
+    m = len(p_valores)
+    ordem = np.argsort(p_valores)
+    ajustados = np.maximum.accumulate((m - np.arange(m)) * p_valores[ordem])
+    resultado = np.empty(m)
+    resultado[ordem] = np.minimum(ajustados, 1.0)
+    return resultado
+
+
+def _delta_cliff(valores_a, valores_b):
+    """P(A > B) - P(A < B), com os dois vetores já ordenados"""
+    menores = np.searchsorted(valores_b, valores_a, side='left').sum()
+    maiores = (len(valores_b) - np.searchsorted(valores_b, valores_a, side='right')).sum()
+    return (menores - maiores) / (len(valores_a) * len(valores_b))
+
+
+def testar_por_grupo(df, coluna_grupo, variaveis, n_permutacoes=10000, semente=42,
+                     processos=None, min_por_grupo=5):
+    """
+    Executa, para cada variável, Kruskal-Wallis (assintótico e por permutação) e o
+    post-hoc de Dunn para todos os pares de grupos com pelo menos `min_por_grupo`
+    repositórios. Retorna {variavel: {'h', 'p_kruskal', 'p_permutacao', 'epsilon2',
+    'n', 'pares': DataFrame}}.
+    """
+    from scipy.stats import chi2, norm
+
+    contagem_grupos = df[coluna_grupo].value_counts()
+    nomes_grupos = sorted(contagem_grupos[contagem_grupos >= min_por_grupo].index)
+    df = df[df[coluna_grupo].isin(nomes_grupos)]
+    codigos_grupo = pd.Categorical(df[coluna_grupo], categories=nomes_grupos).codes
+
+    dados = {}
+    for variavel in variaveis:
+        valores = pd.to_numeric(df[variavel], errors='coerce').to_numpy(dtype=float)
+        validos = ~np.isnan(valores)
+        dados_variavel = _preparar_variavel(valores[validos], codigos_grupo[validos], nomes_grupos)
+        if dados_variavel['n'] < 2 or np.any(dados_variavel['contagens'] == 0) or dados_variavel['soma_empates'] == dados_variavel['n'] ** 3 - dados_variavel['n']:
+            print(f"{variavel}: dados insuficientes para o teste, pulado.")
+            continue
+        somas = np.add.reduceat(dados_variavel['postos'], dados_variavel['inicios'])
+        dados_variavel['h_observado'], dados_variavel['z_observado'] = _estatisticas(somas, dados_variavel)
+        dados[variavel] = dados_variavel
+
+    # Lotes e sementes dependem só do tamanho dos dados e da semente, não do número de processos
+    tarefas = []
+    sequencia = np.random.SeedSequence(semente)
+    for variavel, dados_variavel in dados.items():
+        tamanho_lote = max(1, min(n_permutacoes, ELEMENTOS_POR_LOTE // dados_variavel['n']))
+        tamanhos = [tamanho_lote] * (n_permutacoes // tamanho_lote)
+        if n_permutacoes % tamanho_lote:
+            tamanhos.append(n_permutacoes % tamanho_lote)
+        sementes = sequencia.spawn(len(tamanhos))
+        tarefas.extend((variavel, s, t) for s, t in zip(sementes, tamanhos))
+
+    extremos = {v: [0, np.zeros(len(d['pares']), dtype=np.int64)] for v, d in dados.items()}
+    if processos == 1:
+        _inicializar_worker(dados)
+        resultados = (_lote_permutacoes(*tarefa) for tarefa in tarefas)
+    else:
+        executor = ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_worker, initargs=(dados,))
+        resultados = executor.map(_lote_permutacoes, *zip(*tarefas)) if tarefas else []
+    for (variavel, _, _), (extremos_h, extremos_pares) in zip(tarefas, resultados):
+        extremos[variavel][0] += extremos_h
+        extremos[variavel][1] += extremos_pares
+    if processos != 1:
+        executor.shutdown()
+
+    resultado = {}
+    for variavel, d in dados.items():
+        k, n = len(nomes_grupos), d['n']
+        h = float(d['h_observado'])
+        a, b = d['pares'][:, 0], d['pares'][:, 1]
+        z = d['z_observado']
+        p_dunn = 2 * norm.sf(np.abs(z))
+        fatias = [d['valores'][i:i + c] for i, c in zip(d['inicios'], d['contagens'])]
+        pares = pd.DataFrame({
+            'grupo_a': [nomes_grupos[i] for i in a],
+            'grupo_b': [nomes_grupos[j] for j in b],
+            'n_a': d['contagens'][a],
+            'n_b': d['contagens'][b],
+            'mediana_a': [np.median(fatias[i]) for i in a],
+            'mediana_b': [np.median(fatias[j]) for j in b],
+            'z_dunn': z,
+            'p_dunn': p_dunn,
+            'p_dunn_holm': _holm(p_dunn),
+            'p_permutacao': (1 + extremos[variavel][1]) / (1 + n_permutacoes),
+            'delta_cliff': [_delta_cliff(fatias[i], fatias[j]) for i, j in zip(a, b)],
+        })
+        resultado[variavel] = {
+            'h': h,
+            'p_kruskal': float(chi2.sf(h, k - 1)),
+            'p_permutacao': (1 + extremos[variavel][0]) / (1 + n_permutacoes),
+            'epsilon2': h / (n - 1),
+            'n': n,
+            'pares': pares,
+        }
+    return resultado
+
+
+def salvar_pares(resultado, caminho):
+    """Salva os pares de todas as variáveis em um único CSV (coluna 'variavel')"""
+    tabelas = [r['pares'].assign(variavel=v) for v, r in resultado.items()]
+    if tabelas:
+        pd.concat(tabelas, ignore_index=True).to_csv(caminho, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Kruskal-Wallis, Dunn e permutações por linguagem (RQ07)')
+    parser.add_argument('csv', help='CSV da coleta (esquema da sprint 2)')
+    parser.add_argument('--permutacoes', type=int, default=10000)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--min-por-grupo', type=int, default=5)
+    parser.add_argument('--saida', default='rq07_posthoc.csv')
+    args = parser.parse_args(argv)
+
+    from graficos import processar_dados
+    df = processar_dados(pd.read_csv(args.csv))
+    variaveis = [v for v in ["merged_pr_count", "releases_count", "days_since_update"] if v in df.columns]
+    resultado = testar_por_grupo(df, 'primary_language', variaveis, args.permutacoes, args.semente,
+                                 args.processos, args.min_por_grupo)
+    for variavel, r in resultado.items():
+        significativos = int((r['pares']['p_dunn_holm'] < 0.05).sum())
+        print(f"{variavel}: H={r['h']:.2f} p={r['p_kruskal']:.4g} p_perm={r['p_permutacao']:.4g} "
+              f"epsilon²={r['epsilon2']:.3f} | {significativos}/{len(r['pares'])} pares com p_holm<0.05")
+    salvar_pares(resultado, args.saida)
+    print(f"Comparações por par salvas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
+import argparse
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from datetime import datetime
 import warnings
+from arquivos_comprimidos import ler_csv
+from estatisticas_agrupadas import adicionar_faixa_estrelas, estatisticas_por_grupo
+
+from modulos_graficos import importar_de_graficos
+
+# Camada de gráficos pré-agregados e grafo de análise, compartilhados com Graficos/graficos.py
+_agregados = importar_de_graficos("graficos_agregados")
+boxplot_agrupado, densidade_2d, histograma = _agregados.boxplot_agrupado, _agregados.densidade_2d, _agregados.histograma
+BASE = importar_de_graficos("grafo_analise").BASE
 
 # Ignorar avisos para manter a saída limpa
 warnings.filterwarnings('ignore')
@@ -24,21 +33,29 @@ def carregar_dados(arquivo_csv):
         print("Execute primeiro o script main.py para coletar os dados.")
         return None
     
-    # Carregar os dados
-    df = pd.read_csv(arquivo_csv)
+    # Carregar os dados (.csv, .csv.gz ou .csv.zst)
+    df = ler_csv(arquivo_csv)
     print(f"Dados carregados com sucesso. Total de {len(df)} repositórios.")
-    
-    # Converter datas para datetime
-    for col in ['criado_em', 'atualizado_em', 'ultimo_push']:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col])
+    avaliacao = BASE.avaliacao(df=df)
+    return preparar_dados(df, avaliacao['datas'], avaliacao['idade_dias'], avaliacao['dias_desde_atualizacao'])
+
+# Grafo da análise: colunas derivadas (BASE, compartilhado com graficos.py) -> estatísticas -> figuras
+GRAFO = BASE.estender()
+
+@GRAFO.no('dados', 'df', 'datas', 'idade_dias', 'dias_desde_atualizacao')
+def preparar_dados(df, datas, idade_dias, dias_desde_atualizacao):
+    """Colunas derivadas e conversões de tipo sobre o DataFrame lido do CSV"""
+    # Datas e contagens de dias vêm do grafo BASE (aceita o CSV da sprint 2 e o do GitHubAnalyzer)
+    for nome, col in [('criacao', 'criado_em'), ('atualizacao', 'atualizado_em'), ('push', 'ultimo_push')]:
+        if nome in datas:
+            df[col] = datas[nome]
     
     # Calcular idade em dias (caso não esteja já calculada)
     if 'idade_dias' not in df.columns:
-        df['idade_dias'] = (datetime.now() - df['criado_em']).dt.days
+        df['idade_dias'] = idade_dias
     
     # Calcular tempo desde a última atualização em dias
-    df['dias_desde_atualizacao'] = (datetime.now() - df['atualizado_em']).dt.days
+    df['dias_desde_atualizacao'] = dias_desde_atualizacao
     
     # Converter colunas numéricas
     colunas_numericas = ['estrelas', 'forks', 'watchers', 'commits', 
@@ -76,7 +93,7 @@ def analisar_h1(df):
     
     # Histograma da idade dos repositórios
     plt.figure(figsize=(12, 6))
-    sns.histplot(idade_anos, bins=30, kde=True)
+    histograma(idade_anos, bins=30, kde=True)
     plt.title('Distribuição da Idade dos Repositórios Populares')
     plt.xlabel('Idade (anos)')
     plt.ylabel('Número de Repositórios')
@@ -105,7 +122,7 @@ def analisar_h2(df):
     
     # Histograma dos PRs mesclados
     plt.figure(figsize=(12, 6))
-    sns.histplot(df['prs_mesclados'], bins=30, kde=True)
+    histograma(df['prs_mesclados'], bins=30, kde=True)
     plt.title('Distribuição de Pull Requests Mesclados em Repositórios Populares')
     plt.xlabel('Número de PRs Mesclados')
     plt.ylabel('Número de Repositórios')
@@ -116,7 +133,7 @@ def analisar_h2(df):
     
     # Gráfico de dispersão entre estrelas e PRs mesclados
     plt.figure(figsize=(12, 6))
-    sns.scatterplot(x='estrelas', y='prs_mesclados', data=df)
+    densidade_2d(df['estrelas'], df['prs_mesclados'], log_x=True, log_y=True)
     plt.title('Relação entre Número de Estrelas e Pull Requests Mesclados')
     plt.xlabel('Número de Estrelas')
     plt.ylabel('Número de PRs Mesclados')
@@ -140,9 +157,15 @@ def analisar_h3(df):
     print(f"Mínimo de releases: {df['releases'].min():.2f}")
     print(f"Máximo de releases: {df['releases'].max():.2f}")
     
+    # Cadência (presente quando a coleta usa o enriquecimento cadencia_releases)
+    if 'releases_por_ano' in df.columns:
+        print(f"Mediana de releases por ano: {df['releases_por_ano'].median():.2f}")
+        print(f"Mediana do intervalo entre releases: {df['intervalo_mediano_dias'].median():.2f} dias")
+        print(f"Repositórios com release nos últimos 365 dias: {(df['releases_ultimo_ano'] > 0).mean() * 100:.2f}%")
+    
     # Histograma das releases
     plt.figure(figsize=(12, 6))
-    sns.histplot(df['releases'], bins=30, kde=True)
+    histograma(df['releases'], bins=30, kde=True)
     plt.title('Distribuição de Releases em Repositórios Populares')
     plt.xlabel('Número de Releases')
     plt.ylabel('Número de Repositórios')
@@ -153,7 +176,7 @@ def analisar_h3(df):
     
     # Gráfico de dispersão entre idade e número de releases
     plt.figure(figsize=(12, 6))
-    sns.scatterplot(x='idade_dias', y='releases', data=df)
+    densidade_2d(df['idade_dias'], df['releases'], log_y=True)
     plt.title('Relação entre Idade do Repositório e Número de Releases')
     plt.xlabel('Idade (dias)')
     plt.ylabel('Número de Releases')
@@ -179,7 +202,7 @@ def analisar_h4(df):
     
     # Histograma do tempo desde a última atualização
     plt.figure(figsize=(12, 6))
-    sns.histplot(df['dias_desde_atualizacao'], bins=30, kde=True)
+    histograma(df['dias_desde_atualizacao'], bins=30, kde=True)
     plt.title('Distribuição do Tempo desde a Última Atualização em Repositórios Populares')
     plt.xlabel('Dias desde a Última Atualização')
     plt.ylabel('Número de Repositórios')
@@ -232,7 +255,7 @@ def analisar_h5(df):
     
     return hipotese_confirmada
 
-def analisar_rq07(df):
+def analisar_rq07(df, agrupadas=None):
     """Analisa RQ07: Sistemas escritos em linguagens mais populares recebem mais contribuição externa, 
     lançam mais releases e são atualizados com mais frequência?"""
     print("\n--- Análise RQ07 (Bônus): Relação entre linguagem e contribuições, releases e atualizações ---")
@@ -246,7 +269,7 @@ def analisar_rq07(df):
     
     # Análise de PRs mesclados por linguagem
     plt.figure(figsize=(14, 8))
-    sns.boxplot(x='linguagem_principal', y='prs_mesclados', data=df_top_langs)
+    boxplot_agrupado(df_top_langs, 'linguagem_principal', 'prs_mesclados', ordem=top_linguagens)
     plt.title('Pull Requests Mesclados por Linguagem Principal')
     plt.xlabel('Linguagem')
     plt.ylabel('Número de PRs Mesclados')
@@ -256,7 +279,7 @@ def analisar_rq07(df):
     
     # Análise de releases por linguagem
     plt.figure(figsize=(14, 8))
-    sns.boxplot(x='linguagem_principal', y='releases', data=df_top_langs)
+    boxplot_agrupado(df_top_langs, 'linguagem_principal', 'releases', ordem=top_linguagens)
     plt.title('Número de Releases por Linguagem Principal')
     plt.xlabel('Linguagem')
     plt.ylabel('Número de Releases')
@@ -266,7 +289,7 @@ def analisar_rq07(df):
     
     # Análise de tempo desde a última atualização por linguagem
     plt.figure(figsize=(14, 8))
-    sns.boxplot(x='linguagem_principal', y='dias_desde_atualizacao', data=df_top_langs)
+    boxplot_agrupado(df_top_langs, 'linguagem_principal', 'dias_desde_atualizacao', ordem=top_linguagens)
     plt.title('Dias desde a Última Atualização por Linguagem Principal')
     plt.xlabel('Linguagem')
     plt.ylabel('Dias desde a Última Atualização')
@@ -274,14 +297,18 @@ def analisar_rq07(df):
     plt.tight_layout()
     plt.savefig('resultados/rq07_atualizacao_por_linguagem.png')
     
-    # Estatísticas por linguagem
+    # Estatísticas por linguagem (todas as linguagens calculadas em uma passada)
     print("\nEstatísticas por linguagem:")
+    if agrupadas is not None and 'linguagem_principal' in agrupadas:
+        stats = agrupadas['linguagem_principal']
+    else:
+        stats = estatisticas_por_grupo(df, 'linguagem_principal', ['prs_mesclados', 'releases', 'dias_desde_atualizacao'])
     for lang in top_linguagens:
-        df_lang = df[df['linguagem_principal'] == lang]
-        print(f"\n{lang} ({len(df_lang)} repositórios):")
-        print(f"  - PRs mesclados (mediana): {df_lang['prs_mesclados'].median():.2f}")
-        print(f"  - Releases (mediana): {df_lang['releases'].median():.2f}")
-        print(f"  - Dias desde última atualização (mediana): {df_lang['dias_desde_atualizacao'].median():.2f}")
+        grupo = stats.loc[lang]
+        print(f"\n{lang} ({int(grupo['count'])} repositórios):")
+        print(f"  - PRs mesclados (mediana): {grupo['prs_mesclados_median']:.2f}")
+        print(f"  - Releases (mediana): {grupo['releases_median']:.2f}")
+        print(f"  - Dias desde última atualização (mediana): {grupo['dias_desde_atualizacao_median']:.2f}")
 
 def gerar_estatisticas_descritivas(df):
     """Gera estatísticas descritivas para as colunas numéricas."""
@@ -305,38 +332,74 @@ def gerar_estatisticas_descritivas(df):
     
     return estatisticas
 
-def main():
+def calcular_estatisticas_agrupadas(df):
+    """Estatísticas por linguagem, tipo de proprietário e faixa de estrelas: {chave: DataFrame}"""
+    metricas = [col for col in ['estrelas', 'prs_mesclados', 'releases', 'issues_fechadas',
+                                'idade_dias', 'dias_desde_atualizacao'] if col in df.columns]
+    if 'estrelas' in df.columns:
+        df = adicionar_faixa_estrelas(df.copy())
+    return {chave: estatisticas_por_grupo(df, chave, metricas)
+            for chave in ['linguagem_principal', 'tipo_proprietario', 'faixa_estrelas'] if chave in df.columns}
+
+def gerar_estatisticas_agrupadas(df, agrupadas=None):
+    """Gera estatísticas por linguagem, tipo de proprietário e faixa de estrelas."""
+    print("\n--- Gerando estatísticas agrupadas ---")
+    
+    if agrupadas is None:
+        agrupadas = calcular_estatisticas_agrupadas(df)
+    for chave, estatisticas in agrupadas.items():
+        arquivo = f'resultados/estatisticas_por_{chave}.csv'
+        estatisticas.to_csv(arquivo)
+        print(f"Estatísticas por {chave} salvas em '{arquivo}'")
+
+GRAFO.no('agrupadas', 'dados')(calcular_estatisticas_agrupadas)
+GRAFO.no('descritivas', 'dados', exclusivo=True)(gerar_estatisticas_descritivas)
+GRAFO.no('estatisticas_agrupadas', 'dados', 'agrupadas', exclusivo=True)(gerar_estatisticas_agrupadas)
+GRAFO.no('H1', 'dados', exclusivo=True)(analisar_h1)
+GRAFO.no('H2', 'dados', exclusivo=True)(analisar_h2)
+GRAFO.no('H3', 'dados', exclusivo=True)(analisar_h3)
+GRAFO.no('H4', 'dados', exclusivo=True)(analisar_h4)
+GRAFO.no('H5', 'dados', exclusivo=True)(analisar_h5)
+GRAFO.no('RQ07', 'dados', 'agrupadas', exclusivo=True)(analisar_rq07)
+
+HIPOTESES = ['H1', 'H2', 'H3', 'H4', 'H5']
+ALVOS = ['descritivas', 'estatisticas_agrupadas'] + HIPOTESES + ['RQ07']
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Análise das hipóteses H1-H5 e RQ07')
+    parser.add_argument('csv', nargs='?', default='repositorios_github.csv', help='CSV da coleta')
+    parser.add_argument('--only', default=None,
+                        help=f"Alvos separados por vírgula ({', '.join(ALVOS)}); padrão: todos")
+    parser.add_argument('--workers', type=int, default=None, help='Threads para os nós independentes')
+    args = parser.parse_args(argv)
+    try:
+        alvos = GRAFO.resolver(args.only) if args.only else ALVOS
+    except ValueError as e:
+        parser.error(str(e))
+
     # Criar pasta para resultados
     os.makedirs('resultados', exist_ok=True)
     
-    # Carregar dados
-    arquivo_csv = "repositorios_github.csv"
-    df = carregar_dados(arquivo_csv)
-    
-    if df is None:
+    # Carregar dados (as colunas derivadas são calculadas pelo grafo)
+    print(f"Carregando dados do arquivo {args.csv}...")
+    if not os.path.exists(args.csv):
+        print(f"Erro: O arquivo {args.csv} não foi encontrado.")
+        print("Execute primeiro o script main.py para coletar os dados.")
         return
+    df = ler_csv(args.csv)
+    print(f"Dados carregados com sucesso. Total de {len(df)} repositórios.")
     
-    # Gerar estatísticas descritivas
-    estatisticas = gerar_estatisticas_descritivas(df)
-    
-    # Analisar hipóteses
-    resultados = {
-        'H1': analisar_h1(df),
-        'H2': analisar_h2(df),
-        'H3': analisar_h3(df),
-        'H4': analisar_h4(df),
-        'H5': analisar_h5(df)
-    }
-    
-    # Análise bônus (RQ07)
-    analisar_rq07(df)
+    # Estatísticas, hipóteses e RQ07 pedidas (e somente as suas dependências)
+    resultados = GRAFO.avaliacao(df=df).executar(alvos, args.workers)
     
     # Resumo dos resultados
-    print("\n--- Resumo dos Resultados ---")
-    for hipotese, confirmada in resultados.items():
-        print(f"{hipotese}: {'Confirmada' if confirmada else 'Refutada'}")
+    hipoteses = [h for h in HIPOTESES if h in resultados]
+    if hipoteses:
+        print("\n--- Resumo dos Resultados ---")
+    for hipotese in hipoteses:
+        print(f"{hipotese}: {'Confirmada' if resultados[hipotese] else 'Refutada'}")
     
     print("\nAnálise concluída! Os resultados foram salvos na pasta 'resultados/'")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
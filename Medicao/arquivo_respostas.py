@@ -0,0 +1,277 @@
+"""
+Arquivo das respostas brutas da API, para renormalizar coletas sem rede.
+
+Quando ativado (variável MEDICAOLAB_ARQUIVO_RESPOSTAS ou --arquivo-respostas
+no medicaolab), toda resposta 200 que passa por requisicao_get/requisicao_post
+é anexada, com os bytes exatamente como vieram da API, a um arquivo de
+segmento. Cada resposta é um membro gzip independente, e o índice do segmento
+guarda offset, tamanho, hash da consulta, data/hora, URL e variáveis. Cada
+processo grava seus próprios segmentos, então threads, processos e workers da
+coleta distribuída podem arquivar no mesmo diretório sem coordenação.
+
+    arquivo/
+        consultas/<hash>.txt                  texto de cada consulta GraphQL (ou URL REST)
+        seg-<host>-<pid>-<inicio>-0001.gz     respostas comprimidas, uma após a outra
+        seg-<host>-<pid>-<inicio>-0001.csv    índice: offset, tamanho, hash, data/hora, ...
+
+`renormalizar` reconstrói o CSV (ou Parquet) das páginas de busca arquivadas,
+em paralelo, lendo só os trechos indicados pelo índice. Correções nos
+extratores de consultas_graphql.CAMPOS são aplicadas sem nova consulta à API.
+Os enriquecimentos REST não são refeitos.
+
+    python arquivo_respostas.py renormalizar arquivo/ repositorios.csv --perfil full
+    python arquivo_respostas.py resumo arquivo/
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+TAMANHO_SEGMENTO = 256 * 1024 * 1024
+COLUNAS_INDICE = ['offset', 'tamanho', 'hash', 'data_hora', 'tipo', 'url', 'variaveis']
+REGISTROS_POR_TAREFA = 500
+
+
+def hash_consulta(texto):
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+
+class ArquivoRespostas:
+    """Grava respostas em segmentos comprimidos; seguro entre threads do mesmo processo"""
+
+    def __init__(self, diretorio, tamanho_segmento=TAMANHO_SEGMENTO):
+        self.diretorio = diretorio
+        self.tamanho_segmento = tamanho_segmento
+        self._lock = threading.Lock()
+        self._prefixo = f"seg-{socket.gethostname()}-{os.getpid()}-{int(time.time())}"
+        self._numero = 0
+        self._segmento = self._indice = None
+        self._consultas_gravadas = set()
+        os.makedirs(os.path.join(diretorio, 'consultas'), exist_ok=True)
+
+    def _abrir_segmento(self):
+        self.fechar()
+        self._numero += 1
+        base = os.path.join(self.diretorio, f"{self._prefixo}-{self._numero:04d}")
+        self._segmento = open(base + ".gz", 'ab')
+        self._indice = open(base + ".csv", 'a', newline='', encoding='utf-8')
+        self._escritor_indice = csv.writer(self._indice)
+        self._escritor_indice.writerow(COLUNAS_INDICE)
+
+    def _gravar_consulta(self, hash_texto, texto):
+        if hash_texto in self._consultas_gravadas:
+            return
+        caminho = os.path.join(self.diretorio, 'consultas', f"{hash_texto}.txt")
+        if not os.path.exists(caminho):
+            with open(f"{caminho}.{os.getpid()}.tmp", 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(f"{caminho}.{os.getpid()}.tmp", caminho)
+        self._consultas_gravadas.add(hash_texto)
+
+    def adicionar(self, conteudo, url, consulta=None, variaveis=None):
+        """Anexa os bytes de uma resposta. `consulta` é o texto GraphQL; nas chamadas REST, a URL"""
+        texto = consulta if consulta is not None else url
+        hash_texto = hash_consulta(texto)
+        membro = gzip.compress(conteudo, 6, mtime=0)
+        data_hora = datetime.now(timezone.utc).isoformat(timespec='microseconds')
+        with self._lock:
+            self._gravar_consulta(hash_texto, texto)
+            if self._segmento is None or self._segmento.tell() + len(membro) > self.tamanho_segmento:
+                self._abrir_segmento()
+            offset = self._segmento.tell()
+            self._segmento.write(membro)
+            self._segmento.flush()
+            self._escritor_indice.writerow([offset, len(membro), hash_texto, data_hora,
+                                            'graphql' if consulta is not None else 'rest', url,
+                                            json.dumps(variaveis, ensure_ascii=False) if variaveis else ''])
+            self._indice.flush()
+
+    def fechar(self):
+        for arquivo in (self._segmento, self._indice):
+            if arquivo is not None:
+                arquivo.close()
+        self._segmento = self._indice = None
+
+
+_arquivo = None
+_pid_arquivo = None
+_lock_global = threading.Lock()
+
+
+def _arquivo_do_processo():
+    global _arquivo, _pid_arquivo
+    diretorio = os.getenv("MEDICAOLAB_ARQUIVO_RESPOSTAS")
+    if not diretorio:
+        return None
+    with _lock_global:
+        # Após um fork, o processo filho abre seus próprios segmentos
+        if _arquivo is None or _pid_arquivo != os.getpid():
+            _arquivo, _pid_arquivo = ArquivoRespostas(diretorio), os.getpid()
+        return _arquivo
+
+
+def arquivar_resposta(response, url, json_enviado=None):
+    """Chamado por requisicao_get/requisicao_post; só arquiva se o arquivamento estiver ativo"""
+    if response.status_code != 200:
+        return
+    arquivo = _arquivo_do_processo()
+    if arquivo is None:
+        return
+    consulta = json_enviado.get("query") if isinstance(json_enviado, dict) else None
+    variaveis = json_enviado.get("variables") if isinstance(json_enviado, dict) else None
+    arquivo.adicionar(response.content, url, consulta, variaveis)
+
+
+def ler_indice(diretorio):
+    """Todas as entradas do arquivo, em ordem de data/hora: lista de dicts com 'segmento'"""
+    entradas = []
+    for nome in sorted(os.listdir(diretorio)):
+        if nome.startswith("seg-") and nome.endswith(".csv"):
+            with open(os.path.join(diretorio, nome), newline='', encoding='utf-8') as f:
+                for linha in csv.DictReader(f):
+                    linha['segmento'] = nome[:-4] + ".gz"
+                    linha['offset'], linha['tamanho'] = int(linha['offset']), int(linha['tamanho'])
+                    entradas.append(linha)
+    entradas.sort(key=lambda e: e['data_hora'])
+    return entradas
+
+
+def ler_resposta(diretorio, entrada, arquivo=None):
+    """Bytes descomprimidos de uma resposta (arquivo: segmento já aberto, para leituras em sequência)"""
+    if arquivo is None:
+        with open(os.path.join(diretorio, entrada['segmento']), 'rb') as f:
+            return ler_resposta(diretorio, entrada, f)
+    arquivo.seek(entrada['offset'])
+    return gzip.decompress(arquivo.read(entrada['tamanho']))
+
+
+def carregar_consultas(diretorio):
+    pasta = os.path.join(diretorio, 'consultas')
+    consultas = {}
+    for nome in os.listdir(pasta):
+        if nome.endswith(".txt"):
+            with open(os.path.join(pasta, nome), encoding='utf-8') as f:
+                consultas[nome[:-4]] = f.read()
+    return consultas
+
+
+def perfis_por_hash():
+    """hash da consulta de busca de cada perfil -> nome do perfil"""
+    from consultas_graphql import PERFIS, montar_consulta
+    return {hash_consulta(montar_consulta(perfil)): perfil for perfil in PERFIS}
+
+
+def _normalizar_lote(diretorio, entradas, perfil):
+    """Extrai as linhas das páginas de busca de um lote de entradas (roda num processo do pool)"""
+    from consultas_graphql import extrair_linha
+    from deduplicacao import chave_repositorio
+    linhas, falhas = [], 0
+    abertos = {}
+    try:
+        for entrada in entradas:
+            if entrada['segmento'] not in abertos:
+                abertos[entrada['segmento']] = open(os.path.join(diretorio, entrada['segmento']), 'rb')
+            dados = json.loads(ler_resposta(diretorio, entrada, abertos[entrada['segmento']]))
+            busca = (dados.get("data") or {}).get("search")
+            for no in (busca or {}).get("nodes") or []:
+                try:
+                    linhas.append((chave_repositorio(no), extrair_linha(no, perfil)))
+                except (KeyError, TypeError):
+                    falhas += 1
+    finally:
+        for arquivo in abertos.values():
+            arquivo.close()
+    return linhas, falhas
+
+
+def renormalizar(diretorio, saida, perfil=None, desde=None, ate=None, processos=None):
+    """
+    Reconstrói o dataset a partir das páginas de busca arquivadas. Sem `perfil`,
+    usa o perfil reconhecido pelo hash das consultas (o menor, se houver vários).
+    Repositórios repetidos ficam com a versão mais recente. Retorna o número de linhas.
+    """
+    from consultas_graphql import PERFIS, colunas_do_perfil
+    from deduplicacao import ColecaoDeduplicada
+
+    conhecidos = perfis_por_hash()
+    entradas = [e for e in ler_indice(diretorio) if e['tipo'] == 'graphql'
+                and (desde is None or e['data_hora'] >= desde) and (ate is None or e['data_hora'] <= ate)]
+    consultas = carregar_consultas(diretorio)
+    entradas = [e for e in entradas if 'search(' in consultas.get(e['hash'], '')]
+    if perfil is None:
+        detectados = {conhecidos[e['hash']] for e in entradas if e['hash'] in conhecidos}
+        perfil = min(detectados, key=lambda p: len(PERFIS[p])) if detectados else 'full'
+    print(f"{len(entradas)} páginas de busca arquivadas; perfil {perfil}")
+
+    lotes = [entradas[i:i + REGISTROS_POR_TAREFA] for i in range(0, len(entradas), REGISTROS_POR_TAREFA)]
+    colecao = ColecaoDeduplicada()
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for linhas, falhas_lote in executor.map(_normalizar_lote, [diretorio] * len(lotes), lotes,
+                                                [perfil] * len(lotes)):
+            falhas += falhas_lote
+            for chave, linha in linhas:
+                colecao.adicionar(linha, chave)
+    if falhas:
+        print(f"Aviso: {falhas} nós sem os campos do perfil {perfil} foram ignorados")
+
+    colunas = colunas_do_perfil(perfil)
+    if saida.lower().endswith(".parquet"):
+        import pandas as pd
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Saída .parquet precisa do pacote pyarrow: pip install pyarrow") from None
+        pd.DataFrame(colecao.itens, columns=colunas).to_parquet(saida, index=False)
+    else:
+        from arquivos_comprimidos import abrir
+        with abrir(saida, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=colunas)
+            writer.writeheader()
+            writer.writerows(colecao.itens)
+    print(f"{len(colecao)} repositórios ({colecao.duplicados} repetições) reconstruídos em {saida}")
+    return len(colecao)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Arquivo de respostas brutas da API')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    renorm = subparsers.add_parser('renormalizar', help='Reconstrói o CSV/Parquet a partir do arquivo, sem rede')
+    renorm.add_argument('diretorio')
+    renorm.add_argument('saida', help='.csv, .csv.gz, .csv.zst ou .parquet')
+    renorm.add_argument('--perfil', default=None, help='Perfil de colunas (padrão: o das consultas arquivadas)')
+    renorm.add_argument('--desde', default=None, help='Somente respostas a partir desta data/hora ISO (UTC)')
+    renorm.add_argument('--ate', default=None, help='Somente respostas até esta data/hora ISO (UTC)')
+    renorm.add_argument('--processos', type=int, default=None)
+
+    resumo = subparsers.add_parser('resumo', help='Respostas arquivadas por consulta')
+    resumo.add_argument('diretorio')
+
+    args = parser.parse_args(argv)
+    if args.comando == 'renormalizar':
+        renormalizar(args.diretorio, args.saida, args.perfil, args.desde, args.ate, args.processos)
+    else:
+        conhecidos = perfis_por_hash()
+        contagens = {}
+        for entrada in ler_indice(args.diretorio):
+            rotulo = (f"busca ({conhecidos[entrada['hash']]})" if entrada['hash'] in conhecidos
+                      else entrada['url'] if entrada['tipo'] == 'rest' else f"consulta {entrada['hash']}")
+            contagem = contagens.setdefault(rotulo, [0, 0, entrada['data_hora'], None])
+            contagem[0] += 1
+            contagem[1] += entrada['tamanho']
+            contagem[3] = entrada['data_hora']
+        for rotulo, (quantidade, tamanho, inicio, fim) in contagens.items():
+            print(f"{rotulo}: {quantidade} respostas, {tamanho / 1e6:.1f} MB comprimidos, {inicio} .. {fim}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,136 @@
+"""
+Leitura e escrita de arquivos com compressão escolhida pela extensão.
+
+    .gz   gzip (biblioteca padrão)
+    .zst  zstd (pacote opcional `zstandard`)
+    outra sem compressão
+
+A compressão é feita em streaming, sem montar o arquivo inteiro na memória, e
+em várias threads para não virar o gargalo da coleta. No gzip, o texto é
+cortado em blocos de 1 MiB comprimidos em paralelo (zlib libera o GIL), e
+cada bloco vira um membro gzip. Membros concatenados formam um .gz válido,
+lido normalmente por gzip, zcat e pandas. No zstd, o compressor multithread
+da própria biblioteca é usado.
+
+    with abrir("repositorios.csv.zst", "w", newline="") as f:
+        csv.writer(f).writerows(linhas)
+"""
+import gzip
+import io
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+EXTENSOES = {'.gz': 'gzip', '.zst': 'zstd'}
+NIVEL_GZIP = 6
+NIVEL_ZSTD = 3
+TAMANHO_BLOCO = 1 << 20
+
+
+def compressao(caminho):
+    """'gzip', 'zstd' ou None, de acordo com a extensão do arquivo"""
+    return EXTENSOES.get(os.path.splitext(str(caminho))[1].lower())
+
+
+def eh_csv(caminho):
+    """True para .csv, .csv.gz e .csv.zst"""
+    caminho = str(caminho).lower()
+    if compressao(caminho):
+        caminho = os.path.splitext(caminho)[0]
+    return caminho.endswith('.csv')
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("Arquivos .zst precisam do pacote zstandard: pip install zstandard") from None
+    return zstandard
+
+
+class EscritorGzipParalelo(io.RawIOBase):
+    """Escrita gzip em blocos comprimidos por um pool de threads, gravados na ordem"""
+
+    def __init__(self, arquivo, nivel=NIVEL_GZIP, threads=None):
+        super().__init__()
+        self._arquivo = arquivo
+        self._nivel = nivel
+        self._threads = threads or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(max_workers=self._threads, thread_name_prefix="gzip")
+        self._pendentes = deque()
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self._buffer += dados
+        while len(self._buffer) >= TAMANHO_BLOCO:
+            self._enviar(bytes(self._buffer[:TAMANHO_BLOCO]))
+            del self._buffer[:TAMANHO_BLOCO]
+        return len(dados)
+
+    def _enviar(self, bloco):
+        self._pendentes.append(self._executor.submit(gzip.compress, bloco, self._nivel, mtime=0))
+        # Limita a memória: no máximo dois blocos em espera por thread
+        while len(self._pendentes) > 2 * self._threads:
+            self._arquivo.write(self._pendentes.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer:
+                self._enviar(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pendentes:
+                self._arquivo.write(self._pendentes.popleft().result())
+        finally:
+            self._executor.shutdown()
+            self._arquivo.close()
+            super().close()
+
+
+def _abrir_binario(caminho, modo, nivel, threads):
+    tipo = compressao(caminho)
+    if tipo is None:
+        return open(caminho, modo + 'b')
+    if tipo == 'gzip':
+        if modo == 'r':
+            return gzip.open(caminho, 'rb')
+        return io.BufferedWriter(EscritorGzipParalelo(open(caminho, 'wb'), nivel or NIVEL_GZIP, threads))
+    zstandard = _zstandard()
+    if modo == 'r':
+        # BufferedReader acrescenta readline/iteração por linhas ao leitor do zstandard
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb')))
+    compressor = zstandard.ZstdCompressor(level=nivel or NIVEL_ZSTD, threads=-1 if threads is None else threads)
+    return compressor.stream_writer(open(caminho, 'wb'))
+
+
+def abrir(caminho, modo='r', encoding='utf-8', newline=None, nivel=None, threads=None):
+    """
+    Abre `caminho` para leitura ('r'/'rb') ou escrita ('w'/'wb'), comprimindo ou
+    descomprimindo conforme a extensão. Nos modos texto, retorna um arquivo de
+    texto comum (aceito por csv, pandas e print).
+    """
+    binario = 'b' in modo
+    base = modo.replace('b', '').replace('t', '')
+    if base not in ('r', 'w'):
+        raise ValueError(f"Modo não suportado: {modo}. Use r, w, rb ou wb")
+    arquivo = _abrir_binario(caminho, base, nivel, threads)
+    if binario:
+        return arquivo
+    return io.TextIOWrapper(arquivo, encoding=encoding, newline=newline)
+
+
+def ler_csv(caminho, **kwargs):
+    """pd.read_csv com a descompressão de abrir()"""
+    import pandas as pd
+    with abrir(caminho, newline='') as f:
+        return pd.read_csv(f, **kwargs)
+
+
+def salvar_csv(df, caminho, **kwargs):
+    """DataFrame.to_csv com a compressão paralela de abrir()"""
+    with abrir(caminho, 'w', newline='') as f:
+        df.to_csv(f, **kwargs)
@@ -0,0 +1,192 @@
+"""
+Série mensal de commits por repositório via janelas de history com alias.
+
+Em vez de percorrer o histórico de commits, cada consulta GraphQL pede, para
+vários repositórios de uma vez, um campo `history(since:, until:) { totalCount }`
+por mês, com aliases (r0 { m0 m1 ... } r1 { ... }). Com 50 repositórios por
+consulta, 1000 repositórios × 12 meses cabem em 20 requisições. Se a API
+estourar o tempo ou a complexidade de uma consulta grande, o lote é dividido
+ao meio e tentado de novo; no limite de taxa, o mesmo lote espera e é repetido.
+
+O resultado é uma matriz inteira repositório × mês (int32, -1 quando o
+repositório não foi encontrado), salva em .npz junto com as chaves e os meses.
+
+    python atividade_commits.py repositorios_populares_github.csv atividade_commits.npz --meses 12
+"""
+import argparse
+import csv
+import json
+import random
+import time
+from datetime import date
+from functools import partial
+
+import numpy as np
+import requests
+
+from arquivos_comprimidos import abrir
+from enriquecimento import enriquecer_em_ordem, requisicao_post
+from limitador_taxa import limitador_global
+
+URL_GRAPHQL = "https://api.github.com/graphql"
+SEM_DADOS = -1
+
+
+def janelas_mensais(meses, referencia=None):
+    """Os `meses` meses completos anteriores ao mês de referência: [(AAAA-MM, since, until), ...]"""
+    referencia = referencia or date.today()
+    ano, mes = referencia.year, referencia.month
+    janelas = []
+    for _ in range(meses):
+        fim = f"{ano:04d}-{mes:02d}-01T00:00:00Z"
+        ano, mes = (ano, mes - 1) if mes > 1 else (ano - 1, 12)
+        janelas.append((f"{ano:04d}-{mes:02d}", f"{ano:04d}-{mes:02d}-01T00:00:00Z", fim))
+    return janelas[::-1]
+
+
+def montar_consulta_lote(repos, janelas):
+    """Uma consulta com um alias por repositório e, dentro dele, um alias de history por mês"""
+    historicos = " ".join(f'm{j}: history(since: "{inicio}", until: "{fim}") {{ totalCount }}'
+                          for j, (_, inicio, fim) in enumerate(janelas))
+    blocos = [
+        f"r{i}: repository(owner: {json.dumps(dono)}, name: {json.dumps(nome)}) "
+        f"{{ defaultBranchRef {{ target {{ ... on Commit {{ {historicos} }} }} }} }}"
+        for i, (dono, nome) in enumerate(repos)
+    ]
+    return "query {\n" + "\n".join(blocos) + "\nrateLimit { cost remaining }\n}"
+
+
+def _extrair_lote(data, quantidade, num_meses):
+    linhas = np.full((quantidade, num_meses), SEM_DADOS, dtype=np.int32)
+    for i in range(quantidade):
+        repo = data.get(f"r{i}")
+        ref = repo.get("defaultBranchRef") if repo else None
+        alvo = ref.get("target") if ref else None
+        if alvo and "m0" in alvo:
+            linhas[i] = [alvo[f"m{j}"]["totalCount"] for j in range(num_meses)]
+        elif repo is not None:
+            linhas[i] = 0  # repositório vazio, sem branch padrão
+    return linhas
+
+
+def _classificar_falha(response, corpo):
+    """
+    'limite' (403/429 ou RATE_LIMITED), 'dividir' (502/504 ou timeout/complexidade
+    no GraphQL), 'transitoria' (demais 5xx) ou None (erro que não adianta repetir)
+    """
+    mensagens = " ".join(f"{erro.get('type', '')} {erro.get('message', '')}"
+                         for erro in (corpo or {}).get("errors") or []).lower()
+    if response.status_code in (403, 429) or "rate_limited" in mensagens or "rate limit" in mensagens:
+        return "limite"
+    if response.status_code in (502, 504) or "timeout" in mensagens or "complexity" in mensagens:
+        return "dividir"
+    if response.status_code >= 500:
+        return "transitoria"
+    return None
+
+
+def consultar_lote(repos, janelas, max_retries=5):
+    """
+    Busca as contagens mensais de um lote. Se a consulta falhar por tamanho ou
+    tempo limite (502/504, timeout ou complexidade), divide o lote ao meio e
+    consulta cada metade. No limite de taxa (403/429), pausa o limitador global
+    e repete o mesmo lote; outros 5xx e erros de conexão são repetidos com
+    backoff exponencial. Os demais 4xx falham na hora.
+    """
+    consulta = montar_consulta_lote(repos, janelas)
+    for tentativa in range(1, max_retries + 1):
+        try:
+            response = requisicao_post(URL_GRAPHQL, json={"query": consulta})
+        except requests.RequestException as e:
+            # Timeout ou conexão perdida: nada a dividir sem saber a causa, repete o mesmo lote
+            response, corpo, falha, motivo = None, None, "transitoria", type(e).__name__
+        else:
+            try:
+                corpo = response.json()
+            except ValueError:
+                corpo = None
+            falha, motivo = _classificar_falha(response, corpo), response.status_code
+            # Erros NOT_FOUND de repositórios removidos vêm junto com os dados dos demais
+            if response.status_code == 200 and falha is None and corpo and corpo.get("data") is not None:
+                return _extrair_lote(corpo["data"], len(repos), len(janelas))
+
+        if falha == "dividir" and len(repos) > 1:
+            meio = len(repos) // 2
+            print(f"Consulta de {len(repos)} repositórios falhou ({motivo}), dividindo o lote")
+            return np.vstack([consultar_lote(repos[:meio], janelas, max_retries),
+                              consultar_lote(repos[meio:], janelas, max_retries)])
+        if falha is None or tentativa == max_retries:
+            break
+        if falha == "limite":
+            espera = float(response.headers.get("Retry-After") or 60 * tentativa)
+            print(f"Limite de taxa atingido, aguardando {espera:.0f} segundos...")
+            # A próxima requisicao_post espera o fim da pausa no limitador
+            limitador_global.pausar(espera)
+        else:
+            espera = 2 ** tentativa + random.uniform(0, 1)
+            print(f"Erro {motivo}, tentando novamente em {espera:.2f} segundos "
+                  f"(tentativa {tentativa}/{max_retries})")
+            time.sleep(espera)
+    raise Exception(f"Failed to fetch commit history for {len(repos)} repositories "
+                    f"starting at {repos[0][0]}/{repos[0][1]}: {motivo}")
+
+
+def coletar_atividade_mensal(repos, meses=12, repos_por_consulta=50, num_workers=1, referencia=None):
+    """
+    Monta a matriz repositório × mês de commits na branch padrão.
+    `repos` é uma lista de (proprietario, nome). Retorna (chaves, rótulos dos meses, matriz).
+    """
+    janelas = janelas_mensais(meses, referencia)
+    lotes = [repos[i:i + repos_por_consulta] for i in range(0, len(repos), repos_por_consulta)]
+    matriz = np.full((len(repos), meses), SEM_DADOS, dtype=np.int32)
+    consultar = partial(consultar_lote, janelas=janelas)
+    for indice, linhas, erro in enriquecer_em_ordem(lotes, consultar, num_workers):
+        inicio = indice * repos_por_consulta
+        if erro is None:
+            matriz[inicio:inicio + len(linhas)] = linhas
+            print(f"Lote {indice + 1}/{len(lotes)}: {len(linhas)} repositórios")
+        else:
+            print(f"Erro no lote {indice + 1}/{len(lotes)}: {erro}")
+    chaves = [f"{dono}/{nome}" for dono, nome in repos]
+    return chaves, [rotulo for rotulo, _, _ in janelas], matriz
+
+
+def salvar_matriz(caminho, chaves, meses, matriz):
+    np.savez_compressed(caminho, matriz=matriz, chaves=np.array(chaves), meses=np.array(meses))
+
+
+def carregar_matriz(caminho):
+    """Retorna (chaves, meses, matriz) de um arquivo salvo por salvar_matriz"""
+    with np.load(caminho) as dados:
+        return dados['chaves'].tolist(), dados['meses'].tolist(), dados['matriz']
+
+
+def repos_do_csv(caminho):
+    with abrir(caminho, newline='') as f:
+        return [(linha['proprietario'], linha['nome']) for linha in csv.DictReader(f)
+                if linha.get('proprietario') and linha['proprietario'] != 'ERRO']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Commits mensais por repositório (matriz repositório × mês)')
+    parser.add_argument('csv', help='CSV da coleta com as colunas proprietario e nome')
+    parser.add_argument('saida', help='Arquivo .npz de saída (um .csv ao lado também é gravado)')
+    parser.add_argument('--meses', type=int, default=12)
+    parser.add_argument('--repos-por-consulta', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=1, help='Consultas simultâneas')
+    args = parser.parse_args(argv)
+
+    repos = repos_do_csv(args.csv)
+    print(f"Buscando {args.meses} meses de commits para {len(repos)} repositórios...")
+    chaves, meses, matriz = coletar_atividade_mensal(repos, args.meses, args.repos_por_consulta, args.workers)
+    salvar_matriz(args.saida, chaves, meses, matriz)
+    saida_csv = args.saida.removesuffix('.npz') + '.csv'
+    with open(saida_csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['repositorio'] + meses)
+        writer.writerows([chave] + linha for chave, linha in zip(chaves, matriz.tolist()))
+    print(f"Matriz {matriz.shape[0]}×{matriz.shape[1]} salva em {args.saida} e {saida_csv}")
+
+
+if __name__ == "__main__":
+    main()
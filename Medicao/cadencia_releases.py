@@ -0,0 +1,162 @@
+"""
+Cadência de releases por repositório, com paginação incremental das datas.
+
+As releases são paginadas via GraphQL da mais nova para a mais antiga
+(`releases(orderBy: {field: CREATED_AT, direction: DESC})`). As datas e os
+downloads dos assets de cada release ficam guardados em um arquivo JSON por
+repositório. Numa nova coleta, a paginação para na primeira release que já
+estava guardada, então só as releases novas são buscadas. Os downloads vêm dos
+mesmos nós (`releaseAssets { downloadCount }`) e não custam requisições extras.
+Os downloads de releases antigas ficam com o valor da coleta em que foram vistas.
+
+As métricas (releases por ano, releases nos últimos 365 dias, intervalo mediano
+entre releases, dias desde a última e downloads) saem de uma única função,
+metricas_repositorio, usada tanto pelo enriquecimento da coleta quanto pelo
+relatório de todos os repositórios.
+
+    python cadencia_releases.py historico_releases/ cadencia_releases.csv
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+
+from enriquecimento import consultar_pagina_busca
+
+DIRETORIO_HISTORICO = os.getenv("MEDICAOLAB_HISTORICO_RELEASES", "historico_releases")
+SEGUNDOS_POR_DIA = 86400
+COLUNAS_CADENCIA = ['releases_por_ano', 'releases_ultimo_ano', 'intervalo_mediano_dias',
+                    'dias_desde_ultima_release', 'downloads_assets']
+
+CONSULTA_RELEASES = """
+query($owner: String!, $nome: String!, $cursor: String) {
+  repository(owner: $owner, name: $nome) {
+    releases(first: 100, after: $cursor, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes { createdAt releaseAssets(first: 100) { nodes { downloadCount } } }
+    }
+  }
+}
+"""
+
+
+def _caminho_historico(dono, nome, diretorio=DIRETORIO_HISTORICO):
+    return os.path.join(diretorio, f"{dono}__{nome}.json")
+
+
+def carregar_historico(dono, nome, diretorio=DIRETORIO_HISTORICO):
+    """Retorna {'datas': [epoch s, ...], 'downloads': [...]} em ordem crescente de data"""
+    caminho = _caminho_historico(dono, nome, diretorio)
+    if not os.path.exists(caminho):
+        return {'datas': [], 'downloads': []}
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _salvar_historico(dono, nome, historico, diretorio=DIRETORIO_HISTORICO):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho = _caminho_historico(dono, nome, diretorio)
+    with open(caminho + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(historico, f)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def _epoch(texto):
+    return int(datetime.fromisoformat(texto.replace("Z", "+00:00")).timestamp())
+
+
+def atualizar_historico(dono, nome, diretorio=DIRETORIO_HISTORICO):
+    """Busca apenas as releases mais novas que a última guardada e atualiza o arquivo do repositório"""
+    historico = carregar_historico(dono, nome, diretorio)
+    ultima = historico['datas'][-1] if historico['datas'] else None
+    novas_datas, novos_downloads = [], []
+    cursor = None
+    while True:
+        # Backoff em 5xx e pausa no limite de taxa, como na busca
+        data = consultar_pagina_busca(CONSULTA_RELEASES, {"owner": dono, "nome": nome, "cursor": cursor})
+        if data is None:
+            raise Exception("Failed to fetch releases: tentativas esgotadas")
+        pagina = data["repository"]["releases"]
+        alcancou_guardadas = False
+        for no in pagina["nodes"]:
+            data_release = _epoch(no["createdAt"])
+            if ultima is not None and data_release <= ultima:
+                alcancou_guardadas = True
+                break
+            novas_datas.append(data_release)
+            novos_downloads.append(sum(a["downloadCount"] for a in no["releaseAssets"]["nodes"]))
+        if alcancou_guardadas or not pagina["pageInfo"]["hasNextPage"]:
+            break
+        cursor = pagina["pageInfo"]["endCursor"]
+
+    if novas_datas or not os.path.exists(_caminho_historico(dono, nome, diretorio)):
+        # As páginas vêm da mais nova para a mais antiga
+        historico['datas'] += novas_datas[::-1]
+        historico['downloads'] += novos_downloads[::-1]
+        _salvar_historico(dono, nome, historico, diretorio)
+    return historico
+
+
+def metricas_repositorio(historico, agora=None):
+    """Métricas de cadência de um repositório a partir do histórico ({'datas': [...], 'downloads': [...]})"""
+    agora = time.time() if agora is None else agora
+    datas = historico['datas']
+    if not datas:
+        return {'releases_por_ano': 0.0, 'releases_ultimo_ano': 0, 'intervalo_mediano_dias': None,
+                'dias_desde_ultima_release': None, 'downloads_assets': int(sum(historico['downloads']))}
+    # Período mínimo de um ano para que projetos novos não tenham taxas infladas
+    anos = max((agora - datas[0]) / (365.25 * SEGUNDOS_POR_DIA), 1.0)
+    intervalos = [(b - a) / SEGUNDOS_POR_DIA for a, b in zip(datas, datas[1:])]
+    return {
+        'releases_por_ano': len(datas) / anos,
+        'releases_ultimo_ano': sum(d >= agora - 365 * SEGUNDOS_POR_DIA for d in datas),
+        'intervalo_mediano_dias': statistics.median(intervalos) if intervalos else None,
+        'dias_desde_ultima_release': (agora - datas[-1]) / SEGUNDOS_POR_DIA,
+        'downloads_assets': int(sum(historico['downloads'])),
+    }
+
+
+def calcular_metricas(historicos, agora=None):
+    """
+    Métricas de cadência para vários repositórios.
+    `historicos` é {chave: {'datas': [...], 'downloads': [...]}}; retorna um DataFrame indexado pela chave.
+    """
+    # pandas só aqui: o enriquecimento por repositório é importado pela coleta
+    import pandas as pd
+
+    agora = time.time() if agora is None else agora
+    linhas = [metricas_repositorio(historico, agora) for historico in historicos.values()]
+    return pd.DataFrame(linhas, columns=COLUNAS_CADENCIA, index=pd.Index(list(historicos), name='repositorio'))
+
+
+def enriquecer_cadencia_releases(linha):
+    """Atualiza o histórico de releases do repositório e calcula suas métricas de cadência"""
+    historico = atualizar_historico(linha['proprietario'], linha['nome'])
+    metricas = metricas_repositorio(historico)
+    return {coluna: (None if valor is None else round(valor, 2)) for coluna, valor in metricas.items()}
+
+
+def carregar_diretorio(diretorio=DIRETORIO_HISTORICO):
+    historicos = {}
+    for arquivo in sorted(os.listdir(diretorio)):
+        if arquivo.endswith(".json"):
+            with open(os.path.join(diretorio, arquivo), encoding='utf-8') as f:
+                historicos[arquivo[:-5].replace("__", "/", 1)] = json.load(f)
+    return historicos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Métricas de cadência de releases a partir do histórico guardado')
+    parser.add_argument('diretorio', nargs='?', default=DIRETORIO_HISTORICO)
+    parser.add_argument('saida', nargs='?', default='cadencia_releases.csv')
+    args = parser.parse_args(argv)
+
+    metricas = calcular_metricas(carregar_diretorio(args.diretorio))
+    metricas.to_csv(args.saida)
+    print(f"Cadência de {len(metricas)} repositórios salva em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
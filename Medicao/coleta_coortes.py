@@ -0,0 +1,149 @@
+"""
+Coleta de várias coortes de busca numa única execução.
+
+Cada coorte é uma busca nomeada (ex.: microservices="microservices stars:>100",
+top="stars:>1000"). Em vez de rodar um processo por coorte disputando o mesmo
+token, as paginações são intercaladas: a cada rodada, a próxima página de
+cada coorte ativa é buscada em paralelo, todas pela mesma sessão por worker e
+pelo mesmo limitador de taxa global (enriquecimento.requisicao_post). Um
+limite de taxa atingido por uma coorte pausa todas.
+
+Um repositório encontrado por mais de uma coorte é guardado uma vez só. A
+coluna 'coortes' do CSV lista todas as coortes que o encontraram, na ordem
+em que foram declaradas.
+
+    python coleta_coortes.py --coorte microservices="microservices stars:>100" \\
+        --coorte kubernetes="kubernetes stars:>100" --coorte top="stars:>1000" --num-repos 1000
+    python coleta_coortes.py --arquivo coortes.json --saida coortes.csv
+
+O arquivo JSON é uma lista de {"nome": ..., "busca": ..., "num_repos": ...}.
+"""
+import argparse
+import json
+
+from consultas_graphql import montar_consulta
+from deduplicacao import ColecaoDeduplicada, chave_repositorio
+from enriquecimento import consultar_pagina_busca, enriquecer_em_ordem
+from main_sprint_2 import ENRIQUECIMENTOS, collect_and_save_to_csv, descrever_custo
+from registros import RegistroSprint2
+
+
+def ler_coorte(texto):
+    """Converte 'nome=busca' em (nome, busca)"""
+    nome, separador, busca = texto.partition("=")
+    if not separador or not nome.strip() or not busca.strip():
+        raise argparse.ArgumentTypeError(f"Coorte inválida: {texto!r}. Use nome=\"busca\"")
+    return nome.strip(), busca.strip()
+
+
+def carregar_coortes(caminho, num_repos_padrao):
+    with open(caminho, encoding='utf-8') as f:
+        return [{'nome': c['nome'], 'busca': c['busca'], 'num_repos': c.get('num_repos', num_repos_padrao)}
+                for c in json.load(f)]
+
+
+def _proxima_pagina(estado, query, batch_size):
+    variables = {
+        "numRepos": min(batch_size, estado['num_repos'] - len(estado['chaves'])),
+        "searchQuery": estado['busca'],
+        "cursor": estado['cursor'],
+    }
+    return consultar_pagina_busca(query, variables)
+
+
+def coletar_coortes(coortes, batch_size=25, perfil="full", compactar=True, exigir_completas=False):
+    """
+    Pagina todas as coortes de forma intercalada.
+    `coortes` é uma lista de {'nome', 'busca', 'num_repos'}. Retorna (repos, coortes_por_repo):
+    os repositórios únicos, na ordem em que foram encontrados, e a lista de coortes de cada um.
+    Com `exigir_completas`, uma coorte interrompida ou com menos repositórios que
+    min(num_repos, repositoryCount) levanta RuntimeError em vez de devolver a coleta parcial.
+    """
+    nomes = [c['nome'] for c in coortes]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Nomes de coorte repetidos: {', '.join(nomes)}")
+    query = montar_consulta(perfil)
+    todos = ColecaoDeduplicada()
+    membros = {}  # chave -> coortes que encontraram o repositório
+    estados = [{**c, 'cursor': None, 'chaves': set(), 'custo': 0, 'total_busca': c['num_repos'], 'ativa': True,
+                'interrompida': False}
+               for c in coortes]
+
+    rodada = 0
+    while True:
+        ativas = [e for e in estados if e['ativa'] and len(e['chaves']) < e['num_repos']]
+        if not ativas:
+            break
+        rodada += 1
+        buscar = lambda estado: _proxima_pagina(estado, query, batch_size)
+        for indice, data, erro in enriquecer_em_ordem(ativas, buscar, num_workers=len(ativas)):
+            estado = ativas[indice]
+            if erro is not None or data is None:
+                print(f"[{estado['nome']}] Busca interrompida: {erro or 'tentativas esgotadas'}")
+                estado['ativa'] = False
+                estado['interrompida'] = True
+                continue
+
+            nos = data["search"]["nodes"]
+            for repo in nos:
+                chave = chave_repositorio(repo)
+                registro = RegistroSprint2.de_no(repo, perfil) if compactar else repo
+                todos.adicionar(registro, chave)
+                if chave not in estado['chaves']:
+                    estado['chaves'].add(chave)
+                    membros.setdefault(chave, []).append(estado['nome'])
+            estado['total_busca'] = data["search"]["repositoryCount"]
+            estado['cursor'] = data["search"]["pageInfo"]["endCursor"]
+            estado['ativa'] = data["search"]["pageInfo"]["hasNextPage"] and bool(nos)
+            rate_limit = data.get("rateLimit")
+            estado['custo'] += rate_limit["cost"] if rate_limit else 0
+            custo = descrever_custo(rate_limit, len(nos))
+            print(f"[{estado['nome']}] Rodada {rodada}: {len(nos)} repositórios, "
+                  f"{len(estado['chaves'])}/{estado['num_repos']}" + (f" ({custo})" if custo else ""))
+
+    for estado in estados:
+        print(f"[{estado['nome']}] {len(estado['chaves'])} repositórios de "
+              f"{min(estado['num_repos'], estado['total_busca'])} esperados, custo total {estado['custo']} pontos")
+    incompletas = [e['nome'] for e in estados
+                   if e['interrompida'] or len(e['chaves']) < min(e['num_repos'], e['total_busca'])]
+    if exigir_completas and incompletas:
+        raise RuntimeError(f"Coortes incompletas: {', '.join(incompletas)}")
+    compartilhados = sum(len(c) > 1 for c in membros.values())
+    print(f"{len(todos)} repositórios únicos; {compartilhados} aparecem em mais de uma coorte")
+
+    ordem = {nome: i for i, nome in enumerate(nomes)}
+    chaves = list(membros)
+    return todos.itens, [sorted(membros[chave], key=ordem.get) for chave in chaves]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Coleta várias coortes de busca com um único cliente e limitador')
+    parser.add_argument('--coorte', type=ler_coorte, action='append', default=[],
+                        help='Coorte no formato nome="busca" (pode ser repetido)')
+    parser.add_argument('--arquivo', default=None, help='JSON com a lista de coortes')
+    parser.add_argument('--num-repos', type=int, default=1000, help='Repositórios por coorte')
+    parser.add_argument('--batch-size', type=int, default=25, help='Repositórios por página da busca')
+    parser.add_argument('--perfil', default='full', help='Perfil de consulta (full, hypotheses-minimal)')
+    parser.add_argument('--enriquecimento', action='append', default=[], choices=list(ENRIQUECIMENTOS))
+    parser.add_argument('--workers', type=int, default=8, help='Workers do estágio de enriquecimento')
+    parser.add_argument('--saida', default='repositorios_coortes.csv')
+    args = parser.parse_args(argv)
+
+    coortes = [{'nome': nome, 'busca': busca, 'num_repos': args.num_repos} for nome, busca in args.coorte]
+    if args.arquivo:
+        coortes += carregar_coortes(args.arquivo, args.num_repos)
+    if not coortes:
+        parser.error("Informe ao menos uma coorte (--coorte ou --arquivo)")
+
+    repos, coortes_por_repo = coletar_coortes(coortes, args.batch_size, args.perfil)
+    if not repos:
+        print("Nenhum repositório encontrado!")
+        return 1
+    collect_and_save_to_csv(repos, args.saida, args.perfil, args.enriquecimento, args.workers,
+                            coortes=coortes_por_repo)
+    print(f"Dados de {len(repos)} repositórios salvos em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,405 @@
+"""
+Coleta distribuída: um coordenador e vários workers sobre uma fila em SQLite.
+
+O coordenador divide o trabalho em tarefas e grava a fila num arquivo SQLite
+em armazenamento compartilhado:
+  - busca: uma fatia do espaço de busca (faixa de estrelas ou de datas de
+    criação), para contornar o limite de 1000 resultados por busca;
+  - enriquecimento: um intervalo de linhas de um CSV já coletado.
+
+Cada worker (em qualquer máquina, com o próprio GITHUB_TOKEN) reivindica uma
+tarefa por vez com um lease. Enquanto a tarefa roda, o lease é renovado
+periodicamente. Se o worker morrer, o lease expira e outro worker retoma a
+tarefa. Uma falha devolve a tarefa à fila até o limite de tentativas. O
+resultado de cada tarefa vai para uma partição própria
+(saida/parte-00001.csv). O comando `mesclar` junta as partições na ordem das
+tarefas, sem repositórios repetidos.
+
+    python coleta_distribuida.py planejar fila.db --fatias-estrelas 1000,2000,5000,20000
+    python coleta_distribuida.py planejar fila.db --csv repositorios_populares_github.csv \\
+        --enriquecimento latencia_prs --linhas-por-tarefa 100
+    python coleta_distribuida.py trabalhar fila.db partes/        # em cada máquina
+    python coleta_distribuida.py local fila.db partes/ --workers 4 # vários workers nesta máquina
+    python coleta_distribuida.py status fila.db
+    python coleta_distribuida.py mesclar fila.db partes/ repositorios_distribuidos.csv
+"""
+import argparse
+import csv
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from arquivos_comprimidos import abrir
+
+PENDENTE, EM_ANDAMENTO, CONCLUIDA, FALHOU = 'pendente', 'em_andamento', 'concluida', 'falhou'
+LEASE_SEGUNDOS = 300
+MAX_TENTATIVAS = 3
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id INTEGER PRIMARY KEY,
+    tipo TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    estado TEXT NOT NULL DEFAULT 'pendente',
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    disponivel_em REAL NOT NULL DEFAULT 0,
+    lease_ate REAL,
+    worker TEXT,
+    erro TEXT,
+    linhas INTEGER
+)
+"""
+
+
+def conectar(caminho):
+    # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE
+    conexao = sqlite3.connect(caminho, timeout=60, isolation_level=None)
+    conexao.execute(ESQUEMA)
+    return conexao
+
+
+def fatias_estrelas(limites):
+    """[1000, 2000, 5000] -> ['stars:1000..1999', 'stars:2000..4999', 'stars:>=5000']"""
+    fatias = [f"stars:{inicio}..{fim - 1}" for inicio, fim in zip(limites, limites[1:])]
+    return fatias + [f"stars:>={limites[-1]}"]
+
+
+def fatias_datas(datas):
+    """['2010-01-01', '2015-01-01'] -> ['created:2010-01-01..2014-12-31', 'created:>=2015-01-01']"""
+    from datetime import date, timedelta
+    fatias = [f"created:{inicio}..{date.fromisoformat(fim) - timedelta(days=1)}" for inicio, fim in zip(datas, datas[1:])]
+    return fatias + [f"created:>={datas[-1]}"]
+
+
+def planejar(caminho_fila, tarefas):
+    """Grava as tarefas [(tipo, parametros), ...] na fila. Retorna quantas foram criadas"""
+    conexao = conectar(caminho_fila)
+    with conexao:
+        conexao.execute("BEGIN IMMEDIATE")
+        conexao.executemany("INSERT INTO tarefas (tipo, parametros) VALUES (?, ?)",
+                            [(tipo, json.dumps(parametros, ensure_ascii=False)) for tipo, parametros in tarefas])
+    conexao.close()
+    return len(tarefas)
+
+
+def reivindicar(conexao, worker, lease=LEASE_SEGUNDOS, max_tentativas=MAX_TENTATIVAS):
+    """
+    Reivindica atomicamente a próxima tarefa pendente (ou com lease vencido). Retorna (id, tipo, parametros) ou None.
+    Uma tarefa com lease vencido que já usou max_tentativas (o worker morreu sem
+    registrar a falha, ex.: falta de memória) é marcada como falha em vez de reivindicada.
+    """
+    agora = time.time()
+    conexao.execute("BEGIN IMMEDIATE")
+    try:
+        conexao.execute("UPDATE tarefas SET estado = ?, lease_ate = NULL, "
+                        "erro = 'Lease vencido na última tentativa (worker interrompido)' "
+                        "WHERE estado = ? AND lease_ate < ? AND tentativas >= ?",
+                        (FALHOU, EM_ANDAMENTO, agora, max_tentativas))
+        linha = conexao.execute(
+            "SELECT id, tipo, parametros FROM tarefas "
+            "WHERE (estado = ? AND disponivel_em <= ?) OR (estado = ? AND lease_ate < ?) "
+            "ORDER BY id LIMIT 1", (PENDENTE, agora, EM_ANDAMENTO, agora)).fetchone()
+        if linha is not None:
+            conexao.execute("UPDATE tarefas SET estado = ?, worker = ?, lease_ate = ?, tentativas = tentativas + 1 "
+                            "WHERE id = ?", (EM_ANDAMENTO, worker, agora + lease, linha[0]))
+        conexao.execute("COMMIT")
+    except Exception:
+        conexao.execute("ROLLBACK")
+        raise
+    return None if linha is None else (linha[0], linha[1], json.loads(linha[2]))
+
+
+def renovar_lease(conexao, id_tarefa, worker, lease=LEASE_SEGUNDOS):
+    """Estende o lease; retorna False se a tarefa já não pertence a este worker"""
+    cursor = conexao.execute("UPDATE tarefas SET lease_ate = ? WHERE id = ? AND worker = ? AND estado = ?",
+                             (time.time() + lease, id_tarefa, worker, EM_ANDAMENTO))
+    return cursor.rowcount == 1
+
+
+def concluir(conexao, id_tarefa, worker, linhas):
+    cursor = conexao.execute("UPDATE tarefas SET estado = ?, lease_ate = NULL, erro = NULL, linhas = ? "
+                             "WHERE id = ? AND worker = ? AND estado = ?",
+                             (CONCLUIDA, linhas, id_tarefa, worker, EM_ANDAMENTO))
+    return cursor.rowcount == 1
+
+
+def registrar_falha(conexao, id_tarefa, worker, erro, max_tentativas=MAX_TENTATIVAS):
+    """Devolve a tarefa à fila com espera crescente, ou a marca como falha após max_tentativas"""
+    tentativas = conexao.execute("SELECT tentativas FROM tarefas WHERE id = ?", (id_tarefa,)).fetchone()[0]
+    estado = FALHOU if tentativas >= max_tentativas else PENDENTE
+    conexao.execute("UPDATE tarefas SET estado = ?, lease_ate = NULL, erro = ?, disponivel_em = ? "
+                    "WHERE id = ? AND worker = ? AND estado = ?",
+                    (estado, str(erro), time.time() + 30 * tentativas, id_tarefa, worker, EM_ANDAMENTO))
+    return estado
+
+
+def caminho_parte(diretorio, id_tarefa):
+    return os.path.join(diretorio, f"parte-{id_tarefa:05d}.csv")
+
+
+def _executar_busca(parametros, saida):
+    from coleta_coortes import coletar_coortes
+    from main_sprint_2 import collect_and_save_to_csv
+    coorte = {'nome': parametros['busca'], 'busca': parametros['busca'], 'num_repos': parametros['num_repos']}
+    # Busca interrompida, incompleta ou com linhas ERRO falha a tarefa, que volta à fila
+    repos, _ = coletar_coortes([coorte], parametros['batch_size'], parametros['perfil'], exigir_completas=True)
+    erros = collect_and_save_to_csv(repos, saida, parametros['perfil'], parametros['enriquecimentos'],
+                                    parametros['workers'])
+    if erros:
+        raise Exception(f"{erros} repositórios com erro ao processar {parametros['busca']}")
+    return len(repos)
+
+
+def _executar_enriquecimento(parametros, saida):
+    from enriquecimento import enriquecer_em_ordem
+    from main_sprint_2 import ENRIQUECIMENTOS
+    with abrir(parametros['csv'], newline='') as f:
+        leitor = csv.DictReader(f)
+        colunas = list(leitor.fieldnames)
+        linhas = [linha for i, linha in enumerate(leitor) if parametros['inicio'] <= i < parametros['fim']]
+    for nome in parametros['enriquecimentos']:
+        novas, _, coluna_anterior = ENRIQUECIMENTOS[nome]
+        novas = [c for c in novas if c not in colunas]
+        posicao = colunas.index(coluna_anterior) + 1 if coluna_anterior in colunas else len(colunas)
+        colunas[posicao:posicao] = novas
+
+    def enriquecer(linha):
+        for nome in parametros['enriquecimentos']:
+            linha.update(ENRIQUECIMENTOS[nome][1](linha))
+        return linha
+
+    with open(saida, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=colunas)
+        writer.writeheader()
+        for indice, linha, erro in enriquecer_em_ordem(linhas, enriquecer, parametros['workers']):
+            if erro is not None:
+                # Uma linha com erro falha a tarefa inteira, que volta à fila
+                raise Exception(f"Erro ao enriquecer {linhas[indice].get('nome')}: {erro}")
+            writer.writerow(linha)
+    return len(linhas)
+
+
+EXECUTORES = {
+    'busca': _executar_busca,
+    'enriquecimento': _executar_enriquecimento,
+}
+
+
+def _descrever(parametros):
+    if 'busca' in parametros:
+        return parametros['busca']
+    if 'inicio' in parametros:
+        return f"linhas {parametros['inicio']}-{parametros['fim'] - 1} de {parametros['csv']}"
+    return json.dumps(parametros, ensure_ascii=False)
+
+
+def _manter_lease(caminho_fila, id_tarefa, worker, lease, parar):
+    conexao = conectar(caminho_fila)
+    while not parar.wait(lease / 3):
+        if not renovar_lease(conexao, id_tarefa, worker, lease):
+            print(f"[{worker}] Lease da tarefa {id_tarefa} perdido")
+            break
+    conexao.close()
+
+
+def trabalhar(caminho_fila, diretorio_saida, worker=None, lease=LEASE_SEGUNDOS, max_tentativas=MAX_TENTATIVAS,
+              esperar_fila=False, variavel_token=None):
+    """
+    Consome tarefas até a fila esvaziar. Com esperar_fila=True, continua
+    aguardando enquanto houver tarefas em andamento em outros workers (que
+    podem voltar à fila). Retorna o número de tarefas concluídas.
+    """
+    worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+    if variavel_token:
+        # Antes de importar os coletores, que leem GITHUB_TOKEN na importação
+        os.environ["GITHUB_TOKEN"] = os.environ[variavel_token]
+    os.makedirs(diretorio_saida, exist_ok=True)
+    conexao = conectar(caminho_fila)
+    concluidas = 0
+    while True:
+        tarefa = reivindicar(conexao, worker, lease, max_tentativas)
+        if tarefa is None:
+            restantes = conexao.execute("SELECT COUNT(*) FROM tarefas WHERE estado IN (?, ?)",
+                                        (PENDENTE, EM_ANDAMENTO)).fetchone()[0]
+            if restantes and esperar_fila:
+                time.sleep(min(lease / 3, 10))
+                continue
+            break
+
+        id_tarefa, tipo, parametros = tarefa
+        print(f"[{worker}] Tarefa {id_tarefa} ({tipo}): {_descrever(parametros)}")
+        parar = threading.Event()
+        renovacao = threading.Thread(target=_manter_lease, args=(caminho_fila, id_tarefa, worker, lease, parar),
+                                     daemon=True)
+        renovacao.start()
+        saida = caminho_parte(diretorio_saida, id_tarefa)
+        temporario = f"{saida}.{worker}.tmp"
+        try:
+            linhas = EXECUTORES[tipo](parametros, temporario)
+        except Exception as e:
+            parar.set()
+            renovacao.join()
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            estado = registrar_falha(conexao, id_tarefa, worker, e, max_tentativas)
+            print(f"[{worker}] Tarefa {id_tarefa} falhou ({estado}): {e}")
+            continue
+        parar.set()
+        renovacao.join()
+        os.replace(temporario, saida)
+        if concluir(conexao, id_tarefa, worker, linhas):
+            concluidas += 1
+            print(f"[{worker}] Tarefa {id_tarefa} concluída: {linhas} linhas")
+        else:
+            print(f"[{worker}] Tarefa {id_tarefa} foi retomada por outro worker; resultado descartado da contagem")
+    conexao.close()
+    return concluidas
+
+
+def executar_local(caminho_fila, diretorio_saida, num_workers=4, lease=LEASE_SEGUNDOS, variaveis_token=None):
+    """Roda `num_workers` processos worker nesta máquina (testes e máquinas com vários tokens)"""
+    from multiprocessing import Process
+    processos = [Process(target=trabalhar, args=(caminho_fila, diretorio_saida, f"local-{i}", lease),
+                         kwargs={'esperar_fila': True,
+                                 'variavel_token': variaveis_token[i % len(variaveis_token)] if variaveis_token else None})
+                 for i in range(num_workers)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+    return [processo.exitcode for processo in processos]
+
+
+def status(caminho_fila):
+    conexao = conectar(caminho_fila)
+    contagens = dict(conexao.execute("SELECT estado, COUNT(*) FROM tarefas GROUP BY estado").fetchall())
+    falhas = conexao.execute("SELECT id, tentativas, erro FROM tarefas WHERE estado = ?", (FALHOU,)).fetchall()
+    conexao.close()
+    return contagens, falhas
+
+
+def mesclar(caminho_fila, diretorio_saida, caminho_final):
+    """
+    Junta as partições das tarefas concluídas, na ordem das tarefas. Repositórios
+    presentes em mais de uma partição (proprietario/nome) são gravados uma vez.
+    """
+    conexao = conectar(caminho_fila)
+    ids = [linha[0] for linha in conexao.execute("SELECT id FROM tarefas WHERE estado = ? ORDER BY id", (CONCLUIDA,))]
+    pendentes = conexao.execute("SELECT COUNT(*) FROM tarefas WHERE estado != ?", (CONCLUIDA,)).fetchone()[0]
+    conexao.close()
+    if pendentes:
+        print(f"Aviso: {pendentes} tarefas não concluídas ficarão de fora")
+
+    vistos = set()
+    escritas = duplicadas = 0
+    writer = None
+    with abrir(caminho_final, 'w', newline='') as destino:
+        for id_tarefa in ids:
+            with open(caminho_parte(diretorio_saida, id_tarefa), newline='', encoding='utf-8') as f:
+                leitor = csv.DictReader(f)
+                if writer is None:
+                    writer = csv.DictWriter(destino, fieldnames=leitor.fieldnames)
+                    writer.writeheader()
+                for linha in leitor:
+                    chave = None if linha.get('proprietario') in (None, 'ERRO') else \
+                        f"{linha['proprietario']}/{linha['nome']}"
+                    if chave is not None and chave in vistos:
+                        duplicadas += 1
+                        continue
+                    vistos.add(chave)
+                    writer.writerow(linha)
+                    escritas += 1
+    print(f"{len(ids)} partições mescladas em {caminho_final}: {escritas} linhas, {duplicadas} repetidas descartadas")
+    return escritas
+
+
+def _tarefas_do_plano(args):
+    from main_sprint_2 import ENRIQUECIMENTOS
+    for nome in args.enriquecimento:
+        if nome not in ENRIQUECIMENTOS:
+            raise SystemExit(f"Enriquecimento desconhecido: {nome}. Opções: {', '.join(ENRIQUECIMENTOS)}")
+    if args.csv:
+        with abrir(args.csv, newline='') as f:
+            total = sum(1 for _ in csv.DictReader(f))
+        return [('enriquecimento', {'csv': os.path.abspath(args.csv), 'inicio': inicio,
+                                    'fim': min(inicio + args.linhas_por_tarefa, total),
+                                    'enriquecimentos': args.enriquecimento, 'workers': args.workers})
+                for inicio in range(0, total, args.linhas_por_tarefa)]
+
+    if args.fatias_estrelas:
+        fatias = fatias_estrelas([int(v) for v in args.fatias_estrelas.split(",")])
+    elif args.fatias_datas:
+        fatias = fatias_datas(args.fatias_datas.split(","))
+    else:
+        raise SystemExit("Informe --fatias-estrelas, --fatias-datas ou --csv")
+    prefixo = f"{args.keyword} " if args.keyword else ""
+    return [('busca', {'busca': prefixo + fatia, 'num_repos': args.num_repos, 'batch_size': args.batch_size,
+                       'perfil': args.perfil, 'enriquecimentos': args.enriquecimento, 'workers': args.workers})
+            for fatia in fatias]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Coleta distribuída com fila de tarefas em SQLite')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    plano = subparsers.add_parser('planejar', help='Divide o trabalho em tarefas na fila')
+    plano.add_argument('fila')
+    plano.add_argument('--fatias-estrelas', default=None, help='Limites das faixas de estrelas, ex.: 1000,2000,5000')
+    plano.add_argument('--fatias-datas', default=None, help='Limites das faixas de criação, ex.: 2010-01-01,2015-01-01')
+    plano.add_argument('--keyword', default=None, help='Termo adicionado a todas as fatias da busca')
+    plano.add_argument('--num-repos', type=int, default=1000, help='Máximo de repositórios por fatia')
+    plano.add_argument('--batch-size', type=int, default=25)
+    plano.add_argument('--perfil', default='full')
+    plano.add_argument('--csv', default=None, help='CSV a enriquecer em vez de buscar')
+    plano.add_argument('--linhas-por-tarefa', type=int, default=100)
+    plano.add_argument('--enriquecimento', action='append', default=[])
+    plano.add_argument('--workers', type=int, default=8, help='Workers de enriquecimento dentro de cada tarefa')
+
+    trabalho = subparsers.add_parser('trabalhar', help='Consome tarefas da fila')
+    local = subparsers.add_parser('local', help='Roda vários processos worker nesta máquina')
+    for sub in (trabalho, local):
+        sub.add_argument('fila')
+        sub.add_argument('saida', help='Diretório das partições')
+        sub.add_argument('--lease', type=float, default=LEASE_SEGUNDOS, help='Duração do lease em segundos')
+    trabalho.add_argument('--variavel-token', default=None,
+                          help='Variável de ambiente com o token deste worker (padrão: GITHUB_TOKEN)')
+    trabalho.add_argument('--esperar', action='store_true',
+                          help='Continua aguardando enquanto houver tarefas em andamento em outros workers')
+    local.add_argument('--workers', type=int, default=4, help='Processos worker')
+    local.add_argument('--variaveis-token', default=None,
+                       help='Variáveis de ambiente com tokens, distribuídas entre os processos (ex.: TOKEN_A,TOKEN_B)')
+
+    estado = subparsers.add_parser('status', help='Contagem de tarefas por estado')
+    estado.add_argument('fila')
+
+    juntar = subparsers.add_parser('mesclar', help='Junta as partições num único CSV')
+    juntar.add_argument('fila')
+    juntar.add_argument('saida', help='Diretório das partições')
+    juntar.add_argument('destino')
+
+    args = parser.parse_args(argv)
+    if args.comando == 'planejar':
+        print(f"{planejar(args.fila, _tarefas_do_plano(args))} tarefas adicionadas a {args.fila}")
+    elif args.comando == 'trabalhar':
+        concluidas = trabalhar(args.fila, args.saida, lease=args.lease, esperar_fila=args.esperar,
+                               variavel_token=args.variavel_token)
+        print(f"{concluidas} tarefas concluídas")
+    elif args.comando == 'local':
+        variaveis = args.variaveis_token.split(",") if args.variaveis_token else None
+        executar_local(args.fila, args.saida, args.workers, args.lease, variaveis)
+    elif args.comando == 'status':
+        contagens, falhas = status(args.fila)
+        for nome in (PENDENTE, EM_ANDAMENTO, CONCLUIDA, FALHOU):
+            print(f"{nome}: {contagens.get(nome, 0)}")
+        for id_tarefa, tentativas, erro in falhas:
+            print(f"  tarefa {id_tarefa} ({tentativas} tentativas): {erro}")
+    elif args.comando == 'mesclar':
+        mesclar(args.fila, args.saida, args.destino)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
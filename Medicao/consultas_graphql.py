@@ -0,0 +1,144 @@
+"""
+Registro de campos da consulta GraphQL de busca de repositórios.
+
+Cada coluna do CSV da sprint 2 é associada ao trecho GraphQL que a alimenta e
+à função que extrai o valor do nó retornado pela API. Os perfis de consulta
+listam apenas as colunas necessárias para cada análise, de modo que o coletor
+peça à API somente os campos que serão usados.
+"""
+
+
+def _contagem_commits(repo):
+    ref = repo.get("defaultBranchRef")
+    if ref and "target" in ref and ref["target"] and "history" in ref["target"]:
+        return ref["target"]["history"]["totalCount"]
+    return 0
+
+
+def _nomes_linguagens(repo):
+    if "languages" in repo and "nodes" in repo["languages"]:
+        return [lang["name"] for lang in repo["languages"]["nodes"]]
+    return []
+
+
+def _nomes_topicos(repo):
+    if "topics" in repo and "nodes" in repo["topics"]:
+        return [node["topic"]["name"] for node in repo["topics"]["nodes"]]
+    return []
+
+
+# coluna do CSV -> (trecho GraphQL, extrator do valor)
+CAMPOS = {
+    'nome': ("name", lambda r: r['name']),
+    'proprietario': ("owner { login __typename }", lambda r: r['owner']['login']),
+    'tipo_proprietario': ("owner { login __typename }", lambda r: r['owner']['__typename']),
+    'url': ("url", lambda r: r['url']),
+    'homepage': ("homepageUrl", lambda r: r.get('homepageUrl', 'N/A')),
+    'estrelas': ("stargazerCount", lambda r: r['stargazerCount']),
+    'descricao': ("description", lambda r: r.get('description', 'N/A')),
+    'forks': ("forks { totalCount }", lambda r: r['forks']['totalCount']),
+    'watchers': ("watchers { totalCount }", lambda r: r['watchers']['totalCount']),
+    'commits': (
+        "defaultBranchRef { target { ... on Commit { history { totalCount } } } }",
+        _contagem_commits,
+    ),
+    'issues_abertas': ("openIssues: issues(states: OPEN) { totalCount }",
+                       lambda r: r['openIssues']['totalCount']),
+    'issues_fechadas': ("closedIssues: issues(states: CLOSED) { totalCount }",
+                        lambda r: r['closedIssues']['totalCount']),
+    'prs_abertos': ("openPullRequests: pullRequests(states: OPEN) { totalCount }",
+                    lambda r: r['openPullRequests']['totalCount']),
+    'prs_fechados': ("closedPullRequests: pullRequests(states: CLOSED) { totalCount }",
+                     lambda r: r['closedPullRequests']['totalCount']),
+    'prs_mesclados': ("mergedPullRequests: pullRequests(states: MERGED) { totalCount }",
+                      lambda r: r['mergedPullRequests']['totalCount']),
+    'releases': ("releases { totalCount }", lambda r: r['releases']['totalCount']),
+    'data_criacao': ("createdAt", lambda r: r['createdAt']),
+    'ultima_atualizacao': ("updatedAt", lambda r: r['updatedAt']),
+    'ultimo_push': ("pushedAt", lambda r: r['pushedAt']),
+    'linguagem_principal': (
+        "primaryLanguage { name }",
+        lambda r: r['primaryLanguage']['name'] if r['primaryLanguage'] else "N/A",
+    ),
+    'todas_linguagens': (
+        "languages(first: 10) { nodes { name } totalCount }",
+        lambda r: '; '.join(_nomes_linguagens(r)) or 'N/A',
+    ),
+    'licenca': (
+        "licenseInfo { name url }",
+        lambda r: r['licenseInfo']['name'] if r['licenseInfo'] else "Sem licença",
+    ),
+    'tamanho_kb': ("diskUsage", lambda r: r.get('diskUsage', 'N/A')),
+    'branch_principal': (
+        "defaultBranchRef { name }",
+        lambda r: r['defaultBranchRef']['name'] if r['defaultBranchRef'] else 'N/A',
+    ),
+    'arquivado': ("isArchived", lambda r: 'Sim' if r.get('isArchived', False) else 'Não'),
+    'eh_fork': ("isFork", lambda r: 'Sim' if r.get('isFork', False) else 'Não'),
+    'eh_template': ("isTemplate", lambda r: 'Sim' if r.get('isTemplate', False) else 'Não'),
+    'topicos': (
+        "topics: repositoryTopics(first: 10) { nodes { topic { name } } }",
+        lambda r: '; '.join(_nomes_topicos(r)) or 'Nenhum',
+    ),
+}
+
+# Perfis de consulta: colunas pedidas à API para cada tipo de análise.
+# "hypotheses-minimal" cobre o que analise_hipoteses.py e graficos.py usam (H1-H6 e RQ07).
+PERFIS = {
+    'full': list(CAMPOS),
+    'hypotheses-minimal': [
+        'nome', 'proprietario', 'estrelas', 'data_criacao', 'ultima_atualizacao',
+        'ultimo_push', 'linguagem_principal', 'issues_abertas', 'issues_fechadas',
+        'prs_mesclados', 'releases',
+    ],
+}
+
+
+def colunas_do_perfil(perfil='full'):
+    """Retorna as colunas do CSV produzidas pelo perfil, na ordem do registro"""
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil de consulta desconhecido: {perfil}. Opções: {', '.join(PERFIS)}")
+    selecionadas = set(PERFIS[perfil])
+    return [coluna for coluna in CAMPOS if coluna in selecionadas]
+
+
+def montar_consulta(perfil='full'):
+    """
+    Monta a consulta GraphQL de busca contendo apenas os campos do perfil.
+    O id do nó e o nameWithOwner são sempre pedidos para a deduplicação.
+    """
+    trechos = []
+    for coluna in colunas_do_perfil(perfil):
+        trecho = CAMPOS[coluna][0]
+        if trecho not in trechos:
+            trechos.append(trecho)
+    campos = "\n            ".join(trechos)
+
+    return f"""
+    query ($searchQuery: String!, $numRepos: Int!, $cursor: String) {{
+      rateLimit {{
+        cost
+        remaining
+        resetAt
+      }}
+      search(query: $searchQuery, type: REPOSITORY, first: $numRepos, after: $cursor) {{
+        repositoryCount
+        pageInfo {{
+          hasNextPage
+          endCursor
+        }}
+        nodes {{
+          ... on Repository {{
+            id
+            nameWithOwner
+            {campos}
+          }}
+        }}
+      }}
+    }}
+    """
+
+
+def extrair_linha(repo, perfil='full'):
+    """Converte um nó de repositório da API em uma linha do CSV do perfil"""
+    return {coluna: CAMPOS[coluna][1](repo) for coluna in colunas_do_perfil(perfil)}
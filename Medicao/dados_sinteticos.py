@@ -0,0 +1,279 @@
+"""
+Gerador vetorizado de datasets sintéticos ajustados a uma coleta real.
+
+O modelo é ajustado a partir de um CSV da sprint 2 (por padrão
+repositorios_populares_github.csv):
+  - métricas numéricas (estrelas, PRs, releases, issues, idade...): função
+    quantil empírica em escala log1p, com cauda superior de Pareto (expoente
+    pelo estimador de Hill nos 10% maiores valores). Se o máximo observado se
+    repete (ex.: releases limitadas a 1000 pela API), ele vira teto; senão o
+    teto é FATOR_EXTRAPOLACAO × o máximo (nas idades em dias, o próprio máximo).
+  - dependência entre as métricas: cópula gaussiana (correlação dos escores
+    normais), para que estrelas, PRs e issues continuem correlacionados.
+  - colunas categóricas (linguagem, tipo de proprietário, licença, flags):
+    frequências observadas.
+
+A geração é feita inteiramente com NumPy, em blocos com sementes independentes
+(SeedSequence), então os blocos podem ser gerados e formatados em processos
+paralelos sem mudar o resultado. Pode emitir o esquema em português da sprint 2
+ou o esquema em inglês do GitHubAnalyzer.
+
+    python dados_sinteticos.py --linhas 10000000 --esquema pt --saida sinteticos.csv
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from arquivos_comprimidos import abrir
+from consultas_graphql import colunas_do_perfil
+from registros import COLUNAS_ANALISADOR
+
+CSV_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "repositorios_populares_github.csv")
+
+METRICAS = ['estrelas', 'forks', 'watchers', 'commits', 'issues_abertas', 'issues_fechadas',
+            'prs_abertos', 'prs_fechados', 'prs_mesclados', 'releases', 'tamanho_kb',
+            'idade_dias', 'dias_desde_atualizacao', 'dias_desde_push']
+METRICAS_DIAS = METRICAS[-3:]
+CATEGORICAS = ['linguagem_principal', 'tipo_proprietario', 'licenca', 'branch_principal',
+               'arquivado', 'eh_fork', 'eh_template']
+PONTOS_QUANTIL = 201
+TAMANHO_BLOCO = 500_000
+FORMATO_DATA = '%Y-%m-%dT%H:%M:%SZ'
+QUANTIL_CAUDA = 0.9
+# Quanto a cauda de Pareto pode passar do máximo observado (as datas não passam dele)
+FATOR_EXTRAPOLACAO = 10
+
+
+def _dias_ate(datas, referencia):
+    return (referencia - pd.to_datetime(datas, errors='coerce', utc=True)).dt.total_seconds() / 86400
+
+
+def _ajustar_metrica(valores, extrapolar=True):
+    valores = valores[np.isfinite(valores)]
+    valores = np.maximum(valores, 0)
+    probabilidades = np.linspace(0, QUANTIL_CAUDA, PONTOS_QUANTIL)
+    quantis = np.quantile(np.log1p(valores), probabilidades)
+    limiar = np.quantile(valores, QUANTIL_CAUDA)
+    cauda = valores[valores > limiar]
+    if limiar > 0 and len(cauda) >= 5:
+        alfa = 1 / np.mean(np.log(cauda / limiar))
+    else:
+        alfa = None
+    maximo = float(valores.max())
+    return {
+        'quantis': quantis.tolist(),
+        'limiar_cauda': float(limiar),
+        'alfa_cauda': alfa,
+        'teto': maximo * FATOR_EXTRAPOLACAO if extrapolar and np.sum(valores == maximo) == 1 else maximo,
+    }
+
+
+def ajustar_modelo(caminho_csv=CSV_PADRAO):
+    """Ajusta o modelo (dicionário serializável em JSON) a um CSV no esquema da sprint 2"""
+    df = pd.read_csv(caminho_csv)
+    df = df[pd.to_numeric(df['estrelas'], errors='coerce').notna()]
+    referencia = pd.to_datetime(df['ultima_atualizacao'], errors='coerce', utc=True).max()
+    df['idade_dias'] = _dias_ate(df['data_criacao'], referencia)
+    df['dias_desde_atualizacao'] = _dias_ate(df['ultima_atualizacao'], referencia)
+    df['dias_desde_push'] = _dias_ate(df['ultimo_push'], referencia)
+
+    numericos = df[METRICAS].apply(pd.to_numeric, errors='coerce')
+    # Escores normais por posto: a correlação deles define a cópula gaussiana
+    from scipy.stats import norm
+    postos = numericos.rank(method='average') / (numericos.notna().sum() + 1)
+    escores = np.nan_to_num(norm.ppf(postos.to_numpy(dtype=float)))
+    correlacao = np.corrcoef(escores.T)
+
+    categoricas = {}
+    for coluna in CATEGORICAS:
+        frequencias = df[coluna].fillna('N/A').value_counts(normalize=True)
+        categoricas[coluna] = {'valores': frequencias.index.tolist(), 'probabilidades': frequencias.tolist()}
+
+    return {
+        'origem': os.path.basename(caminho_csv),
+        'linhas_origem': len(df),
+        'metricas': {m: _ajustar_metrica(numericos[m].to_numpy(dtype=float), extrapolar=m not in METRICAS_DIAS)
+                     for m in METRICAS},
+        'correlacao': correlacao.tolist(),
+        'categoricas': categoricas,
+        'fracao_homepage': float(df['homepage'].notna().mean()),
+    }
+
+
+def salvar_modelo(modelo, caminho):
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(modelo, f, ensure_ascii=False, indent=1)
+
+
+def carregar_modelo(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+_modelo_padrao = None
+
+def modelo_padrao():
+    """Modelo ajustado ao CSV da coleta que acompanha o projeto (ajustado uma vez por processo)"""
+    global _modelo_padrao
+    if _modelo_padrao is None:
+        _modelo_padrao = ajustar_modelo(CSV_PADRAO)
+    return _modelo_padrao
+
+
+def _amostrar_metrica(parametros, u):
+    """Inverte a função quantil ajustada para uniformes u (vetor)"""
+    probabilidades = np.linspace(0, QUANTIL_CAUDA, PONTOS_QUANTIL)
+    valores = np.expm1(np.interp(np.minimum(u, QUANTIL_CAUDA), probabilidades, parametros['quantis']))
+    na_cauda = u > QUANTIL_CAUDA
+    if parametros['alfa_cauda']:
+        excedente = (1 - u[na_cauda]) / (1 - QUANTIL_CAUDA)
+        valores[na_cauda] = parametros['limiar_cauda'] * excedente ** (-1 / parametros['alfa_cauda'])
+    else:
+        valores[na_cauda] = np.expm1(parametros['quantis'][-1])
+    np.minimum(valores, parametros['teto'], out=valores)
+    return valores
+
+
+def _datas(agora, dias_atras):
+    # Mantidas como datetime64; o texto ISO (AAAA-MM-DDTHH:MM:SSZ) só é gerado na escrita do CSV
+    return agora - (dias_atras * 86400).astype('timedelta64[s]')
+
+
+def _gerar_bloco(modelo, n, rng, inicio, agora):
+    from scipy.special import ndtr
+
+    fator = np.linalg.cholesky(np.array(modelo['correlacao']))
+    uniformes = np.clip(ndtr(rng.standard_normal((n, len(METRICAS))) @ fator.T), 1e-12, 1 - 1e-12)
+    metricas = {m: _amostrar_metrica(modelo['metricas'][m], uniformes[:, j]) for j, m in enumerate(METRICAS)}
+
+    bloco = {}
+    for coluna in ['estrelas', 'forks', 'watchers', 'commits', 'issues_abertas', 'issues_fechadas',
+                   'prs_abertos', 'prs_fechados', 'prs_mesclados', 'releases', 'tamanho_kb']:
+        bloco[coluna] = np.rint(metricas[coluna]).astype(np.int64)
+    for coluna, parametros in modelo['categoricas'].items():
+        codigos = rng.choice(len(parametros['valores']), size=n, p=parametros['probabilidades'])
+        bloco[coluna] = pd.Categorical.from_codes(codigos, categories=parametros['valores'])
+
+    # Datas: criação antes da última atualização e do último push
+    idade = np.maximum(metricas['idade_dias'], 1)
+    bloco['data_criacao'] = _datas(agora, idade)
+    bloco['ultima_atualizacao'] = _datas(agora, np.minimum(metricas['dias_desde_atualizacao'], idade))
+    bloco['ultimo_push'] = _datas(agora, np.minimum(metricas['dias_desde_push'], idade))
+
+    bloco['nome'] = [f"synthetic-repo-{i}" for i in range(inicio, inicio + n)]
+    # Cerca de três repositórios por proprietário; só os nomes distintos viram texto
+    donos, codigos = np.unique(rng.integers(0, max(n // 3, 1), size=n) + inicio, return_inverse=True)
+    bloco['proprietario'] = pd.Categorical.from_codes(codigos, categories=[f"owner-{d}" for d in donos])
+    return pd.DataFrame(bloco)
+
+
+def _para_esquema(bloco, esquema, modelo, rng):
+    nomes_completos = [f"{dono}/{nome}" for dono, nome in zip(bloco['proprietario'].to_numpy(), bloco['nome'].to_numpy())]
+    if esquema == 'en':
+        return pd.DataFrame({
+            'name': bloco['nome'],
+            'owner': bloco['proprietario'],
+            'full_name': nomes_completos,
+            'stars': bloco['estrelas'],
+            'created_at': bloco['data_criacao'],
+            'updated_at': bloco['ultima_atualizacao'],
+            'language': bloco['linguagem_principal'],
+            'pull_requests': bloco['prs_abertos'] + bloco['prs_fechados'] + bloco['prs_mesclados'],
+            'merged_prs': bloco['prs_mesclados'],
+            'releases': bloco['releases'],
+            'issues': bloco['issues_abertas'] + bloco['issues_fechadas'],
+            'closed_issues': bloco['issues_fechadas'],
+        })[COLUNAS_ANALISADOR]
+
+    bloco['url'] = ['https://github.com/' + nome for nome in nomes_completos]
+    com_homepage = np.flatnonzero(rng.random(len(bloco)) < modelo['fracao_homepage'])
+    homepage = np.full(len(bloco), None, dtype=object)
+    homepage[com_homepage] = [f"https://{nome}.example.org" for nome in bloco['nome'].to_numpy()[com_homepage]]
+    bloco['homepage'] = homepage
+    bloco['descricao'] = 'Repositório sintético'
+    bloco['todas_linguagens'] = bloco['linguagem_principal']
+    bloco['topicos'] = 'Nenhum'
+    return bloco[colunas_do_perfil('full')]
+
+
+def _bloco(modelo, esquema, semente, inicio, n, agora):
+    rng = np.random.default_rng(semente)
+    return _para_esquema(_gerar_bloco(modelo, n, rng, inicio, agora), esquema, modelo, rng)
+
+
+def _bloco_csv(modelo, esquema, semente, inicio, n, agora):
+    return _bloco(modelo, esquema, semente, inicio, n, agora).to_csv(
+        index=False, header=inicio == 0, date_format=FORMATO_DATA)
+
+
+def _tarefas(n, esquema, modelo, semente, tamanho_bloco):
+    if esquema not in ('pt', 'en'):
+        raise ValueError(f"Esquema desconhecido: {esquema}. Opções: pt, en")
+    modelo = modelo or modelo_padrao()
+    inicios = range(0, n, tamanho_bloco)
+    # Uma semente filha por bloco: o resultado não depende do número de processos
+    sementes = np.random.SeedSequence(semente).spawn(len(inicios))
+    agora = np.datetime64('now', 's')
+    return [(modelo, esquema, s, i, min(tamanho_bloco, n - i), agora) for s, i in zip(sementes, inicios)]
+
+
+def _executar(funcao, tarefas, processos):
+    if processos == 1 or len(tarefas) <= 1:
+        for tarefa in tarefas:
+            yield funcao(*tarefa)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        yield from executor.map(funcao, *zip(*tarefas))
+
+
+def gerar(n, esquema='pt', modelo=None, semente=42, tamanho_bloco=TAMANHO_BLOCO, processos=1):
+    """
+    Gera `n` repositórios sintéticos, bloco a bloco. Retorna um iterador de
+    DataFrames no esquema 'pt' (CSV da sprint 2) ou 'en' (GitHubAnalyzer).
+    As datas ficam como datetime64; use date_format=FORMATO_DATA no to_csv.
+    """
+    yield from _executar(_bloco, _tarefas(n, esquema, modelo, semente, tamanho_bloco), processos)
+
+
+def gerar_dataframe(n, esquema='pt', modelo=None, semente=42, processos=1):
+    return pd.concat(gerar(n, esquema, modelo, semente, processos=processos), ignore_index=True)
+
+
+def gerar_csv(caminho, n, esquema='pt', modelo=None, semente=42, tamanho_bloco=TAMANHO_BLOCO, processos=None):
+    """Grava o CSV; geração e formatação de cada bloco rodam em paralelo, a escrita segue a ordem dos blocos"""
+    tarefas = _tarefas(n, esquema, modelo, semente, tamanho_bloco)
+    with abrir(caminho, 'w', newline='') as f:
+        for texto in _executar(_bloco_csv, tarefas, processos):
+            f.write(texto)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera datasets sintéticos ajustados a uma coleta real')
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--esquema', choices=['pt', 'en'], default='pt',
+                        help="pt: CSV da sprint 2; en: esquema do GitHubAnalyzer")
+    parser.add_argument('--saida', default='repositorios_sinteticos.csv', help='.csv, .csv.gz ou .csv.zst')
+    parser.add_argument('--csv-referencia', default=CSV_PADRAO, help='CSV usado para ajustar o modelo')
+    parser.add_argument('--modelo', default=None, help='Modelo .json salvo (dispensa o ajuste)')
+    parser.add_argument('--salvar-modelo', default=None, help='Salva o modelo ajustado neste .json')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--processos', type=int, default=None, help='Processos (padrão: todos os núcleos)')
+    args = parser.parse_args(argv)
+
+    modelo = carregar_modelo(args.modelo) if args.modelo else ajustar_modelo(args.csv_referencia)
+    if args.salvar_modelo:
+        salvar_modelo(modelo, args.salvar_modelo)
+
+    inicio = time.perf_counter()
+    gerar_csv(args.saida, args.linhas, args.esquema, modelo, args.semente, processos=args.processos)
+    print(f"{args.linhas} repositórios sintéticos ({args.esquema}) salvos em {args.saida} "
+          f"em {time.perf_counter() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Deduplicação dos nós retornados pela busca paginada do GitHub.
+
+Entre uma página e outra as estrelas mudam e a ordem da busca se desloca, então
+o mesmo repositório pode aparecer duas vezes (e outro pode ser pulado). A
+coleção abaixo indexa cada nó pela sua chave (id do nó GraphQL ou
+nameWithOwner): uma reaparição substitui o registro anterior na mesma posição
+(upsert). Para execuções muito grandes pode-se usar um filtro de Bloom, que
+ocupa memória fixa mas apenas descarta as repetições.
+
+Os repositórios pulados não aparecem na resposta, então só dá para detectar
+os sinais de que houve pulos: uma página que começa com mais estrelas do que
+a anterior terminou (a ordem se deslocou na fronteira) e uma queda no
+repositoryCount entre páginas (repositórios que saíram da busca puxam os
+seguintes para trás do cursor).
+"""
+import hashlib
+import math
+
+
+def chave_repositorio(repo):
+    """Chave estável de um repositório: id do nó, nameWithOwner ou owner/nome"""
+    if repo.get('id'):
+        return repo['id']
+    if repo.get('nameWithOwner'):
+        return repo['nameWithOwner']
+    if repo.get('full_name'):
+        return repo['full_name']
+    owner = repo['owner']['login'] if isinstance(repo.get('owner'), dict) else repo.get('owner')
+    return f"{owner}/{repo['name']}"
+
+
+class FiltroBloom:
+    def __init__(self, capacidade, taxa_falsos_positivos=0.001):
+        self.num_bits = max(8, int(-capacidade * math.log(taxa_falsos_positivos) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacidade * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def _posicoes(self, chave):
+        digest = hashlib.blake2b(chave.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def adicionar(self, chave):
+        """Adiciona a chave e retorna True se ela (provavelmente) ainda não existia"""
+        nova = False
+        for posicao in self._posicoes(chave):
+            byte, bit = divmod(posicao, 8)
+            if not self.bits[byte] & (1 << bit):
+                nova = True
+                self.bits[byte] |= 1 << bit
+        return nova
+
+
+class ColecaoDeduplicada:
+    """Lista ordenada de repositórios sem repetições, com upsert por chave"""
+
+    def __init__(self, capacidade_bloom=None):
+        self.itens = []
+        self.duplicados = 0
+        self._indices = None if capacidade_bloom else {}
+        self._bloom = FiltroBloom(capacidade_bloom) if capacidade_bloom else None
+        self.fronteiras_fora_de_ordem = 0
+        self.queda_total_busca = 0
+        self._minimo_anterior = None
+        self._total_anterior = None
+
+    def adicionar(self, repo, chave=None):
+        """Insere o repositório ou atualiza o registro existente. Retorna True se era novo"""
+        if chave is None:
+            chave = chave_repositorio(repo)
+        if self._bloom is not None:
+            if self._bloom.adicionar(chave):
+                self.itens.append(repo)
+                return True
+            self.duplicados += 1
+            return False
+
+        indice = self._indices.get(chave)
+        if indice is None:
+            self._indices[chave] = len(self.itens)
+            self.itens.append(repo)
+            return True
+        self.itens[indice] = repo
+        self.duplicados += 1
+        return False
+
+    def __len__(self):
+        return len(self.itens)
+
+    def registrar_pagina(self, nos, total_busca=None):
+        """Confere a fronteira com a página anterior (estrelas e repositoryCount) da mesma busca"""
+        estrelas = [no['stargazerCount'] for no in nos if no.get('stargazerCount') is not None]
+        if estrelas and self._minimo_anterior is not None and max(estrelas) > self._minimo_anterior:
+            self.fronteiras_fora_de_ordem += 1
+        if estrelas:
+            self._minimo_anterior = min(estrelas)
+        if total_busca is not None:
+            if self._total_anterior is not None and total_busca < self._total_anterior:
+                self.queda_total_busca += self._total_anterior - total_busca
+            self._total_anterior = total_busca
+
+    def faltantes(self, esperado):
+        """Quantos repositórios faltaram em relação ao total esperado"""
+        return max(0, esperado - len(self.itens))
+
+    def possiveis_lacunas(self):
+        """Há sinal de repositórios pulados entre páginas (ordem deslocada ou busca encolhida)?"""
+        return self.fronteiras_fora_de_ordem > 0 or self.queda_total_busca > 0
+
+    def relatorio(self, esperado):
+        repetidos = "descartados" if self._bloom is not None else "substituídos pela versão mais recente"
+        texto = (f"Deduplicação: {len(self.itens)} únicos, {self.duplicados} duplicados {repetidos}, "
+                 f"{self.faltantes(esperado)} faltantes em relação aos {esperado} esperados")
+        if self.possiveis_lacunas():
+            texto += (f"; possíveis repositórios pulados: {self.fronteiras_fora_de_ordem} fronteiras de página "
+                      f"fora de ordem, repositoryCount caiu {self.queda_total_busca}")
+        return texto
@@ -0,0 +1,136 @@
+"""
+Estágio de enriquecimento paralelo dos repositórios.
+
+Os repositórios retornados pela busca são distribuídos numa fila de trabalho
+consumida por um pool de threads (ou processos). Cada worker mantém sua própria
+sessão HTTP e todas as requisições passam pelo limitador de taxa global. Os
+resultados chegam fora de ordem e são devolvidos na ordem original por um
+buffer de reordenação. Com o arquivamento ativo, cada resposta também é
+guardada em arquivo_respostas.
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import requests
+
+from arquivo_respostas import arquivar_resposta
+from limitador_taxa import limitador_global
+
+URL_GRAPHQL = "https://api.github.com/graphql"
+
+_local = threading.local()
+
+
+def sessao_do_worker():
+    """Retorna a sessão HTTP do worker atual, criando-a na primeira chamada"""
+    sessao = getattr(_local, "sessao", None)
+    if sessao is None:
+        sessao = requests.Session()
+        token = os.getenv("GITHUB_TOKEN")
+        if token:
+            sessao.headers["Authorization"] = f"token {token}"
+        _local.sessao = sessao
+    return sessao
+
+
+def requisicao_get(url, **kwargs):
+    """GET pela sessão do worker, respeitando o limitador de taxa global"""
+    limitador_global.aguardar()
+    response = sessao_do_worker().get(url, timeout=30, **kwargs)
+    arquivar_resposta(response, url)
+    return response
+
+
+def requisicao_post(url, **kwargs):
+    """POST pela sessão do worker (ex.: consultas GraphQL), respeitando o limitador de taxa global"""
+    limitador_global.aguardar()
+    response = sessao_do_worker().post(url, timeout=30, **kwargs)
+    arquivar_resposta(response, url, kwargs.get("json"))
+    return response
+
+
+def consultar_pagina_busca(query, variables, max_retries=5):
+    """
+    Executa uma consulta GraphQL (ex.: uma página da busca) pela sessão do worker e pelo limitador
+    global, com backoff exponencial. Retorna data["data"], ou None se as
+    tentativas se esgotarem por erros do servidor ou limite de taxa.
+    """
+    json_data = {"query": query, "variables": variables}
+    retry_count = 0
+    while retry_count < max_retries:
+        try:
+            response = requisicao_post(URL_GRAPHQL, json=json_data)
+            if response.status_code == 200:
+                data = response.json()
+                
+                if "errors" in data:
+                    print(f"GraphQL retornou erros: {data['errors']}")
+                    raise Exception(f"GraphQL query returned errors: {data['errors']}")
+                return data["data"]
+                
+            elif response.status_code == 502 or response.status_code >= 500:
+                retry_count += 1
+                wait_time = 2 ** retry_count + random.uniform(0, 1)  # Backoff exponencial
+                print(f"Erro {response.status_code}, tentando novamente em {wait_time:.2f} segundos (tentativa {retry_count}/{max_retries})")
+                time.sleep(wait_time)
+                
+            else:
+                raise Exception(f"Query failed with status code {response.status_code}: {response.text}")
+                
+        except Exception as e:
+            if "rate limit" in str(e).lower() or "abuse" in str(e).lower():
+                retry_count += 1
+                wait_time = 60 * retry_count 
+                print(f"Limite de taxa atingido, aguardando {wait_time} segundos...")
+                limitador_global.pausar(wait_time)
+                time.sleep(wait_time)
+            elif retry_count < max_retries:
+                retry_count += 1
+                wait_time = 2 ** retry_count + random.uniform(0, 1)
+                print(f"Erro: {str(e)}\nTentando novamente em {wait_time:.2f} segundos (tentativa {retry_count}/{max_retries})")
+                time.sleep(wait_time)
+            else:
+                print(f"Falha após {max_retries} tentativas: {str(e)}")
+                raise
+    return None
+
+
+def _inicializar_processo(requisicoes_por_segundo):
+    # Cada processo tem seu próprio limitador; a taxa global é dividida entre eles
+    limitador_global.configurar(requisicoes_por_segundo)
+
+
+def _executar(indice, funcao, item):
+    try:
+        return indice, funcao(item), None
+    except Exception as e:
+        return indice, None, e
+
+
+def enriquecer_em_ordem(itens, funcao, num_workers=8, usar_processos=False):
+    """
+    Aplica `funcao` a cada item em paralelo e produz tuplas (indice, resultado, erro)
+    na mesma ordem dos itens de entrada. Com usar_processos=True, `funcao` precisa ser
+    definida no nível de módulo para poder ser serializada.
+    """
+    if usar_processos:
+        taxa_por_processo = limitador_global.requisicoes_por_segundo / num_workers
+        executor = ProcessPoolExecutor(max_workers=num_workers, initializer=_inicializar_processo,
+                                       initargs=(taxa_por_processo,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="enriquecimento")
+
+    with executor:
+        futuros = [executor.submit(_executar, i, funcao, item) for i, item in enumerate(itens)]
+        buffer_reordenacao = {}
+        proximo = 0
+        for futuro in as_completed(futuros):
+            indice, resultado, erro = futuro.result()
+            buffer_reordenacao[indice] = (resultado, erro)
+            while proximo in buffer_reordenacao:
+                resultado, erro = buffer_reordenacao.pop(proximo)
+                yield proximo, resultado, erro
+                proximo += 1
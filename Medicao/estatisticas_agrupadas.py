@@ -0,0 +1,86 @@
+"""
+Estatísticas por grupo calculadas em uma única passada ordenada.
+
+Em vez de percorrer os grupos em Python (ou filtrar o DataFrame inteiro uma vez
+por linguagem), as chaves de agrupamento são codificadas uma vez e, para cada
+métrica, os valores são ordenados por (grupo, valor). A partir daí contagem,
+média, mínimo, máximo e quantis de todos os grupos saem de operações vetoriais
+(bincount e indexação pelas posições de início de cada grupo).
+"""
+import numpy as np
+import pandas as pd
+
+# Limites das faixas de estrelas usadas como chave de agrupamento
+LIMITES_FAIXAS_ESTRELAS = [0, 1000, 5000, 10000, 50000, 100000, np.inf]
+
+
+def adicionar_faixa_estrelas(df, coluna='estrelas', limites=LIMITES_FAIXAS_ESTRELAS):
+    """Adiciona a coluna 'faixa_estrelas' (ex.: '10000-50000') para agrupar por popularidade"""
+    rotulos = [f"{int(a)}-{int(b)}" if np.isfinite(b) else f"{int(a)}+" for a, b in zip(limites[:-1], limites[1:])]
+    df['faixa_estrelas'] = pd.cut(pd.to_numeric(df[coluna], errors='coerce'), bins=limites, labels=rotulos, right=False)
+    return df
+
+
+def _codificar(df, chaves):
+    """Código do grupo de cada linha; -1 quando alguma chave é ausente (com uma ou várias chaves)"""
+    if len(chaves) == 1:
+        codigos, grupos = pd.factorize(df[chaves[0]], sort=True)
+        return codigos, pd.Index(grupos, name=chaves[0])
+    # MultiIndex.factorize manteria NaN como grupo; aqui as linhas com chave ausente ficam com -1
+    com_chaves = df[chaves].notna().all(axis=1).to_numpy()
+    codigos = np.full(len(df), -1, dtype=np.intp)
+    codigos[com_chaves], grupos = pd.MultiIndex.from_frame(df.loc[com_chaves, chaves]).factorize(sort=True)
+    grupos.names = chaves
+    return codigos, grupos
+
+
+def _nome_quantil(q):
+    return 'median' if q == 0.5 else f"q{round(q * 100)}"
+
+
+def estatisticas_por_grupo(df, chaves, metricas, quantis=(0.25, 0.5, 0.75)):
+    """
+    Calcula, para cada grupo definido por `chaves` (coluna ou lista de colunas),
+    count e share (fração dos repositórios) e, para cada métrica, as colunas
+    <metrica>_mean, <metrica>_min, <metrica>_max e um <metrica>_<quantil> por quantil
+    (q25, median, q75...). Valores ausentes são ignorados métrica a métrica.
+    Linhas com alguma chave ausente (NaN) ficam fora de todos os grupos e do
+    denominador de share, como no groupby do pandas (dropna=True).
+    """
+    chaves = [chaves] if isinstance(chaves, str) else list(chaves)
+    codigos, grupos = _codificar(df, chaves)
+    num_grupos = len(grupos)
+    com_grupo = codigos >= 0
+
+    contagem = np.bincount(codigos[com_grupo], minlength=num_grupos)
+    resultado = {'count': contagem, 'share': contagem / max(com_grupo.sum(), 1)}
+
+    for metrica in metricas:
+        valores = pd.to_numeric(df[metrica], errors='coerce').to_numpy(dtype=float)
+        validos = com_grupo & ~np.isnan(valores)
+        grupo, valor = codigos[validos], valores[validos]
+        ordem = np.lexsort((valor, grupo))
+        grupo, valor = grupo[ordem], valor[ordem]
+
+        n = np.bincount(grupo, minlength=num_grupos)
+        inicio = np.concatenate(([0], np.cumsum(n)[:-1]))
+        vazio = n == 0
+        ultimo = max(len(valor) - 1, 0)
+        valor_seguro = valor if len(valor) else np.array([np.nan])
+
+        def _em(posicoes):
+            return np.where(vazio, np.nan, valor_seguro[np.clip(posicoes, 0, ultimo)])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            resultado[f"{metrica}_mean"] = np.bincount(grupo, weights=valor, minlength=num_grupos) / n
+        resultado[f"{metrica}_min"] = _em(inicio)
+        resultado[f"{metrica}_max"] = _em(inicio + n - 1)
+        for q in quantis:
+            # Interpolação linear entre as posições vizinhas, como em np.quantile
+            posicao = inicio + q * np.maximum(n - 1, 0)
+            abaixo = np.floor(posicao).astype(int)
+            fracao = posicao - abaixo
+            acima = np.minimum(abaixo + 1, inicio + np.maximum(n - 1, 0))
+            resultado[f"{metrica}_{_nome_quantil(q)}"] = _em(abaixo) * (1 - fracao) + _em(acima) * fracao
+
+    return pd.DataFrame(resultado, index=grupos)
@@ -1,18 +1,24 @@
 import requests
 import json
 import time
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
-import seaborn as sns
-import random
 import traceback
+from deduplicacao import ColecaoDeduplicada
+from registros import RegistroRepositorio, dataframe_de_registros
+from arquivos_comprimidos import salvar_csv
+
+# Colunas derivadas (idade, dias desde a atualização) vêm de Graficos/grafo_analise.py,
+# o mesmo grafo de análise usado por graficos.py e analise_hipoteses.py
+from modulos_graficos import importar_de_graficos
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
+# pandas, matplotlib e seaborn são importados apenas nos métodos de análise e
+# visualização, para que a coleta não pague o tempo de importação dessas bibliotecas
+
 class GitHubAnalyzer:
     def __init__(self):
         self.token = os.getenv('GITHUB_TOKEN')
@@ -25,12 +31,16 @@ class GitHubAnalyzer:
         }
         self.url = 'https://api.github.com/graphql'
         
-    def get_top_repositories(self, limit=100, max_retries=5, custom_query=None):
-        """Busca os repositórios com mais estrelas ou usando uma consulta personalizada"""
+    def get_top_repositories(self, limit=100, max_retries=5, custom_query=None, capacidade_bloom=None):
+        """
+        Busca os repositórios com mais estrelas ou usando uma consulta personalizada.
+        Repositórios repetidos entre páginas são deduplicados por nameWithOwner (upsert).
+        """
         # Consulta padrão se nenhuma consulta personalizada for fornecida
         default_query = """
         query($cursor: String) {
           search(query: "microservices stars:>10", type: REPOSITORY, first: 100, after: $cursor) {
+            repositoryCount
             pageInfo {
               hasNextPage
               endCursor
@@ -71,7 +81,7 @@ class GitHubAnalyzer:
         # Usar a consulta personalizada se fornecida, caso contrário usar a padrão
         query = custom_query if custom_query else default_query
         
-        repositories = []
+        repositories = ColecaoDeduplicada(capacidade_bloom)
         cursor = None
         page = 0
         
@@ -115,7 +125,8 @@ class GitHubAnalyzer:
                         print(f"Falha após {max_retries} tentativas: {e}")
                         if len(repositories) > 0:
                             print(f"Retornando {len(repositories)} repositórios coletados até agora")
-                            return repositories
+                            print(repositories.relatorio(limit))
+                            return repositories.itens
                         else:
                             raise  # Re-lança a exceção se não tiver coletado nenhum repositório
                     
@@ -127,24 +138,25 @@ class GitHubAnalyzer:
             if not success:
                 continue  # Vai para a próxima iteração do loop principal
             
+            repositories.registrar_pagina(search_data['nodes'], search_data.get('repositoryCount'))
             for repo in search_data['nodes']:
                 if len(repositories) >= limit:
                     break
                     
-                repositories.append({
-                    'name': repo['name'],
-                    'owner': repo['owner']['login'],
-                    'full_name': f"{repo['owner']['login']}/{repo['name']}",
-                    'stars': repo['stargazerCount'],
-                    'created_at': repo['createdAt'],
-                    'updated_at': repo['updatedAt'],
-                    'language': repo['primaryLanguage']['name'] if repo['primaryLanguage'] else 'Unknown',
-                    'pull_requests': repo['pullRequests']['totalCount'],
-                    'merged_prs': repo['mergedPullRequests']['totalCount'],
-                    'releases': repo['releases']['totalCount'],
-                    'issues': repo['issues']['totalCount'],
-                    'closed_issues': repo['closedIssues']['totalCount']
-                })
+                registro = RegistroRepositorio(
+                    name=repo['name'],
+                    owner=repo['owner']['login'],
+                    stars=repo['stargazerCount'],
+                    created_at=repo['createdAt'],
+                    updated_at=repo['updatedAt'],
+                    language=repo['primaryLanguage']['name'] if repo['primaryLanguage'] else 'Unknown',
+                    pull_requests=repo['pullRequests']['totalCount'],
+                    merged_prs=repo['mergedPullRequests']['totalCount'],
+                    releases=repo['releases']['totalCount'],
+                    issues=repo['issues']['totalCount'],
+                    closed_issues=repo['closedIssues']['totalCount']
+                )
+                repositories.adicionar(registro, registro.full_name)
             
             page += 1
             print(f"Página {page}: {len(repositories)} repositórios coletados")
@@ -154,21 +166,22 @@ class GitHubAnalyzer:
                 
             cursor = search_data['pageInfo']['endCursor']
         
-        return repositories
+        print(repositories.relatorio(limit))
+        return repositories.itens
     
     def analyze_repositories(self, repositories):
         """Analisa os dados dos repositórios"""
+        derivar_colunas = importar_de_graficos("grafo_analise").derivar_colunas
         
         # Converter para DataFrame
-        df = pd.DataFrame(repositories)
-        
-        # Converter strings de data para objetos datetime
-        df['created_at'] = pd.to_datetime(df['created_at'])
-        df['updated_at'] = pd.to_datetime(df['updated_at'])
+        df = dataframe_de_registros(repositories)
         
-        # Calcular métricas adicionais
-        df['age_days'] = (datetime.now() - df['created_at']).dt.days
-        df['days_since_update'] = (datetime.now() - df['updated_at']).dt.days
+        # Datas e métricas de tempo calculadas pelo grafo de análise compartilhado
+        derivadas = derivar_colunas(df, ('datas', 'idade_dias', 'dias_desde_atualizacao'))
+        df['created_at'] = derivadas['datas']['criacao']
+        df['updated_at'] = derivadas['datas']['atualizacao']
+        df['age_days'] = derivadas['idade_dias']
+        df['days_since_update'] = derivadas['dias_desde_atualizacao']
         
         # Calcular percentual de issues fechadas
         df['closed_issues_ratio'] = df['closed_issues'] / df['issues'].replace(0, 1)
@@ -241,45 +254,43 @@ class GitHubAnalyzer:
     
     def analyze_by_language(self, df):
         """Análise adicional por linguagem de programação"""
+        from estatisticas_agrupadas import estatisticas_por_grupo
         
         report = []
         report.append("ANÁLISE POR LINGUAGEM DE PROGRAMAÇÃO")
         report.append("=" * 50)
         
-        # Agrupar por linguagem
-        grouped = df.groupby('language')
-        
-        # Filtrar apenas linguagens com pelo menos 3 repositórios
-        filtered_groups = {lang: group for lang, group in grouped if len(group) >= 3}
+        # Estatísticas de todas as linguagens em uma passada, mantendo as com pelo menos 3 repositórios
+        stats = estatisticas_por_grupo(df, 'language', ['age_days', 'stars', 'merged_prs', 'releases', 'closed_issues_ratio'])
+        stats = stats[stats['count'] >= 3]
         
-        for lang, group in filtered_groups.items():
-            report.append(f"\nLinguagem: {lang} ({len(group)} repositórios)")
+        for lang, grupo in stats.iterrows():
+            report.append(f"\nLinguagem: {lang} ({int(grupo['count'])} repositórios)")
             report.append("-" * 30)
             
             # Idade média
-            avg_age = group['age_days'].mean() / 365
+            avg_age = grupo['age_days_mean'] / 365
             report.append(f"Idade média: {avg_age:.1f} anos")
             
             # Estrelas médias
-            avg_stars = group['stars'].mean()
-            report.append(f"Estrelas médias: {avg_stars:.1f}")
+            report.append(f"Estrelas médias: {grupo['stars_mean']:.1f}")
             
             # PRs aceitas médias
-            avg_prs = group['merged_prs'].mean()
-            report.append(f"PRs aceitas médias: {avg_prs:.1f}")
+            report.append(f"PRs aceitas médias: {grupo['merged_prs_mean']:.1f}")
             
             # Releases médias
-            avg_releases = group['releases'].mean()
-            report.append(f"Releases médias: {avg_releases:.1f}")
+            report.append(f"Releases médias: {grupo['releases_mean']:.1f}")
             
             # Percentual médio de issues fechadas
-            avg_closed_ratio = group['closed_issues_ratio'].mean() * 100
+            avg_closed_ratio = grupo['closed_issues_ratio_mean'] * 100
             report.append(f"Percentual médio de issues fechadas: {avg_closed_ratio:.1f}%")
         
         return "\n".join(report)
     
     def create_visualizations(self, df):
         """Cria visualizações para as métricas principais"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
         # Configurar o estilo
         sns.set(style="whitegrid")
@@ -331,47 +342,21 @@ class GitHubAnalyzer:
         plt.close()  # Fecha a figura para evitar exibição interativa
 
 def generate_sample_data(num_samples=100):
-    """Gera dados de amostra para testes quando a API não está disponível"""
-    
-    # Linguagens populares
-    languages = ['JavaScript', 'Python', 'Java', 'TypeScript', 'C++', 'Go', 'Rust', 'PHP', 'C#', 'Ruby']
-    
-    repositories = []
-    
-    for i in range(num_samples):
-        # Gerar datas aleatórias nos últimos 5 anos
-        created_days_ago = random.randint(30, 5*365)  # Entre 30 dias e 5 anos atrás
-        created_date = datetime.now() - timedelta(days=created_days_ago)
-        updated_days_ago = random.randint(0, created_days_ago)  # Atualizado após criação
-        updated_date = datetime.now() - timedelta(days=updated_days_ago)
-        
-        # Gerar métricas aleatórias
-        stars = random.randint(10, 10000)
-        issues = random.randint(5, 500)
-        closed_issues = random.randint(0, issues)
-        prs = random.randint(5, 300)
-        merged_prs = random.randint(0, prs)
-        releases = random.randint(0, 50)
-        
-        repositories.append({
-            'name': f'sample-microservice-{i+1}',
-            'owner': f'user-{i+1}',
-            'full_name': f'user-{i+1}/sample-microservice-{i+1}',
-            'stars': stars,
-            'created_at': created_date.isoformat(),
-            'updated_at': updated_date.isoformat(),
-            'language': random.choice(languages),
-            'pull_requests': prs,
-            'merged_prs': merged_prs,
-            'releases': releases,
-            'issues': issues,
-            'closed_issues': closed_issues
-        })
-    
-    return repositories
+    """Gera dados de amostra para testes quando a API não está disponível (modelo ajustado à coleta real)"""
+    from dados_sinteticos import gerar_dataframe
+
+    df = gerar_dataframe(num_samples, esquema='en')
+    for coluna in ('created_at', 'updated_at'):
+        # ISO sem fuso, como datetime.isoformat(); a análise interpreta como UTC
+        df[coluna] = df[coluna].dt.strftime('%Y-%m-%dT%H:%M:%S')
+    campos = [c for c in df.columns if c != 'full_name']
+    return [RegistroRepositorio(**linha) for linha in df[campos].astype(object).to_dict('records')]
 
-def main(use_sample_data=False, num_samples=100, query=None):
-    """Função principal que executa a análise"""
+def main(use_sample_data=False, num_samples=100, query=None, output_file=None):
+    """
+    Função principal que executa a análise. Os dados brutos vão para
+    `output_file`; com extensão .gz ou .zst o CSV é gravado comprimido.
+    """
     try:
         print("Iniciando análise de repositórios GitHub...")
         
@@ -387,11 +372,13 @@ def main(use_sample_data=False, num_samples=100, query=None):
                 # Se não tiver token, cria uma classe simplificada apenas para análise
                 class SimpleAnalyzer:
                     def analyze_repositories(self, repos):
-                        df = pd.DataFrame(repos)
-                        df['created_at'] = pd.to_datetime(df['created_at'])
-                        df['updated_at'] = pd.to_datetime(df['updated_at'])
-                        df['age_days'] = (datetime.now() - df['created_at']).dt.days
-                        df['days_since_update'] = (datetime.now() - df['updated_at']).dt.days
+                        derivar_colunas = importar_de_graficos("grafo_analise").derivar_colunas
+                        df = dataframe_de_registros(repos)
+                        derivadas = derivar_colunas(df, ('datas', 'idade_dias', 'dias_desde_atualizacao'))
+                        df['created_at'] = derivadas['datas']['criacao']
+                        df['updated_at'] = derivadas['datas']['atualizacao']
+                        df['age_days'] = derivadas['idade_dias']
+                        df['days_since_update'] = derivadas['dias_desde_atualizacao']
                         df['closed_issues_ratio'] = df['closed_issues'] / df['issues'].replace(0, 1)
                         return df
                     
@@ -440,32 +427,32 @@ def main(use_sample_data=False, num_samples=100, query=None):
                     
                     def analyze_by_language(self, df):
                         # Versão simplificada da análise por linguagem
+                        from estatisticas_agrupadas import estatisticas_por_grupo
                         report = []
                         report.append("ANÁLISE POR LINGUAGEM DE PROGRAMAÇÃO (DADOS SIMULADOS)")
                         report.append("=" * 50)
                         
-                        # Agrupar por linguagem
-                        grouped = df.groupby('language')
-                        
-                        # Filtrar apenas linguagens com pelo menos 3 repositórios
-                        filtered_groups = {lang: group for lang, group in grouped if len(group) >= 3}
+                        # Estatísticas de todas as linguagens em uma passada
+                        stats = estatisticas_por_grupo(df, 'language', ['age_days', 'stars'])
+                        stats = stats[stats['count'] >= 3]
                         
-                        for lang, group in filtered_groups.items():
-                            report.append(f"\nLinguagem: {lang} ({len(group)} repositórios)")
+                        for lang, grupo in stats.iterrows():
+                            report.append(f"\nLinguagem: {lang} ({int(grupo['count'])} repositórios)")
                             report.append("-" * 30)
                             
                             # Idade média
-                            avg_age = group['age_days'].mean() / 365
+                            avg_age = grupo['age_days_mean'] / 365
                             report.append(f"Idade média: {avg_age:.1f} anos")
                             
                             # Estrelas médias
-                            avg_stars = group['stars'].mean()
-                            report.append(f"Estrelas médias: {avg_stars:.1f}")
+                            report.append(f"Estrelas médias: {grupo['stars_mean']:.1f}")
                         
                         return "\n".join(report)
                     
                     def create_visualizations(self, df):
                         # Versão simplificada das visualizações
+                        import matplotlib.pyplot as plt
+                        import seaborn as sns
                         sns.set(style="whitegrid")
                         plt.figure(figsize=(15, 12))
                         
@@ -512,8 +499,9 @@ def main(use_sample_data=False, num_samples=100, query=None):
         df = analyzer.analyze_repositories(repositories)
         
         # Salvar dados
-        output_file = 'github_repositories_sample.csv' if use_sample_data else 'github_repositories.csv'
-        df.to_csv(output_file, index=False)
+        if output_file is None:
+            output_file = 'github_repositories_sample.csv' if use_sample_data else 'github_repositories.csv'
+        salvar_csv(df, output_file, index=False)
         
         # Gerar relatório
         report = analyzer.generate_report(df)
@@ -546,7 +534,8 @@ if __name__ == "__main__":
     parser.add_argument('--sample', action='store_true', help='Usar dados simulados em vez da API do GitHub')
     parser.add_argument('--count', type=int, default=100, help='Número de repositórios a serem analisados')
     parser.add_argument('--query', type=str, help='Consulta personalizada para busca de repositórios')
+    parser.add_argument('--saida', type=str, default=None, help='CSV dos dados brutos (.csv, .csv.gz ou .csv.zst)')
     
     args = parser.parse_args()
     
-    main(use_sample_data=args.sample, num_samples=args.count, query=args.query)
\ No newline at end of file
+    main(use_sample_data=args.sample, num_samples=args.count, query=args.query, output_file=args.saida)
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""
+Importa os dumps em texto da sprint 1 (repo_grathQL.txt) para o esquema do CSV da sprint 2.
+
+O arquivo é lido via mmap, linha a linha, e cada bloco "Repositório #N ... ----"
+é convertido em uma linha tipada assim que termina, de modo que a memória usada
+não depende do tamanho do dump. Dumps comprimidos (.txt.gz, .txt.zst) são lidos
+em streaming, e a saída é comprimida conforme a extensão (.csv.gz, .csv.zst).
+Diretórios com vários dumps podem ser convertidos em paralelo, um processo por
+arquivo.
+
+    python importar_dumps.py repo_grathQL.txt repo_grathQL.csv
+    python importar_dumps.py repo_grathQL.txt.zst repo_grathQL.csv.zst
+    python importar_dumps.py dumps/ csv_importados/ --processos 4
+"""
+import argparse
+import csv
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from arquivos_comprimidos import abrir, compressao
+from consultas_graphql import colunas_do_perfil
+
+COLUNAS = colunas_do_perfil('full')
+SEPARADOR = "-" * 100
+
+
+def _inteiro(valor):
+    try:
+        return int(valor)
+    except ValueError:
+        return None
+
+def _texto(valor):
+    return None if valor == "None" else valor
+
+def _lista(valor):
+    # o dump separa listas com ", "; o CSV da sprint 2 usa "; "
+    return valor.replace(", ", "; ")
+
+def _licenca(valor):
+    # "MIT License (https://api.github.com/licenses/mit)" -> "MIT License"
+    if valor.endswith(")") and " (" in valor:
+        return valor[:valor.rindex(" (")]
+    return valor
+
+def _tamanho(valor):
+    return _inteiro(valor.removesuffix(" KB"))
+
+
+# rótulo do dump -> (coluna do CSV, conversor)
+ROTULOS = {
+    "Nome": ('nome', str),
+    "URL": ('url', str),
+    "Homepage": ('homepage', _texto),
+    "Estrelas": ('estrelas', _inteiro),
+    "Descrição": ('descricao', _texto),
+    "Forks": ('forks', _inteiro),
+    "Watchers": ('watchers', _inteiro),
+    "Commits": ('commits', _inteiro),
+    "Issues abertas": ('issues_abertas', _inteiro),
+    "Issues fechadas": ('issues_fechadas', _inteiro),
+    "PRs abertos": ('prs_abertos', _inteiro),
+    "PRs fechados": ('prs_fechados', _inteiro),
+    "PRs mesclados": ('prs_mesclados', _inteiro),
+    "Releases": ('releases', _inteiro),
+    "Data de criação": ('data_criacao', str),
+    "Última atualização": ('ultima_atualizacao', str),
+    "Último push": ('ultimo_push', str),
+    "Linguagem principal": ('linguagem_principal', str),
+    "Todas as linguagens": ('todas_linguagens', _lista),
+    "Licença": ('licenca', _licenca),
+    "Tamanho": ('tamanho_kb', _tamanho),
+    "Branch principal": ('branch_principal', str),
+    "Arquivado": ('arquivado', str),
+    "É um fork": ('eh_fork', str),
+    "É um template": ('eh_template', str),
+    "Tópicos": ('topicos', _lista),
+}
+
+
+def _converter_bloco(campos):
+    linha = {coluna: None for coluna in COLUNAS}
+    for rotulo, valor in campos.items():
+        if rotulo == "Proprietário":
+            # "login (Tipo: Organization)"
+            dono, _, tipo = valor.partition(" (Tipo: ")
+            linha['proprietario'] = dono
+            linha['tipo_proprietario'] = tipo.rstrip(")") or None
+        elif rotulo in ROTULOS:
+            coluna, conversor = ROTULOS[rotulo]
+            linha[coluna] = conversor(valor)
+    return linha
+
+
+@contextmanager
+def _linhas_brutas(caminho):
+    if compressao(caminho):
+        with abrir(caminho, "rb") as arquivo:
+            yield arquivo
+        return
+    with open(caminho, "rb") as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield iter(mm.readline, b"")
+
+
+def ler_dump(caminho, estatisticas=None):
+    """
+    Gera as linhas (dicionários no esquema da sprint 2) de um dump da sprint 1.
+    Blocos de erro ("Erro ao processar repositório ...") são contados em
+    estatisticas['erros'] e ignorados.
+    """
+    if estatisticas is None:
+        estatisticas = {}
+    estatisticas.setdefault('erros', 0)
+    if os.path.getsize(caminho) == 0:
+        return
+
+    with _linhas_brutas(caminho) as linhas:
+        campos = None
+        ultimo_rotulo = None
+        for bruta in linhas:
+            texto = bruta.decode("utf-8").rstrip("\r\n")
+            if texto.startswith("Repositório #"):
+                campos = {}
+                ultimo_rotulo = None
+            elif texto == SEPARADOR:
+                if campos:
+                    yield _converter_bloco(campos)
+                campos = None
+            elif texto.startswith("Erro ao processar repositório"):
+                estatisticas['erros'] += 1
+                campos = None
+            elif campos is not None:
+                rotulo, sep, valor = texto.partition(": ")
+                if sep and (rotulo in ROTULOS or rotulo == "Proprietário"):
+                    campos[rotulo] = valor
+                    ultimo_rotulo = rotulo
+                elif ultimo_rotulo:
+                    # Descrições com quebra de linha continuam nas linhas seguintes
+                    campos[ultimo_rotulo] += "\n" + texto
+
+
+def converter_dump(caminho, saida_csv):
+    """Converte um dump em CSV e retorna o número de repositórios escritos"""
+    total = 0
+    with abrir(saida_csv, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=COLUNAS)
+        writer.writeheader()
+        for linha in ler_dump(caminho):
+            writer.writerow(linha)
+            total += 1
+    return total
+
+
+def _nome_dump(nome):
+    """Nome do CSV para um dump (a.txt -> a.csv, a.txt.gz -> a.csv.gz), ou None se não for dump"""
+    for extensao in ("", ".gz", ".zst"):
+        if nome.lower().endswith(".txt" + extensao):
+            return nome[:len(nome) - len(".txt" + extensao)] + ".csv" + extensao
+    return None
+
+
+def converter_diretorio(diretorio, diretorio_saida, processos=None):
+    """Converte em paralelo todos os dumps .txt de um diretório, um CSV por dump (com a mesma compressão)"""
+    os.makedirs(diretorio_saida, exist_ok=True)
+    dumps = sorted(nome for nome in os.listdir(diretorio) if _nome_dump(nome))
+    entradas = [os.path.join(diretorio, nome) for nome in dumps]
+    saidas = [os.path.join(diretorio_saida, _nome_dump(nome)) for nome in dumps]
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        totais = list(executor.map(converter_dump, entradas, saidas))
+
+    for entrada, saida, total in zip(entradas, saidas, totais):
+        print(f"{entrada} -> {saida}: {total} repositórios")
+    return dict(zip(saidas, totais))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Importa dumps repo_grathQL.txt para o CSV da sprint 2')
+    parser.add_argument('entrada', help='Arquivo de dump ou diretório com dumps .txt (.txt.gz, .txt.zst)')
+    parser.add_argument('saida', help='CSV de saída (ou diretório de saída, se a entrada for um diretório)')
+    parser.add_argument('--processos', type=int, default=None, help='Processos para converter diretórios')
+    args = parser.parse_args(argv)
+
+    if os.path.isdir(args.entrada):
+        converter_diretorio(args.entrada, args.saida, args.processos)
+    else:
+        total = converter_dump(args.entrada, args.saida)
+        print(f"{args.entrada} -> {args.saida}: {total} repositórios")
+
+
+if __name__ == "__main__":
+    main()
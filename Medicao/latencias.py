@@ -0,0 +1,170 @@
+"""
+Latência de merge dos PRs e de fechamento das issues, calculada em streaming.
+
+Os nós de PRs mesclados (createdAt, mergedAt) e de issues fechadas (createdAt,
+closedAt) são paginados via GraphQL, 100 por página. Cada página é convertida
+em latências (horas) e somada a um esboço de quantis e a um histograma
+do repositório. Depois disso a página é descartada, então a memória não
+depende do número de PRs ou issues.
+
+O esboço usa buckets logarítmicos com erro relativo limitado (no estilo do
+DDSketch). Esboços e histogramas são contagens por bucket, então podem ser
+mesclados por soma: de várias páginas, de vários repositórios (ex.: por
+linguagem) ou de coletas diferentes.
+"""
+import math
+from bisect import bisect_right
+from datetime import datetime
+
+from enriquecimento import consultar_pagina_busca
+
+# Limites (em horas) do histograma fixo: <1h, <1d, <7d, <30d, >=30d
+LIMITES_HISTOGRAMA_HORAS = [1, 24, 168, 720]
+ROTULOS_HISTOGRAMA = ['<1h', '<1d', '<7d', '<30d', '>=30d']
+
+CONSULTA_LATENCIAS = """
+query($owner: String!, $nome: String!, $cursor: String) {
+  repository(owner: $owner, name: $nome) {
+    conexao: %s(first: 100, after: $cursor, states: %s) {
+      pageInfo { hasNextPage endCursor }
+      nodes { createdAt %s }
+    }
+  }
+}
+"""
+
+
+class EsbocoQuantis:
+    """Esboço de quantis mesclável com erro relativo `precisao`, mais um histograma fixo"""
+
+    def __init__(self, precisao=0.01):
+        self.precisao = precisao
+        self._log_gama = math.log((1 + precisao) / (1 - precisao))
+        self.buckets = {}
+        self.zeros = 0
+        self.histograma = [0] * len(ROTULOS_HISTOGRAMA)
+
+    def __len__(self):
+        return self.zeros + sum(self.buckets.values())
+
+    def adicionar(self, valores):
+        # Páginas de no máximo 100 valores: math puro, sem numpy na importação da coleta
+        for valor in valores:
+            if valor is None or math.isnan(valor):
+                continue
+            self.histograma[bisect_right(LIMITES_HISTOGRAMA_HORAS, valor)] += 1
+            if valor > 0:
+                indice = math.ceil(math.log(valor) / self._log_gama)
+                self.buckets[indice] = self.buckets.get(indice, 0) + 1
+            else:
+                self.zeros += 1
+
+    def mesclar(self, outro):
+        if outro.precisao != self.precisao:
+            raise ValueError("Só é possível mesclar esboços com a mesma precisão")
+        for indice, contagem in outro.buckets.items():
+            self.buckets[indice] = self.buckets.get(indice, 0) + contagem
+        self.zeros += outro.zeros
+        self.histograma = [a + b for a, b in zip(self.histograma, outro.histograma)]
+        return self
+
+    def quantil(self, q):
+        total = len(self)
+        if total == 0:
+            return None
+        posicao = q * (total - 1)
+        acumulado = self.zeros
+        if posicao < acumulado:
+            return 0.0
+        gama = math.exp(self._log_gama)
+        for indice in sorted(self.buckets):
+            acumulado += self.buckets[indice]
+            if posicao < acumulado:
+                # Ponto do bucket com erro relativo mínimo para qualquer valor dentro dele
+                return 2 * gama ** indice / (gama + 1)
+        return 2 * gama ** max(self.buckets) / (gama + 1)
+
+    def histograma_texto(self):
+        return "; ".join(f"{rotulo}:{contagem}" for rotulo, contagem in zip(ROTULOS_HISTOGRAMA, self.histograma))
+
+    def como_texto(self):
+        """Serialização compacta para o CSV: 'zeros|indice:contagem,...'"""
+        return f"{self.zeros}|" + ",".join(f"{i}:{c}" for i, c in sorted(self.buckets.items()))
+
+    @classmethod
+    def de_texto(cls, texto, histograma=None, precisao=0.01):
+        esboco = cls(precisao)
+        zeros, _, buckets = texto.partition("|")
+        esboco.zeros = int(zeros)
+        for par in filter(None, buckets.split(",")):
+            indice, contagem = par.split(":")
+            esboco.buckets[int(indice)] = int(contagem)
+        if histograma:
+            esboco.histograma = [int(p.split(":")[1]) for p in histograma.split("; ")]
+        return esboco
+
+
+def mesclar_esbocos(textos, histogramas=None):
+    """Mescla os esboços serializados de vários repositórios (ex.: todos de uma linguagem)"""
+    histogramas = histogramas if histogramas is not None else [None] * len(textos)
+    total = EsbocoQuantis()
+    for texto, histograma in zip(textos, histogramas):
+        if isinstance(texto, str) and "|" in texto:
+            total.mesclar(EsbocoQuantis.de_texto(texto, histograma))
+    return total
+
+
+def _instante(texto):
+    return datetime.fromisoformat(texto.replace("Z", "+00:00"))
+
+
+def _horas_entre(inicios, fins):
+    return [(_instante(fim) - _instante(inicio)).total_seconds() / 3600 for inicio, fim in zip(inicios, fins)]
+
+
+def paginar_latencias(owner, nome, conexao, estado, campo_fim, esboco=None):
+    """
+    Percorre todas as páginas de `conexao` (pullRequests/issues) no `estado` pedido,
+    somando a latência createdAt -> `campo_fim` de cada página ao esboço.
+    """
+    # Mesmo backoff da busca (5xx, limite de taxa): um erro transitório não descarta as páginas já somadas
+    esboco = esboco or EsbocoQuantis()
+    consulta = CONSULTA_LATENCIAS % (conexao, estado, campo_fim)
+    cursor = None
+    while True:
+        data = consultar_pagina_busca(consulta, {"owner": owner, "nome": nome, "cursor": cursor})
+        if data is None:
+            raise Exception(f"Failed to fetch {conexao}: tentativas esgotadas")
+        pagina = data["repository"]["conexao"]
+        nos = [n for n in pagina["nodes"] if n and n.get(campo_fim)]
+        if nos:
+            esboco.adicionar(_horas_entre([n["createdAt"] for n in nos], [n[campo_fim] for n in nos]))
+        if not pagina["pageInfo"]["hasNextPage"]:
+            return esboco
+        cursor = pagina["pageInfo"]["endCursor"]
+
+
+def _colunas(esboco, sufixo):
+    mediana, p90 = esboco.quantil(0.5), esboco.quantil(0.9)
+    return {
+        f'mediana_{sufixo}_horas': None if mediana is None else round(mediana, 2),
+        f'p90_{sufixo}_horas': None if p90 is None else round(p90, 2),
+        f'histograma_{sufixo}': esboco.histograma_texto(),
+        f'esboco_{sufixo}': esboco.como_texto(),
+    }
+
+
+def enriquecer_latencia_prs(linha):
+    """Mediana e p90 (horas) do tempo entre abertura e merge dos PRs mesclados"""
+    esboco = paginar_latencias(linha['proprietario'], linha['nome'], 'pullRequests', 'MERGED', 'mergedAt')
+    return _colunas(esboco, 'merge')
+
+
+def enriquecer_latencia_issues(linha):
+    """Mediana e p90 (horas) do tempo entre abertura e fechamento das issues fechadas"""
+    esboco = paginar_latencias(linha['proprietario'], linha['nome'], 'issues', 'CLOSED', 'closedAt')
+    return _colunas(esboco, 'fechamento_issue')
+
+
+COLUNAS_LATENCIA_PRS = list(_colunas(EsbocoQuantis(), 'merge'))
+COLUNAS_LATENCIA_ISSUES = list(_colunas(EsbocoQuantis(), 'fechamento_issue'))
@@ -0,0 +1,49 @@
+"""
+Limitador de taxa compartilhado pelas requisições à API do GitHub.
+
+Implementa um balde de fichas (token bucket) protegido por lock, de modo que
+todas as threads do processo respeitem o mesmo orçamento de requisições.
+"""
+import os
+import threading
+import time
+
+
+class LimitadorTaxa:
+    def __init__(self, requisicoes_por_segundo=10.0, rajada=None):
+        self._lock = threading.Lock()
+        self.configurar(requisicoes_por_segundo, rajada)
+
+    def configurar(self, requisicoes_por_segundo, rajada=None):
+        """Altera a taxa permitida (usado, por exemplo, ao dividir a taxa entre processos)"""
+        with self._lock:
+            self.requisicoes_por_segundo = float(requisicoes_por_segundo)
+            self.rajada = float(rajada) if rajada else max(1.0, self.requisicoes_por_segundo)
+            self._fichas = self.rajada
+            self._ultimo = time.monotonic()
+            self._pausado_ate = 0.0
+
+    def aguardar(self):
+        """Bloqueia até que uma requisição possa ser feita"""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                if agora < self._pausado_ate:
+                    espera = self._pausado_ate - agora
+                else:
+                    self._fichas = min(self.rajada, self._fichas + (agora - self._ultimo) * self.requisicoes_por_segundo)
+                    self._ultimo = agora
+                    if self._fichas >= 1:
+                        self._fichas -= 1
+                        return
+                    espera = (1 - self._fichas) / self.requisicoes_por_segundo
+            time.sleep(espera)
+
+    def pausar(self, segundos):
+        """Suspende todas as requisições (ex.: limite da API esgotado até o reset)"""
+        with self._lock:
+            self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+
+
+# Instância global usada por coletores e estágios de enriquecimento
+limitador_global = LimitadorTaxa(float(os.getenv("GITHUB_REQUISICOES_POR_SEGUNDO", "10")))
@@ -3,6 +3,7 @@ import time
 import random
 import os
 from dotenv import load_dotenv
+from arquivos_comprimidos import abrir
 
 load_dotenv()
 token = os.getenv("GITHUB_TOKEN")
@@ -262,7 +263,7 @@ def get_closed_issues(owner, repo):
     return len(closed_issues)
 
 def collect_and_print_repo_info(repos, filename):
-    with open(filename, "w", encoding="utf-8") as f:
+    with abrir(filename, "w") as f:
         for i, repo in enumerate(repos, 1):
             try:
                 owner = repo["owner"]["login"]
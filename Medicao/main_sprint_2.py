@@ -1,112 +1,45 @@
 import requests
 import time
-import random
 import os
 import csv
+from functools import partial
+from urllib.parse import parse_qs, urlparse
 from dotenv import load_dotenv
+from arquivos_comprimidos import abrir
+from deduplicacao import ColecaoDeduplicada, chave_repositorio
+from consultas_graphql import colunas_do_perfil, extrair_linha, montar_consulta
+from registros import RegistroSprint2
+from importar_dumps import ROTULOS as ROTULOS_DUMP
+from enriquecimento import consultar_pagina_busca, enriquecer_em_ordem, requisicao_get
+from limitador_taxa import limitador_global
+from cadencia_releases import COLUNAS_CADENCIA, enriquecer_cadencia_releases
+from latencias import (COLUNAS_LATENCIA_ISSUES, COLUNAS_LATENCIA_PRS, enriquecer_latencia_issues,
+                       enriquecer_latencia_prs)
 
 load_dotenv()
 token = os.getenv("GITHUB_TOKEN")
 if not token:
     raise ValueError("Token do GitHub não encontrado. Verifique se o arquivo .env está configurado corretamente.")
 
-def get_top_starred_repos_graphql(num_repos, keyword=None, batch_size=25):
-    print("Consultando repositórios via GraphQL...")
-    url = "https://api.github.com/graphql"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
+def descrever_custo(rate_limit, quantidade):
+    if rate_limit and quantidade:
+        custo = rate_limit["cost"]
+        return (f"custo: {custo} pontos, {custo / quantidade:.2f} por repositório, "
+                f"restantes: {rate_limit['remaining']}")
+    return None
+
+
+def get_top_starred_repos_graphql(num_repos, keyword=None, batch_size=25, perfil="full", capacidade_bloom=None,
+                                  compactar=True):
+    print(f"Consultando repositórios via GraphQL (perfil: {perfil})...")
     
     search_query = f"stars:>1000" if not keyword else f"{keyword} stars:>100"
     
-    query = """
-    query ($searchQuery: String!, $numRepos: Int!, $cursor: String) {
-      search(query: $searchQuery, type: REPOSITORY, first: $numRepos, after: $cursor) {
-        repositoryCount
-        pageInfo {
-          hasNextPage
-          endCursor
-        }
-        nodes {
-          ... on Repository {
-            name
-            owner {
-              login
-              __typename
-            }
-            stargazerCount
-            description
-            url
-            homepageUrl
-            primaryLanguage {
-              name
-            }
-            languages(first: 10) {
-              nodes {
-                name
-              }
-              totalCount
-            }
-            licenseInfo {
-              name
-              url
-            }
-            createdAt
-            updatedAt
-            pushedAt
-            forks {
-              totalCount
-            }
-            watchers {
-              totalCount
-            }
-            openIssues: issues(states: OPEN) {
-              totalCount
-            }
-            closedIssues: issues(states: CLOSED) {
-              totalCount
-            }
-            openPullRequests: pullRequests(states: OPEN) {
-              totalCount
-            }
-            closedPullRequests: pullRequests(states: CLOSED) {
-              totalCount
-            }
-            mergedPullRequests: pullRequests(states: MERGED) {
-              totalCount
-            }
-            releases {
-              totalCount
-            }
-            defaultBranchRef {
-              name
-              target {
-                ... on Commit {
-                  history {
-                    totalCount
-                  }
-                }
-              }
-            }
-            diskUsage
-            isArchived
-            isFork
-            isTemplate
-            topics: repositoryTopics(first: 10) {
-              nodes {
-                topic {
-                  name
-                }
-              }
-            }
-          }
-        }
-      }
-    }
-    """
+    query = montar_consulta(perfil)
     
-    all_repos = []
+    # Repositórios indexados pelo id do nó: repetições entre páginas viram upsert
+    all_repos = ColecaoDeduplicada(capacidade_bloom)
+    total_busca = num_repos
     cursor = None
     remaining = num_repos
     
@@ -118,68 +51,34 @@ def get_top_starred_repos_graphql(num_repos, keyword=None, batch_size=25):
             "searchQuery": search_query,
             "cursor": cursor
         }
-        json_data = {"query": query, "variables": variables}
+        data = consultar_pagina_busca(query, variables)
+        if data is None:
+            print("Não foi possível obter dados após várias tentativas. Retornando os repositórios coletados até agora.")
+            break
         
-        max_retries = 5
-        retry_count = 0
-        success = False
+        repos_batch = data["search"]["nodes"]
+        for repo in repos_batch:
+            # Com compactar=True o nó JSON é convertido em registro compacto e descartado
+            registro = RegistroSprint2.de_no(repo, perfil) if compactar else repo
+            all_repos.adicionar(registro, chave_repositorio(repo))
+        total_busca = data["search"]["repositoryCount"]
+        all_repos.registrar_pagina(repos_batch, total_busca)
         
-        while not success and retry_count < max_retries:
-            try:
-                response = requests.post(url, headers=headers, json=json_data)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    if "errors" in data:
-                        print(f"GraphQL retornou erros: {data['errors']}")
-                        raise Exception(f"GraphQL query returned errors: {data['errors']}")
-                
-                    repos_batch = data["data"]["search"]["nodes"]
-                    all_repos.extend(repos_batch)
-                    
-                    page_info = data["data"]["search"]["pageInfo"]
-                    has_next_page = page_info["hasNextPage"]
-                    cursor = page_info["endCursor"]
-                    
-                    print(f"Obtidos {len(repos_batch)} repositórios neste lote")
-                    success = True
-                    
-                elif response.status_code == 502 or response.status_code >= 500:
-                    retry_count += 1
-                    wait_time = 2 ** retry_count + random.uniform(0, 1)  # Backoff exponencial
-                    print(f"Erro {response.status_code}, tentando novamente em {wait_time:.2f} segundos (tentativa {retry_count}/{max_retries})")
-                    time.sleep(wait_time)
-                    
-                else:
-                    raise Exception(f"Query failed with status code {response.status_code}: {response.text}")
-                    
-            except Exception as e:
-                if "rate limit" in str(e).lower() or "abuse" in str(e).lower():
-                    retry_count += 1
-                    wait_time = 60 * retry_count 
-                    print(f"Limite de taxa atingido, aguardando {wait_time} segundos...")
-                    time.sleep(wait_time)
-                elif retry_count < max_retries:
-                    retry_count += 1
-                    wait_time = 2 ** retry_count + random.uniform(0, 1)
-                    print(f"Erro: {str(e)}\nTentando novamente em {wait_time:.2f} segundos (tentativa {retry_count}/{max_retries})")
-                    time.sleep(wait_time)
-                else:
-                    print(f"Falha após {max_retries} tentativas: {str(e)}")
-                    raise
+        page_info = data["search"]["pageInfo"]
+        has_next_page = page_info["hasNextPage"]
+        cursor = page_info["endCursor"]
         
-        if not success:
-            print("Não foi possível obter dados após várias tentativas. Retornando os repositórios coletados até agora.")
-            break
+        custo = descrever_custo(data.get("rateLimit"), len(repos_batch))
+        print(f"Obtidos {len(repos_batch)} repositórios neste lote" + (f" ({custo})" if custo else ""))
             
-        remaining -= len(repos_batch)
+        remaining = num_repos - len(all_repos)
         if not has_next_page or len(repos_batch) < current_batch:
             break
         time.sleep(1)
     
     print(f"Total de repositórios coletados: {len(all_repos)}")
-    return all_repos
-
+    print(all_repos.relatorio(min(num_repos, total_busca)))
+    return all_repos.itens[:num_repos]
 
 def get_top_starred_repos(num_repos):
     url = f"https://api.github.com/search/repositories?q=stars:>0&sort=stars&order=desc&per_page={num_repos}"
@@ -200,16 +99,64 @@ def get_popular_repos(keyword, num_repos):
         raise Exception(f"Failed to fetch repositories: {response.status_code}")
 def get_repo_details(owner, repo):
     url = f"https://api.github.com/repos/{owner}/{repo}"
-    headers = {"Authorization": f"token {token}"}
-    response = requests.get(url, headers=headers)
+    response = requisicao_get(url)
     if response.status_code == 200:
         return response.json()
     else:
         raise Exception(f"Failed to fetch repository details: {response.status_code}")
 
-def get_pull_requests(owner, repo):
+def _buscar_pagina(url, page, descricao):
+    separador = "&" if "?" in url else "?"
+    response = requisicao_get(f"{url}{separador}page={page}&per_page=100")
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch {descricao}: {response.status_code}")
+    return response
+
+def _numero_ultima_pagina(response):
+    """Lê o número da última página do cabeçalho Link (rel="last"), se existir"""
+    last = response.links.get("last")
+    if not last:
+        return None
+    return int(parse_qs(urlparse(last["url"]).query)["page"][0])
+
+def _contar_itens_paginando(url, descricao):
+    """Conta os itens seguindo a paginação de 100 em 100 (quando a API não informa rel="last")"""
+    total, page = 0, 1
+    while True:
+        response = _buscar_pagina(url, page, descricao)
+        total += len(response.json())
+        if "next" not in response.links:
+            return total
+        page += 1
+
+def contar_itens_rest(url, descricao):
+    """
+    Conta os itens de um endpoint REST paginado com uma única requisição: com
+    per_page=1, o número da última página (rel="last" no cabeçalho Link) é o total.
+    Sem o cabeçalho, a resposta já contém todos os itens ou, se houver rel="next",
+    a contagem segue pela paginação completa. Retorna None se a API não listar os
+    itens (ex.: histórico grande demais para listar contribuidores).
+    """
+    separador = "&" if "?" in url else "?"
+    response = requisicao_get(f"{url}{separador}per_page=1")
+    if response.status_code == 204:
+        return 0
+    if response.status_code == 403 and "too large" in response.text:
+        return None
+    if response.status_code != 200:
+        raise Exception(f"Failed to fetch {descricao}: {response.status_code}")
+    ultima = _numero_ultima_pagina(response)
+    if ultima is not None:
+        return ultima
+    if "next" not in response.links:
+        return len(response.json())
+    return _contar_itens_paginando(url, descricao)
+
+def get_pull_requests(owner, repo, concorrente=False):
     url = f"https://api.github.com/repos/{owner}/{repo}/pulls?state=all"
     headers = {"Authorization": f"token {token}"}
+    if concorrente:
+        return contar_itens_rest(url, "pull requests")
     page = 1
     pull_requests = []
     while True:
@@ -225,9 +172,11 @@ def get_pull_requests(owner, repo):
         else:
             raise Exception(f"Failed to fetch pull requests: {response.status_code}")
     return len(pull_requests)
-def get_releases(owner, repo):
+def get_releases(owner, repo, concorrente=False):
     url = f"https://api.github.com/repos/{owner}/{repo}/releases"
     headers = {"Authorization": f"token {token}"}
+    if concorrente:
+        return contar_itens_rest(url, "releases")
     page = 1
     releases = []
     while True:
@@ -243,9 +192,11 @@ def get_releases(owner, repo):
         else:
             raise Exception(f"Failed to fetch releases: {response.status_code}")
     return len(releases)
-def get_closed_issues(owner, repo):
+def get_closed_issues(owner, repo, concorrente=False):
     url = f"https://api.github.com/repos/{owner}/{repo}/issues?state=closed"
     headers = {"Authorization": f"token {token}"}
+    if concorrente:
+        return contar_itens_rest(url, "closed issues")
     page = 1
     closed_issues = []
     while True:
@@ -262,163 +213,118 @@ def get_closed_issues(owner, repo):
             raise Exception(f"Failed to fetch closed issues: {response.status_code}")
     return len(closed_issues)
 
-def collect_and_save_to_csv(repos, filename):
+def enriquecer_detalhes_rest(linha):
+    """Busca na API REST os contadores que a busca GraphQL não traz"""
+    detalhes = get_repo_details(linha['proprietario'], linha['nome'])
+    return {
+        'assinantes': detalhes.get('subscribers_count'),
+        'tamanho_rede': detalhes.get('network_count'),
+    }
+
+# Contadores REST por repositório: coluna do CSV -> caminho do endpoint (relativo a /repos/{owner}/{repo}/)
+CONTADORES_REST = {
+    'contribuidores': 'contributors?anon=1',
+    'comentarios_commits': 'comments',
+}
+
+def enriquecer_contadores_rest(linha, colunas=tuple(CONTADORES_REST)):
+    """Conta, com uma requisição por endpoint, os itens que a busca GraphQL não traz"""
+    base = f"https://api.github.com/repos/{linha['proprietario']}/{linha['nome']}"
+    return {coluna: contar_itens_rest(f"{base}/{CONTADORES_REST[coluna]}", coluna) for coluna in colunas}
+
+# Enriquecimentos por repositório: nome -> (colunas adicionadas ao CSV, função(linha) -> dict,
+# coluna após a qual as novas colunas são inseridas; None = no final)
+ENRIQUECIMENTOS = {
+    'detalhes_rest': (['assinantes', 'tamanho_rede'], enriquecer_detalhes_rest, None),
+    'contribuidores': (['contribuidores'], partial(enriquecer_contadores_rest, colunas=('contribuidores',)), 'commits'),
+    'comentarios_commits': (['comentarios_commits'],
+                            partial(enriquecer_contadores_rest, colunas=('comentarios_commits',)), None),
+    'latencia_prs': (COLUNAS_LATENCIA_PRS, enriquecer_latencia_prs, 'prs_mesclados'),
+    'latencia_issues': (COLUNAS_LATENCIA_ISSUES, enriquecer_latencia_issues, 'issues_fechadas'),
+    'cadencia_releases': (COLUNAS_CADENCIA, enriquecer_cadencia_releases, 'releases'),
+}
+
+def _processar_repositorio(repo, perfil="full", enriquecimentos=()):
+    if isinstance(repo, RegistroSprint2):
+        row_data = repo.como_linha(colunas_do_perfil(perfil))
+    else:
+        row_data = extrair_linha(repo, perfil)
+    for nome in enriquecimentos:
+        row_data.update(ENRIQUECIMENTOS[nome][1](row_data))
+    return row_data
+
+def collect_and_save_to_csv(repos, filename, perfil="full", enriquecimentos=(), num_workers=1, usar_processos=False,
+                            coortes=None):
     """
-    Coleta informações dos repositórios e salva em arquivo CSV
+    Coleta informações dos repositórios (nós da API ou registros compactos) e salva em arquivo CSV.
+    As colunas escritas são as do perfil de consulta usado na coleta, mais as
+    dos enriquecimentos pedidos. Os repositórios são processados por um pool de
+    `num_workers` workers e gravados na ordem original. Na coleta por coortes,
+    `coortes` traz, para cada repositório, a lista de coortes que o encontraram
+    (coluna 'coortes'). Retorna o número de linhas gravadas com erro.
     """
     # Definindo as colunas do CSV
-    fieldnames = [
-        'nome', 'proprietario', 'tipo_proprietario', 'url', 'homepage', 'estrelas',
-        'descricao', 'forks', 'watchers', 'commits', 'issues_abertas', 'issues_fechadas',
-        'prs_abertos', 'prs_fechados', 'prs_mesclados', 'releases', 'data_criacao',
-        'ultima_atualizacao', 'ultimo_push', 'linguagem_principal', 'todas_linguagens',
-        'licenca', 'tamanho_kb', 'branch_principal', 'arquivado', 'eh_fork', 'eh_template',
-        'topicos'
-    ]
+    fieldnames = colunas_do_perfil(perfil)
+    if coortes is not None:
+        fieldnames.insert(0, 'coortes')
+    for nome in enriquecimentos:
+        colunas, _, coluna_anterior = ENRIQUECIMENTOS[nome]
+        posicao = fieldnames.index(coluna_anterior) + 1 if coluna_anterior in fieldnames else len(fieldnames)
+        fieldnames[posicao:posicao] = colunas
     
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+    processar = partial(_processar_repositorio, perfil=perfil, enriquecimentos=tuple(enriquecimentos))
+    erros = 0
+    
+    with abrir(filename, 'w', newline='') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         
-        for i, repo in enumerate(repos, 1):
-            try:
-                print(f"Processando repositório {i}/{len(repos)}: {repo['name']}")
-                
-                owner = repo["owner"]["login"]
-                owner_type = repo["owner"]["__typename"]
-                repo_name = repo["name"]
-                
-                # Extraindo linguagens
-                languages = []
-                if "languages" in repo and "nodes" in repo["languages"]:
-                    languages = [lang["name"] for lang in repo["languages"]["nodes"]]
-                
-                # Extraindo tópicos
-                topics = []
-                if "topics" in repo and "nodes" in repo["topics"]:
-                    topics = [node["topic"]["name"] for node in repo["topics"]["nodes"]]
-            
-                # Contando commits
-                commit_count = 0
-                if ("defaultBranchRef" in repo and repo["defaultBranchRef"] and 
-                    "target" in repo["defaultBranchRef"] and 
-                    "history" in repo["defaultBranchRef"]["target"]):
-                    commit_count = repo["defaultBranchRef"]["target"]["history"]["totalCount"]
-                
-                # Informações da licença
-                license_info = "Sem licença"
-                if repo["licenseInfo"]:
-                    license_info = repo['licenseInfo']['name']
-                
-                # Linguagem principal
-                primary_language = "N/A"
-                if repo["primaryLanguage"]:
-                    primary_language = repo["primaryLanguage"]["name"]
-                
-                # Preparando dados para CSV
-                row_data = {
-                    'nome': repo_name,
-                    'proprietario': owner,
-                    'tipo_proprietario': owner_type,
-                    'url': repo['url'],
-                    'homepage': repo.get('homepageUrl', 'N/A'),
-                    'estrelas': repo['stargazerCount'],
-                    'descricao': repo.get('description', 'N/A'),
-                    'forks': repo['forks']['totalCount'],
-                    'watchers': repo['watchers']['totalCount'],
-                    'commits': commit_count,
-                    'issues_abertas': repo['openIssues']['totalCount'],
-                    'issues_fechadas': repo['closedIssues']['totalCount'],
-                    'prs_abertos': repo['openPullRequests']['totalCount'],
-                    'prs_fechados': repo['closedPullRequests']['totalCount'],
-                    'prs_mesclados': repo['mergedPullRequests']['totalCount'],
-                    'releases': repo['releases']['totalCount'],
-                    'data_criacao': repo['createdAt'],
-                    'ultima_atualizacao': repo['updatedAt'],
-                    'ultimo_push': repo['pushedAt'],
-                    'linguagem_principal': primary_language,
-                    'todas_linguagens': '; '.join(languages) if languages else 'N/A',
-                    'licenca': license_info,
-                    'tamanho_kb': repo.get('diskUsage', 'N/A'),
-                    'branch_principal': repo['defaultBranchRef']['name'] if repo['defaultBranchRef'] else 'N/A',
-                    'arquivado': 'Sim' if repo.get('isArchived', False) else 'Não',
-                    'eh_fork': 'Sim' if repo.get('isFork', False) else 'Não',
-                    'eh_template': 'Sim' if repo.get('isTemplate', False) else 'Não',
-                    'topicos': '; '.join(topics) if topics else 'Nenhum'
-                }
-                
+        for indice, row_data, erro in enriquecer_em_ordem(repos, processar, num_workers, usar_processos):
+            i = indice + 1
+            if erro is None:
+                print(f"Processado repositório {i}/{len(repos)}: {row_data['nome']}")
+                if coortes is not None:
+                    row_data['coortes'] = '; '.join(coortes[indice])
                 writer.writerow(row_data)
-                
-            except Exception as e:
-                print(f"Erro ao processar repositório {i}: {str(e)}")
+            else:
+                erros += 1
+                print(f"Erro ao processar repositório {i}: {str(erro)}")
                 # Escrevendo linha com erro para manter consistência
                 error_row = {field: 'ERRO' for field in fieldnames}
                 error_row['nome'] = f"Erro no repositório {i}"
-                error_row['descricao'] = str(e)
+                if 'descricao' in error_row:
+                    error_row['descricao'] = str(erro)
+                if coortes is not None:
+                    error_row['coortes'] = '; '.join(coortes[indice])
                 writer.writerow(error_row)
+    return erros
+
+def _linhas_do_dump(linha):
+    """Linha no esquema do CSV -> linhas "Rótulo: valor" do dump em texto (o inverso de importar_dumps)"""
+    textos = []
+    for rotulo, (coluna, _) in ROTULOS_DUMP.items():
+        if coluna in ('todas_linguagens', 'topicos'):
+            texto = str(linha.get(coluna)).replace("; ", ", ")
+        elif coluna == 'tamanho_kb':
+            texto = f"{linha.get(coluna)} KB"
+        else:
+            texto = linha.get(coluna)
+        textos.append(f"{rotulo}: {texto}")
+        if coluna == 'nome':
+            textos.append(f"Proprietário: {linha.get('proprietario')} (Tipo: {linha.get('tipo_proprietario')})")
+    return textos
 
 def collect_and_print_repo_info(repos, filename):
-    with open(filename, "w", encoding="utf-8") as f:
+    """Grava o dump em texto da sprint 1 a partir de nós da API ou de registros compactos"""
+    with abrir(filename, "w") as f:
         for i, repo in enumerate(repos, 1):
             try:
-                owner = repo["owner"]["login"]
-                owner_type = repo["owner"]["__typename"]
-                repo_name = repo["name"]
-                
-                languages = []
-                if "languages" in repo and "nodes" in repo["languages"]:
-                    languages = [lang["name"] for lang in repo["languages"]["nodes"]]
-                
-                topics = []
-                if "topics" in repo and "nodes" in repo["topics"]:
-                    topics = [node["topic"]["name"] for node in repo["topics"]["nodes"]]
-            
-                commit_count = 0
-                if ("defaultBranchRef" in repo and repo["defaultBranchRef"] and 
-                    "target" in repo["defaultBranchRef"] and 
-                    "history" in repo["defaultBranchRef"]["target"]):
-                    commit_count = repo["defaultBranchRef"]["target"]["history"]["totalCount"]
-                
+                if isinstance(repo, RegistroSprint2):
+                    linha = repo.como_linha(colunas_do_perfil("full"))
+                else:
+                    linha = extrair_linha(repo, "full")
                 f.write(f"Repositório #{i}\n")
-                f.write(f"Nome: {repo_name}\n")
-                f.write(f"Proprietário: {owner} (Tipo: {owner_type})\n")
-                f.write(f"URL: {repo['url']}\n")
-                f.write(f"Homepage: {repo.get('homepageUrl', 'N/A')}\n")
-                f.write(f"Estrelas: {repo['stargazerCount']}\n")
-                f.write(f"Descrição: {repo.get('description', 'N/A')}\n")
-                
-                f.write(f"Forks: {repo['forks']['totalCount']}\n")
-                f.write(f"Watchers: {repo['watchers']['totalCount']}\n")
-                f.write(f"Commits: {commit_count}\n")
-                f.write(f"Issues abertas: {repo['openIssues']['totalCount']}\n")
-                f.write(f"Issues fechadas: {repo['closedIssues']['totalCount']}\n")
-                f.write(f"PRs abertos: {repo['openPullRequests']['totalCount']}\n")
-                f.write(f"PRs fechados: {repo['closedPullRequests']['totalCount']}\n")
-                f.write(f"PRs mesclados: {repo['mergedPullRequests']['totalCount']}\n")
-                f.write(f"Releases: {repo['releases']['totalCount']}\n")
-                
-                f.write(f"Data de criação: {repo['createdAt']}\n")
-                f.write(f"Última atualização: {repo['updatedAt']}\n")
-                f.write(f"Último push: {repo['pushedAt']}\n")
-                
-                primary_language = "N/A"
-                if repo["primaryLanguage"]:
-                    primary_language = repo["primaryLanguage"]["name"]
-                f.write(f"Linguagem principal: {primary_language}\n")
-                f.write(f"Todas as linguagens: {', '.join(languages) if languages else 'N/A'}\n")
-                
-                license_info = "Sem licença"
-                if repo["licenseInfo"]:
-                    license_info = f"{repo['licenseInfo']['name']} ({repo['licenseInfo']['url']})"
-                f.write(f"Licença: {license_info}\n")
-                
-                f.write(f"Tamanho: {repo.get('diskUsage', 'N/A')} KB\n")
-                f.write(f"Branch principal: {repo['defaultBranchRef']['name'] if repo['defaultBranchRef'] else 'N/A'}\n")
-                f.write(f"Arquivado: {'Sim' if repo.get('isArchived', False) else 'Não'}\n")
-                f.write(f"É um fork: {'Sim' if repo.get('isFork', False) else 'Não'}\n")
-                f.write(f"É um template: {'Sim' if repo.get('isTemplate', False) else 'Não'}\n")
-                f.write(f"Tópicos: {', '.join(topics) if topics else 'Nenhum'}\n")
-                
+                f.writelines(f"{texto}\n" for texto in _linhas_do_dump(linha))
                 f.write("-" * 100 + "\n")
             except Exception as e:
                 f.write(f"Erro ao processar repositório {i}: {str(e)}\n")
@@ -428,23 +334,32 @@ if __name__ == "__main__":
     num_repos = 1000  # Aumentado para 1000 repositórios
     batch_size = 10   # Mantendo o tamanho do lote para paginação eficiente
     keyword = None  # Busca genérica sem palavra-chave específica
+    perfil = "full"  # Use "hypotheses-minimal" para coletar só os campos das hipóteses
+    enriquecimentos = []  # Ex.: ["detalhes_rest", "contribuidores"], ["latencia_prs", "latencia_issues", "cadencia_releases"]
+    num_workers = 8  # Workers do estágio de enriquecimento
     output_file_csv = "repositorios_populares_github.csv"  # Arquivo CSV de saída
+    diretorio_historico = None  # Ex.: "historico" para registrar cada coleta como snapshot delta
     
     print(f"Iniciando coleta de dados para {num_repos} repositórios...")
     print(f"Arquivo de saída: {output_file_csv}")
     
     try:
         print(f"Buscando repositórios mais populares do GitHub (busca genérica)")
-        repos = get_top_starred_repos_graphql(num_repos, keyword, batch_size)
+        repos = get_top_starred_repos_graphql(num_repos, keyword, batch_size, perfil)
         
         if not repos:
             print("Nenhum repositório encontrado!")
         else:
             print(f"Encontrados {len(repos)} repositórios. Salvando dados em CSV...")
-            collect_and_save_to_csv(repos, output_file_csv)
+            collect_and_save_to_csv(repos, output_file_csv, perfil, enriquecimentos, num_workers)
             print(f"Dados salvos com sucesso em {output_file_csv}")
             print(f"Total de repositórios processados: {len(repos)}")
             print(f"Arquivo CSV criado com {len(repos)} linhas de dados")
+            
+            if diretorio_historico:
+                from snapshots import HistoricoSnapshots
+                celulas = HistoricoSnapshots(diretorio_historico).registrar(output_file_csv)
+                print(f"Snapshot registrado em {diretorio_historico} ({celulas} células)")
         
     except Exception as e:
         print(f"Erro durante a execução: {e}")
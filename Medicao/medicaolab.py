@@ -0,0 +1,293 @@
+"""
+Ponto de entrada único do MedicaoLab.
+
+    python medicaolab.py collect --num-repos 1000 --perfil hypotheses-minimal
+    python medicaolab.py collect-cohorts --coorte microservices="microservices stars:>100" --coorte top="stars:>1000"
+    python medicaolab.py distributed planejar fila.db --fatias-estrelas 1000,2000,5000,20000
+    python medicaolab.py analyze --sample --count 100
+    python medicaolab.py plot repositorios_populares_github.csv --only H2,RQ07
+    python medicaolab.py watch repositorios_populares_github.csv --debounce 5
+    python medicaolab.py sensitivity repositorios_populares_github.csv --pontos 5000
+    python medicaolab.py cube construir repositorios_populares_github.csv cubo.npz
+    python medicaolab.py cube consultar cubo.npz --filtro arquivado=Não --por tipo_proprietario
+    python medicaolab.py import-dump repo_grathQL.txt repo_grathQL.csv
+    python medicaolab.py serve repositorios_populares_github.csv --porta 8765
+    python medicaolab.py commit-activity repositorios_populares_github.csv atividade_commits.npz --meses 12
+    python medicaolab.py synthesize --linhas 10000000 --saida sinteticos.csv
+    python medicaolab.py --arquivo-respostas arquivo/ collect --num-repos 1000
+    python medicaolab.py renormalize arquivo/ repositorios.csv --perfil full
+
+Cada subcomando importa seus módulos (e as bibliotecas pesadas como pandas,
+matplotlib, seaborn, scipy e statsmodels) somente quando é executado, para
+que a coleta agendada e os testes rápidos com --sample iniciem sem esperar
+por importações que não vão usar.
+"""
+import argparse
+import os
+import sys
+import time
+
+DIRETORIO_GRAFICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Graficos")
+
+
+def _importar(nome_modulo, args):
+    inicio = time.perf_counter()
+    if nome_modulo in ("graficos", "servidor_analise", "observador_analise", "sensibilidade_limiares",
+                       "cubo_hipoteses") and DIRETORIO_GRAFICOS not in sys.path:
+        sys.path.insert(0, DIRETORIO_GRAFICOS)
+    modulo = __import__(nome_modulo)
+    if args.medir_importacao:
+        print(f"Importação de {nome_modulo}: {time.perf_counter() - inicio:.3f} s")
+    return modulo
+
+
+def comando_collect(args):
+    coleta = _importar("main_sprint_2", args)
+    print(f"Iniciando coleta de dados para {args.num_repos} repositórios...")
+    repos = coleta.get_top_starred_repos_graphql(args.num_repos, args.keyword, args.batch_size, args.perfil)
+    if not repos:
+        print("Nenhum repositório encontrado!")
+        return 1
+    coleta.collect_and_save_to_csv(repos, args.saida, args.perfil, args.enriquecimento, args.workers)
+    print(f"Dados salvos com sucesso em {args.saida}")
+    if args.historico:
+        from snapshots import HistoricoSnapshots
+        celulas = HistoricoSnapshots(args.historico).registrar(args.saida)
+        print(f"Snapshot registrado em {args.historico} ({celulas} células)")
+    return 0
+
+
+def comando_collect_cohorts(args):
+    coortes = _importar("coleta_coortes", args)
+    argv = ["--num-repos", str(args.num_repos), "--batch-size", str(args.batch_size), "--perfil", args.perfil,
+            "--workers", str(args.workers), "--saida", args.saida]
+    for nome, busca in args.coorte:
+        argv += ["--coorte", f"{nome}={busca}"]
+    if args.arquivo:
+        argv += ["--arquivo", args.arquivo]
+    for nome in args.enriquecimento:
+        argv += ["--enriquecimento", nome]
+    return coortes.main(argv)
+
+
+def comando_distributed(args):
+    distribuida = _importar("coleta_distribuida", args)
+    return distribuida.main(args.argumentos)
+
+
+def comando_analyze(args):
+    analisador = _importar("github_analyzer_combined", args)
+    analisador.main(use_sample_data=args.sample, num_samples=args.count, query=args.query, output_file=args.saida)
+    return 0
+
+
+def comando_plot(args):
+    graficos = _importar("graficos", args)
+    graficos.main(([args.csv] if args.csv else [])
+                  + (["--only", args.only] if args.only else [])
+                  + (["--workers", str(args.workers)] if args.workers else [])
+                  + (["--permutacoes", str(args.permutacoes)] if args.permutacoes else []))
+    return 0
+
+
+def comando_watch(args):
+    observador = _importar("observador_analise", args)
+    observador.main([args.caminho, "--figuras", args.figuras, "--intervalo", str(args.intervalo),
+                     "--debounce", str(args.debounce)]
+                    + (["--permutacoes", str(args.permutacoes)] if args.permutacoes else []))
+    return 0
+
+
+def comando_sensitivity(args):
+    sensibilidade = _importar("sensibilidade_limiares", args)
+    sensibilidade.main([args.csv, "--pontos", str(args.pontos), "--saida", args.saida]
+                       + (["--hipoteses", args.hipoteses] if args.hipoteses else []))
+    return 0
+
+
+def comando_cube(args):
+    cubo = _importar("cubo_hipoteses", args)
+    return cubo.main(args.argumentos)
+
+
+def comando_import_dump(args):
+    importador = _importar("importar_dumps", args)
+    importador.main([args.entrada, args.saida] + (["--processos", str(args.processos)] if args.processos else []))
+    return 0
+
+
+def comando_serve(args):
+    servidor = _importar("servidor_analise", args)
+    servidor.main([args.csv, "--host", args.host, "--porta", str(args.porta)])
+    return 0
+
+
+def comando_commit_activity(args):
+    atividade = _importar("atividade_commits", args)
+    atividade.main([args.csv, args.saida, "--meses", str(args.meses),
+                    "--repos-por-consulta", str(args.repos_por_consulta), "--workers", str(args.workers)])
+    return 0
+
+
+def comando_synthesize(args):
+    sinteticos = _importar("dados_sinteticos", args)
+    sinteticos.main(["--linhas", str(args.linhas), "--esquema", args.esquema, "--saida", args.saida,
+                     "--semente", str(args.semente)]
+                    + (["--modelo", args.modelo] if args.modelo else [])
+                    + (["--processos", str(args.processos)] if args.processos else []))
+    return 0
+
+
+def comando_renormalize(args):
+    arquivo = _importar("arquivo_respostas", args)
+    arquivo.main(["renormalizar", args.diretorio, args.saida]
+                 + (["--perfil", args.perfil] if args.perfil else [])
+                 + (["--desde", args.desde] if args.desde else [])
+                 + (["--ate", args.ate] if args.ate else [])
+                 + (["--processos", str(args.processos)] if args.processos else []))
+    return 0
+
+
+def _ler_coorte(texto):
+    # Validação local: o módulo de coleta só é importado quando o subcomando roda
+    nome, separador, busca = texto.partition("=")
+    if not separador or not nome.strip() or not busca.strip():
+        raise argparse.ArgumentTypeError(f"Coorte inválida: {texto!r}. Use nome=\"busca\"")
+    return nome.strip(), busca.strip()
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="MedicaoLab: coleta e análise de repositórios do GitHub")
+    parser.add_argument("--medir-importacao", action="store_true",
+                        help="Mostra o tempo gasto importando os módulos do subcomando")
+    parser.add_argument("--arquivo-respostas", default=None, metavar="DIR",
+                        help="Arquiva toda resposta bruta da API neste diretório (ver renormalize)")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    collect = subparsers.add_parser("collect", help="Coleta repositórios via GraphQL e salva em CSV")
+    collect.add_argument("--num-repos", type=int, default=1000, help="Número de repositórios a coletar")
+    collect.add_argument("--keyword", type=str, default=None, help="Palavra-chave da busca")
+    collect.add_argument("--batch-size", type=int, default=10, help="Repositórios por página da busca")
+    collect.add_argument("--perfil", type=str, default="full", help="Perfil de consulta (full, hypotheses-minimal)")
+    collect.add_argument("--enriquecimento", action="append", default=[],
+                         help="Enriquecimento por repositório: detalhes_rest, contribuidores, comentarios_commits, "
+                              "latencia_prs, latencia_issues, cadencia_releases (pode ser repetido)")
+    collect.add_argument("--workers", type=int, default=8, help="Workers do estágio de enriquecimento")
+    collect.add_argument("--saida", type=str, default="repositorios_populares_github.csv",
+                         help="Arquivo CSV de saída (.csv.gz ou .csv.zst para gravar comprimido)")
+    collect.add_argument("--historico", type=str, default=None,
+                         help="Diretório do histórico de snapshots onde registrar a coleta")
+    collect.set_defaults(funcao=comando_collect)
+
+    coortes = subparsers.add_parser("collect-cohorts",
+                                    help="Coleta várias buscas nomeadas (coortes) com um único cliente e limitador")
+    coortes.add_argument("--coorte", type=_ler_coorte, action="append", default=[],
+                         help='Coorte no formato nome="busca" (pode ser repetido)')
+    coortes.add_argument("--arquivo", default=None, help="JSON com a lista de coortes (nome, busca, num_repos)")
+    coortes.add_argument("--num-repos", type=int, default=1000, help="Repositórios por coorte")
+    coortes.add_argument("--batch-size", type=int, default=25, help="Repositórios por página da busca")
+    coortes.add_argument("--perfil", type=str, default="full", help="Perfil de consulta (full, hypotheses-minimal)")
+    coortes.add_argument("--enriquecimento", action="append", default=[], help="Enriquecimento por repositório")
+    coortes.add_argument("--workers", type=int, default=8, help="Workers do estágio de enriquecimento")
+    coortes.add_argument("--saida", type=str, default="repositorios_coortes.csv", help="Arquivo CSV de saída")
+    coortes.set_defaults(funcao=comando_collect_cohorts)
+
+    distribuida = subparsers.add_parser("distributed", add_help=False,
+                                        help="Coleta distribuída (planejar, trabalhar, local, status, mesclar)")
+    distribuida.add_argument("argumentos", nargs=argparse.REMAINDER, help="Argumentos de coleta_distribuida.py")
+    distribuida.set_defaults(funcao=comando_distributed)
+
+    analyze = subparsers.add_parser("analyze", help="Executa a análise do GitHubAnalyzer (RQ01-RQ06)")
+    analyze.add_argument("--sample", action="store_true", help="Usar dados simulados em vez da API do GitHub")
+    analyze.add_argument("--count", type=int, default=100, help="Número de repositórios a serem analisados")
+    analyze.add_argument("--query", type=str, help="Consulta personalizada para busca de repositórios")
+    analyze.add_argument("--saida", type=str, default=None, help="CSV dos dados brutos (.csv, .csv.gz ou .csv.zst)")
+    analyze.set_defaults(funcao=comando_analyze)
+
+    plot = subparsers.add_parser("plot", help="Gera os gráficos das hipóteses a partir do CSV")
+    plot.add_argument("csv", nargs="?", default=None, help="Caminho do CSV (padrão: busca na pasta atual)")
+    plot.add_argument("--only", default=None,
+                      help="Somente estes alvos e suas dependências (ex.: H2,RQ07; também relatorio)")
+    plot.add_argument("--workers", type=int, default=None, help="Threads para as estatísticas independentes")
+    plot.add_argument("--permutacoes", type=int, default=None, help="Permutações do teste da RQ07 (padrão: 10000)")
+    plot.set_defaults(funcao=comando_plot)
+
+    watch = subparsers.add_parser("watch", help="Mantém gráficos e resumo atualizados enquanto o dataset cresce")
+    watch.add_argument("caminho", help="CSV da coleta ou diretório de partições da coleta distribuída")
+    watch.add_argument("--figuras", default="H1,H2,H3,H4,H5,H6", help="Figuras mantidas atualizadas (H1-H6, RQ07)")
+    watch.add_argument("--intervalo", type=float, default=1.0, help="Segundos entre verificações")
+    watch.add_argument("--debounce", type=float, default=2.0, help="Segundos sem mudanças antes de processar")
+    watch.add_argument("--permutacoes", type=int, default=None, help="Permutações do teste da RQ07 (padrão: 1000)")
+    watch.set_defaults(funcao=comando_watch)
+
+    sensibilidade = subparsers.add_parser("sensitivity", help="Sensibilidade dos vereditos H1-H6 aos limiares")
+    sensibilidade.add_argument("csv", help="CSV da coleta")
+    sensibilidade.add_argument("--pontos", type=int, default=2000, help="Limiares avaliados por hipótese")
+    sensibilidade.add_argument("--hipoteses", default=None, help="Subconjunto, ex.: H2,H4")
+    sensibilidade.add_argument("--saida", default="sensibilidade", help="Diretório das tabelas e curvas")
+    sensibilidade.set_defaults(funcao=comando_sensitivity)
+
+    cubo = subparsers.add_parser("cube", add_help=False,
+                                 help="Cubo das métricas H1-H6 por linguagem, proprietário, estrelas, arquivado e fork")
+    cubo.add_argument("argumentos", nargs=argparse.REMAINDER, help="Argumentos de cubo_hipoteses.py")
+    cubo.set_defaults(funcao=comando_cube)
+
+    importar = subparsers.add_parser("import-dump", help="Converte dumps repo_grathQL.txt da sprint 1 em CSV")
+    importar.add_argument("entrada", help="Arquivo de dump ou diretório com dumps .txt")
+    importar.add_argument("saida", help="CSV de saída (ou diretório, se a entrada for um diretório)")
+    importar.add_argument("--processos", type=int, default=None, help="Processos para converter diretórios")
+    importar.set_defaults(funcao=comando_import_dump)
+
+    serve = subparsers.add_parser("serve", help="Mantém o dataset em memória e responde consultas das hipóteses via HTTP")
+    serve.add_argument("csv", help="Arquivo CSV do dataset")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--porta", type=int, default=8765)
+    serve.set_defaults(funcao=comando_serve)
+
+    atividade = subparsers.add_parser("commit-activity", help="Commits mensais por repositório em matriz repositório × mês")
+    atividade.add_argument("csv", help="CSV da coleta com as colunas proprietario e nome")
+    atividade.add_argument("saida", help="Arquivo .npz de saída")
+    atividade.add_argument("--meses", type=int, default=12, help="Meses completos anteriores ao atual")
+    atividade.add_argument("--repos-por-consulta", type=int, default=50, help="Repositórios por consulta GraphQL")
+    atividade.add_argument("--workers", type=int, default=1, help="Consultas simultâneas")
+    atividade.set_defaults(funcao=comando_commit_activity)
+
+    sintese = subparsers.add_parser("synthesize", help="Gera um dataset sintético ajustado à coleta real")
+    sintese.add_argument("--linhas", type=int, default=100000, help="Número de repositórios sintéticos")
+    sintese.add_argument("--esquema", choices=["pt", "en"], default="pt",
+                         help="pt: CSV da sprint 2; en: esquema do GitHubAnalyzer")
+    sintese.add_argument("--saida", default="repositorios_sinteticos.csv", help="Arquivo CSV de saída")
+    sintese.add_argument("--modelo", default=None, help="Modelo .json salvo por dados_sinteticos.py")
+    sintese.add_argument("--semente", type=int, default=42)
+    sintese.add_argument("--processos", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    sintese.set_defaults(funcao=comando_synthesize)
+
+    renormalize = subparsers.add_parser("renormalize",
+                                        help="Reconstrói o CSV/Parquet a partir das respostas arquivadas, sem rede")
+    renormalize.add_argument("diretorio", help="Diretório passado em --arquivo-respostas")
+    renormalize.add_argument("saida", help="Arquivo de saída (.csv, .csv.gz, .csv.zst ou .parquet)")
+    renormalize.add_argument("--perfil", default=None, help="Perfil de colunas (padrão: o das consultas arquivadas)")
+    renormalize.add_argument("--desde", default=None, help="Somente respostas a partir desta data/hora ISO (UTC)")
+    renormalize.add_argument("--ate", default=None, help="Somente respostas até esta data/hora ISO (UTC)")
+    renormalize.add_argument("--processos", type=int, default=None, help="Processos (padrão: todos os núcleos)")
+    renormalize.set_defaults(funcao=comando_renormalize)
+
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args, desconhecidos = parser.parse_known_args(argv)
+    if args.comando in ("distributed", "cube"):
+        # REMAINDER não captura opções logo no início (ex.: distributed --help)
+        args.argumentos = desconhecidos + args.argumentos
+    elif desconhecidos:
+        parser.error(f"argumentos não reconhecidos: {' '.join(desconhecidos)}")
+    if args.arquivo_respostas:
+        # Variável de ambiente para alcançar também os processos filhos e os workers locais
+        os.environ["MEDICAOLAB_ARQUIVO_RESPOSTAS"] = os.path.abspath(args.arquivo_respostas)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
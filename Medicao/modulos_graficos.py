@@ -0,0 +1,28 @@
+"""
+Módulos de Graficos/ usados também pela Medicao (grafo_analise, graficos_agregados).
+
+São carregados pelo caminho do arquivo, sem alterar sys.path, e registrados em
+sys.modules com o próprio nome: quem importar o mesmo módulo depois (ex.:
+graficos.py chamado pelo medicaolab) recebe a mesma instância.
+
+    derivar_colunas = importar_de_graficos("grafo_analise").derivar_colunas
+"""
+import importlib.util
+import os
+import sys
+
+DIRETORIO_GRAFICOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Graficos")
+
+
+def importar_de_graficos(nome):
+    if nome in sys.modules:
+        return sys.modules[nome]
+    spec = importlib.util.spec_from_file_location(nome, os.path.join(DIRETORIO_GRAFICOS, f"{nome}.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[nome]
+        raise
+    return modulo
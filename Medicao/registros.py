@@ -0,0 +1,103 @@
+"""
+Registros compactos de repositórios mantidos em memória durante a coleta.
+
+Os nós JSON da API (dicionários aninhados) são convertidos assim que chegam
+em instâncias com __slots__, sem o dicionário por instância, e as strings
+muito repetidas (proprietário, linguagem, licença...) são internadas para que
+todas as ocorrências compartilhem o mesmo objeto.
+"""
+import sys
+from dataclasses import dataclass
+
+from consultas_graphql import extrair_linha
+
+
+def _internar(valor):
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+@dataclass(slots=True)
+class RegistroRepositorio:
+    """Repositório no esquema em inglês usado pelo GitHubAnalyzer"""
+    name: str
+    owner: str
+    stars: int
+    created_at: str
+    updated_at: str
+    language: str
+    pull_requests: int
+    merged_prs: int
+    releases: int
+    issues: int
+    closed_issues: int
+
+    def __post_init__(self):
+        self.owner = _internar(self.owner)
+        self.language = _internar(self.language)
+
+    @property
+    def full_name(self):
+        return f"{self.owner}/{self.name}"
+
+
+# Ordem das colunas do DataFrame/CSV gerado pelo GitHubAnalyzer
+COLUNAS_ANALISADOR = [
+    'name', 'owner', 'full_name', 'stars', 'created_at', 'updated_at', 'language',
+    'pull_requests', 'merged_prs', 'releases', 'issues', 'closed_issues',
+]
+
+
+@dataclass(slots=True)
+class RegistroSprint2:
+    """Repositório no esquema do CSV da sprint 2; colunas fora do perfil ficam como None"""
+    id: str = None
+    nome: str = None
+    proprietario: str = None
+    tipo_proprietario: str = None
+    url: str = None
+    homepage: str = None
+    estrelas: int = None
+    descricao: str = None
+    forks: int = None
+    watchers: int = None
+    commits: int = None
+    issues_abertas: int = None
+    issues_fechadas: int = None
+    prs_abertos: int = None
+    prs_fechados: int = None
+    prs_mesclados: int = None
+    releases: int = None
+    data_criacao: str = None
+    ultima_atualizacao: str = None
+    ultimo_push: str = None
+    linguagem_principal: str = None
+    todas_linguagens: str = None
+    licenca: str = None
+    tamanho_kb: int = None
+    branch_principal: str = None
+    arquivado: str = None
+    eh_fork: str = None
+    eh_template: str = None
+    topicos: str = None
+
+    def __post_init__(self):
+        for campo in ('proprietario', 'tipo_proprietario', 'linguagem_principal', 'licenca', 'branch_principal'):
+            setattr(self, campo, _internar(getattr(self, campo)))
+
+    @classmethod
+    def de_no(cls, repo, perfil='full'):
+        """Converte um nó GraphQL em registro compacto; o nó pode ser descartado em seguida"""
+        return cls(id=repo.get('id'), **extrair_linha(repo, perfil))
+
+    def como_linha(self, colunas):
+        return {coluna: getattr(self, coluna) for coluna in colunas}
+
+
+def dataframe_de_registros(registros, colunas=COLUNAS_ANALISADOR):
+    """
+    Monta um DataFrame coluna a coluna diretamente dos atributos dos registros,
+    sem criar um dicionário intermediário por linha.
+    """
+    import pandas as pd
+
+    return pd.DataFrame({coluna: [getattr(r, coluna) for r in registros] for coluna in colunas})
@@ -0,0 +1,223 @@
+"""
+Histórico de coletas armazenado como deltas entre snapshots.
+
+Cada execução da coleta é registrada comparando-a com o estado anterior: só as
+células que mudaram (repositório, coluna, novo valor) são gravadas, junto com
+os repositórios que saíram da lista. A cada `intervalo_base` registros uma
+tabela completa (base) é gravada, para que a reconstrução de qualquer data
+aplique no máximo esse número de deltas.
+
+Estrutura do diretório:
+    indice.json                    lista dos snapshots em ordem cronológica
+    base_<data>.csv.gz             tabela completa
+    delta_<data>.csv.gz            linhas (chave, coluna, valor) alteradas
+
+    python snapshots.py registrar historico/ repositorios_populares_github.csv
+    python snapshots.py reconstruir historico/ 2025-08-23 saida.csv
+    python snapshots.py serie historico/ estrelas serie_estrelas.csv
+"""
+import argparse
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+COLUNA_CHAVE = 'chave'
+MARCA_REMOVIDO = '__removido__'
+
+# Colunas convertidas de volta para número ao reconstruir um snapshot
+COLUNAS_NUMERICAS = [
+    'estrelas', 'forks', 'watchers', 'commits', 'issues_abertas', 'issues_fechadas',
+    'prs_abertos', 'prs_fechados', 'prs_mesclados', 'releases', 'tamanho_kb',
+]
+
+
+def _indexar(df):
+    """Indexa a tabela por proprietario/nome e normaliza os valores como texto"""
+    df = df.copy()
+    df[COLUNA_CHAVE] = df['proprietario'].astype(str) + '/' + df['nome'].astype(str)
+    df = df.drop_duplicates(COLUNA_CHAVE, keep='last').set_index(COLUNA_CHAVE)
+    return df.astype('string')
+
+
+def _tipar(df):
+    for coluna in COLUNAS_NUMERICAS:
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    return df
+
+
+class HistoricoSnapshots:
+    def __init__(self, diretorio, intervalo_base=30):
+        self.diretorio = diretorio
+        self.intervalo_base = intervalo_base
+        os.makedirs(diretorio, exist_ok=True)
+        self._caminho_indice = os.path.join(diretorio, 'indice.json')
+        if os.path.exists(self._caminho_indice):
+            with open(self._caminho_indice, encoding='utf-8') as f:
+                self.indice = json.load(f)
+        else:
+            self.indice = []
+
+    def _salvar_indice(self):
+        with open(self._caminho_indice, 'w', encoding='utf-8') as f:
+            json.dump(self.indice, f, indent=2, ensure_ascii=False)
+
+    def datas(self):
+        return [entrada['data'] for entrada in self.indice]
+
+    def registrar(self, dados, data=None):
+        """
+        Registra uma coleta (DataFrame ou caminho de CSV) na data informada (ISO, padrão: hoje).
+        Retorna o número de células gravadas.
+        """
+        data = data or date.today().isoformat()
+        if self.indice and data <= self.indice[-1]['data']:
+            raise ValueError(f"A data {data} não é posterior ao último snapshot ({self.indice[-1]['data']})")
+        if isinstance(dados, str):
+            dados = pd.read_csv(dados, dtype='string', keep_default_na=False, na_values=[''])
+        atual = _indexar(dados)
+
+        deltas_desde_base = 0
+        for entrada in reversed(self.indice):
+            if entrada['tipo'] == 'base':
+                break
+            deltas_desde_base += 1
+
+        if not self.indice or deltas_desde_base + 1 >= self.intervalo_base:
+            arquivo = f'base_{data}.csv.gz'
+            atual.to_csv(os.path.join(self.diretorio, arquivo), compression='gzip')
+            self.indice.append({'data': data, 'tipo': 'base', 'arquivo': arquivo, 'colunas': list(atual.columns)})
+            self._salvar_indice()
+            return atual.size
+
+        anterior = self._reconstruir_texto(self.indice[-1]['data'])
+        delta = self._calcular_delta(anterior, atual)
+        arquivo = f'delta_{data}.csv.gz'
+        delta.to_csv(os.path.join(self.diretorio, arquivo), index=False, compression='gzip')
+        self.indice.append({'data': data, 'tipo': 'delta', 'arquivo': arquivo, 'colunas': list(atual.columns)})
+        self._salvar_indice()
+        return len(delta)
+
+    @staticmethod
+    def _calcular_delta(anterior, atual):
+        colunas = list(dict.fromkeys(list(anterior.columns) + list(atual.columns)))
+        anterior_alinhado = anterior.reindex(index=atual.index, columns=colunas)
+        atual_alinhado = atual.reindex(columns=colunas)
+        mudou = atual_alinhado.fillna('\0').ne(anterior_alinhado.fillna('\0')).to_numpy()
+
+        linhas, colunas_alteradas = np.nonzero(mudou)
+        alteradas = pd.DataFrame({
+            COLUNA_CHAVE: atual_alinhado.index[linhas],
+            'coluna': atual_alinhado.columns[colunas_alteradas],
+            'valor': atual_alinhado.to_numpy(dtype=object)[linhas, colunas_alteradas],
+        })
+        removidas = pd.DataFrame({COLUNA_CHAVE: anterior.index.difference(atual.index),
+                                  'coluna': MARCA_REMOVIDO, 'valor': ''})
+        return pd.concat([alteradas, removidas], ignore_index=True)
+
+    def _ler(self, entrada):
+        caminho = os.path.join(self.diretorio, entrada['arquivo'])
+        if entrada['tipo'] == 'base':
+            return pd.read_csv(caminho, dtype='string', keep_default_na=False, na_values=['']).set_index(COLUNA_CHAVE)
+        return pd.read_csv(caminho, dtype='string', keep_default_na=False, na_values=[''])
+
+    def reconstruir(self, data):
+        """Reconstrói a tabela completa como estava na data (último snapshot até ela)"""
+        return _tipar(self._reconstruir_texto(data).reset_index(drop=True))
+
+    def _reconstruir_texto(self, data):
+        entradas = [e for e in self.indice if e['data'] <= data]
+        if not entradas:
+            raise ValueError(f"Nenhum snapshot registrado até {data}")
+        inicio = max(i for i, e in enumerate(entradas) if e['tipo'] == 'base')
+        tabela = self._ler(entradas[inicio])
+
+        for entrada in entradas[inicio + 1:]:
+            delta = self._ler(entrada)
+            removidos = delta.loc[delta['coluna'] == MARCA_REMOVIDO, COLUNA_CHAVE]
+            alteracoes = delta[delta['coluna'] != MARCA_REMOVIDO]
+            novas_chaves = pd.Index(alteracoes[COLUNA_CHAVE].unique())
+            tabela = tabela.drop(index=removidos, errors='ignore')
+            tabela = tabela.reindex(index=tabela.index.append(novas_chaves.difference(tabela.index, sort=False)),
+                                    columns=entrada['colunas'])
+            # Aplica todas as células alteradas de uma vez, por posição
+            valores = tabela.to_numpy(dtype=object)
+            valores[tabela.index.get_indexer(alteracoes[COLUNA_CHAVE]),
+                    tabela.columns.get_indexer(alteracoes['coluna'])] = alteracoes['valor'].to_numpy(dtype=object)
+            tabela = pd.DataFrame(valores, index=tabela.index, columns=tabela.columns).astype('string')
+
+        return tabela
+
+    def serie_temporal(self, coluna, chaves=None):
+        """
+        Série temporal de uma coluna: DataFrame com uma linha por data de snapshot e
+        uma coluna por repositório (NaN enquanto o repositório não estava na lista).
+        """
+        eventos = []
+        for entrada in self.indice:
+            tabela = self._ler(entrada)
+            if entrada['tipo'] == 'base':
+                eventos.append(pd.DataFrame({COLUNA_CHAVE: tabela.index, 'presente': 1.0,
+                                             'valor': tabela[coluna].to_numpy(), 'data': entrada['data']}))
+                continue
+            # Qualquer célula alterada indica que o repositório está na lista; a marca de remoção, que saiu
+            removido = tabela['coluna'] == MARCA_REMOVIDO
+            presenca = (tabela[[COLUNA_CHAVE]].assign(presente=np.where(removido, 0.0, 1.0))
+                        .drop_duplicates(COLUNA_CHAVE, keep='last'))
+            valores = tabela.loc[tabela['coluna'] == coluna, [COLUNA_CHAVE, 'valor']]
+            eventos.append(presenca.merge(valores, on=COLUNA_CHAVE, how='left').assign(data=entrada['data']))
+
+        eventos = pd.concat(eventos, ignore_index=True)
+        if chaves is not None:
+            eventos = eventos[eventos[COLUNA_CHAVE].isin(chaves)]
+        eventos['valor'] = pd.to_numeric(eventos['valor'], errors='coerce')
+
+        datas = self.datas()
+        valores = (eventos.dropna(subset=['valor'])
+                   .pivot(index='data', columns=COLUNA_CHAVE, values='valor')
+                   .reindex(datas).ffill())
+        presenca = eventos.pivot(index='data', columns=COLUNA_CHAVE, values='presente').reindex(
+            index=datas, columns=valores.columns)
+        # Uma base substitui a tabela inteira: quem não está nela deixou a lista
+        bases = [e['data'] for e in self.indice if e['tipo'] == 'base']
+        presenca.loc[bases] = presenca.loc[bases].fillna(0.0)
+        presenca = presenca.ffill().fillna(0.0).astype(bool)
+
+        valores.index.name = 'data'
+        return valores.where(presenca)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Histórico de coletas em snapshots delta')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    registrar = subparsers.add_parser('registrar', help='Registra um CSV de coleta')
+    registrar.add_argument('diretorio')
+    registrar.add_argument('csv')
+    registrar.add_argument('--data', default=None, help='Data do snapshot (AAAA-MM-DD, padrão: hoje)')
+    reconstruir = subparsers.add_parser('reconstruir', help='Reconstrói a tabela de uma data')
+    reconstruir.add_argument('diretorio')
+    reconstruir.add_argument('data')
+    reconstruir.add_argument('saida')
+    serie = subparsers.add_parser('serie', help='Exporta a série temporal de uma coluna')
+    serie.add_argument('diretorio')
+    serie.add_argument('coluna')
+    serie.add_argument('saida')
+    args = parser.parse_args(argv)
+
+    historico = HistoricoSnapshots(args.diretorio)
+    if args.comando == 'registrar':
+        celulas = historico.registrar(args.csv, args.data)
+        print(f"Snapshot registrado em {historico.indice[-1]['arquivo']} ({celulas} células)")
+    elif args.comando == 'reconstruir':
+        historico.reconstruir(args.data).to_csv(args.saida, index=False)
+        print(f"Tabela de {args.data} salva em {args.saida}")
+    else:
+        historico.serie_temporal(args.coluna).to_csv(args.saida)
+        print(f"Série temporal de {args.coluna} salva em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
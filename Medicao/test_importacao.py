@@ -0,0 +1,40 @@
+"""
+A coleta não deve importar as bibliotecas de análise.
+
+Cada módulo é importado num processo novo (sem cache de módulos), que informa
+o tempo de importação e quais bibliotecas pesadas ficaram em sys.modules.
+
+    python -m pytest -q test_importacao.py
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+PESADAS = ('pandas', 'numpy', 'matplotlib', 'seaborn')
+LIMITE_SEGUNDOS = 0.5
+
+CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{'segundos': duracao, 'carregadas': [m for m in {pesadas!r} if m in sys.modules]}}))
+"""
+
+
+def _importar_em_processo_novo(modulo):
+    ambiente = dict(os.environ, GITHUB_TOKEN=os.environ.get("GITHUB_TOKEN", "token-de-teste"))
+    saida = subprocess.run([sys.executable, "-c", CODIGO.format(modulo=modulo, pesadas=PESADAS)],
+                           cwd=DIRETORIO, env=ambiente, capture_output=True, text=True, check=True).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("modulo", ["main_sprint_2", "github_analyzer_combined"])
+def test_importacao_sem_bibliotecas_de_analise(modulo):
+    resultado = _importar_em_processo_novo(modulo)
+    assert resultado['carregadas'] == [], f"{modulo} importou {resultado['carregadas']}"
+    assert resultado['segundos'] < LIMITE_SEGUNDOS, f"{modulo} levou {resultado['segundos']:.3f} s para importar"